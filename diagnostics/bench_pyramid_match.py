@@ -0,0 +1,84 @@
+"""Compare full resolution and coarse-to-fine pyramid template matching.
+
+Usage: python diagnostics/bench_pyramid_match.py [trials]
+
+Places an icon at random positions in textured 1080p/1440p/4K frames and runs FeatureSet.find_one_feature over
+the whole frame with and without pyramid=True, reporting latency and how often each finds the exact position.
+"""
+from __future__ import annotations
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from ok.feature.Feature import Feature
+from ok.feature.FeatureSet import FeatureSet
+
+RESOLUTIONS = [(1920, 1080), (2560, 1440), (3840, 2160)]
+
+
+def make_background(width, height, rng):
+    noise = rng.integers(0, 255, (height // 8, width // 8, 3), dtype=np.uint8)
+    return cv2.resize(noise, (width, height), interpolation=cv2.INTER_CUBIC)
+
+
+def make_icon(size, rng):
+    icon = rng.integers(0, 255, (size, size, 3), dtype=np.uint8)
+    icon = cv2.GaussianBlur(icon, (0, 0), 2)
+    cv2.circle(icon, (size // 2, size // 2), size // 3, (255, 255, 255), 3)
+    return icon
+
+
+def create_feature_set(folder, width, height, icon):
+    coco_json = os.path.join(folder, 'coco_annotations.json')
+    with open(coco_json, 'w') as f:
+        json.dump({'images': [], 'categories': [], 'annotations': []}, f)
+    feature_set = FeatureSet(False, coco_json, 0, 0, default_threshold=0.8)
+    feature_set.width, feature_set.height = width, height
+    feature_set.feature_dict['icon'] = Feature(icon, 0, 0)
+    return feature_set
+
+
+def run(feature_set, frames, pyramid):
+    found = 0
+    elapsed = []
+    for frame, (x, y) in frames:
+        start = time.perf_counter()
+        boxes = feature_set.find_one_feature(frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1, pyramid=pyramid)
+        elapsed.append(time.perf_counter() - start)
+        if boxes and (boxes[0].x, boxes[0].y) == (x, y):
+            found += 1
+    return np.median(elapsed) * 1000, found
+
+
+def main() -> int:
+    trials = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    rng = np.random.default_rng(11)
+    with tempfile.TemporaryDirectory() as folder:
+        for width, height in RESOLUTIONS:
+            icon = make_icon(round(height * 0.06), rng)
+            frames = []
+            for _ in range(trials):
+                frame = make_background(width, height, rng)
+                x = int(rng.integers(0, width - icon.shape[1]))
+                y = int(rng.integers(0, height - icon.shape[0]))
+                frame[y:y + icon.shape[0], x:x + icon.shape[1]] = icon
+                frames.append((frame, (x, y)))
+            feature_set = create_feature_set(folder, width, height, icon)
+            full_ms, full_found = run(feature_set, frames, False)
+            pyramid_ms, pyramid_found = run(feature_set, frames, True)
+            print(f'{width}x{height} icon {icon.shape[1]}px | full {full_ms:8.2f}ms found {full_found}/{trials} '
+                  f'| pyramid {pyramid_ms:7.2f}ms found {pyramid_found}/{trials} '
+                  f'| speedup {full_ms / pyramid_ms:4.1f}x')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -0,0 +1,84 @@
+"""Benchmark filter_and_sort_matches against the previous pure-Python NMS.
+
+Usage: python diagnostics/bench_template_nms.py [threshold]
+
+Builds an inventory-grid style frame with many repeating icons, runs matchTemplate once and times both NMS
+implementations on the same result at several thresholds.
+"""
+from __future__ import annotations
+
+import sys
+import time
+from pathlib import Path
+
+import cv2
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from ok.feature.FeatureSet import filter_and_sort_matches
+
+
+def legacy_filter_and_sort_matches(result, threshold, w, h):
+    threshold_mask = result >= threshold
+    loc = np.where(threshold_mask)
+    matches = list(zip(*loc[::-1]))
+    confidences = result[threshold_mask]
+    matches_with_confidence = sorted(zip(matches, confidences), key=lambda x: x[1], reverse=True)
+    selected_matches = []
+
+    def is_overlapping(match, selected):
+        x1, y1 = match
+        for (x2, y2), _ in selected:
+            if x1 < x2 + w and x1 + w > x2 and y1 < y2 + h and y1 + h > y2:
+                return True
+        return False
+
+    for match, confidence in matches_with_confidence:
+        if not is_overlapping(match, selected_matches):
+            selected_matches.append((match, confidence))
+    return selected_matches
+
+
+def make_grid_frame(rows=8, cols=12, cell=64, icon=40, seed=1):
+    rng = np.random.default_rng(seed)
+    icon_image = cv2.GaussianBlur(rng.integers(0, 255, (icon, icon, 3), dtype=np.uint8), (0, 0), 4)
+    icon_image = cv2.normalize(icon_image, None, 0, 255, cv2.NORM_MINMAX)
+    frame = np.full((rows * cell, cols * cell, 3), 30, dtype=np.uint8)
+    for row in range(rows):
+        for col in range(cols):
+            y, x = row * cell + 8, col * cell + 8
+            noise = rng.integers(-12, 12, icon_image.shape)
+            frame[y:y + icon, x:x + icon] = np.clip(icon_image.astype(int) + noise, 0, 255)
+    return frame, icon_image
+
+
+def timed(function, repeat=5):
+    best = float('inf')
+    value = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        value = function()
+        best = min(best, time.perf_counter() - start)
+    return best, value
+
+
+def main() -> int:
+    thresholds = [float(sys.argv[1])] if len(sys.argv) > 1 else [0.9, 0.6, 0.3]
+    frame, icon = make_grid_frame()
+    result = cv2.matchTemplate(frame, icon, cv2.TM_CCOEFF_NORMED)
+    h, w = icon.shape[:2]
+    print(f'frame {frame.shape[1]}x{frame.shape[0]} template {w}x{h}')
+    for threshold in thresholds:
+        hits = int(np.count_nonzero(result >= threshold))
+        legacy_time, legacy = timed(lambda: legacy_filter_and_sort_matches(result, threshold, w, h), repeat=1)
+        new_time, new = timed(lambda: filter_and_sort_matches(result, threshold, w, h))
+        capped_time, _ = timed(lambda: filter_and_sort_matches(result, threshold, w, h, max_results=5))
+        same = {tuple(map(int, m)) for m, _ in legacy} == {tuple(map(int, m)) for m, _ in new}
+        print(f'threshold {threshold:.2f} hits {hits:7d} | legacy {legacy_time * 1000:9.2f}ms '
+              f'{len(legacy):4d} matches | vectorized {new_time * 1000:7.2f}ms {len(new):4d} matches '
+              f'| max_results=5 {capped_time * 1000:7.2f}ms | same matches: {same}')
+    return 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
@@ -956,7 +956,7 @@ class OK:
         raise ValueError(f'Unsupported trigger task selector: {task}')
 
     def do_init(self):
-        from ok.feature.FeatureSet import FeatureSet
+        from ok.feature.FeatureSet import FeatureSet, configure_opencv_threads
         from ok.task.TaskExecutor import TaskExecutor
         from ok.util.file import install_path_isascii
 
@@ -968,6 +968,7 @@ class OK:
         template_matching = self.config.get('template_matching')
         if template_matching is not None:
             coco_feature_json = self.config.get('template_matching').get('coco_feature_json')
+            configure_opencv_threads(template_matching.get('match_workers', 0), template_matching.get('opencv_threads'))
             self.feature_set = FeatureSet(self.debug, coco_feature_json,
                                           default_horizontal_variance=template_matching.get(
                                               'default_horizontal_variance', 0.002),
@@ -976,7 +977,15 @@ class OK:
                                           default_threshold=template_matching.get('default_threshold', 0.8),
                                           feature_processor=template_matching.get('feature_processor'),
                                           hcenter_features=template_matching.get('hcenter_features'),
-                                          vcenter_features=template_matching.get('vcenter_features'))
+                                          vcenter_features=template_matching.get('vcenter_features'),
+                                          feature_bundle_folder=template_matching.get('feature_bundle_folder'),
+                                          pyramid_features=template_matching.get('pyramid_features'),
+                                          last_seen_features=template_matching.get('last_seen_features'),
+                                          multi_scale_features=template_matching.get('multi_scale_features'),
+                                          scale_range=template_matching.get('scale_range'),
+                                          match_workers=template_matching.get('match_workers', 0),
+                                          roi_memo_mb=template_matching.get('roi_memo_mb'),
+                                          roi_memo_tolerance=template_matching.get('roi_memo_tolerance'))
         ocr_target_height = 0
         if ocr := self.config.get('ocr'):
             isascii, path = install_path_isascii()
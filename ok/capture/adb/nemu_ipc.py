@@ -15,9 +15,12 @@ from ok.capture.adb.nemu_utils import retry_sleep, RETRY_TRIES
 from ok.capture.adb.pool import WORKER_POOL, JobTimeout
 from ok.capture.adb.timer import Timer
 from ok.capture.adb.util import ensure_time, random_rectangle_point
+from ok.device.capture_methods.frame_pool import FramePool
 
 logger = Logger.get_logger(__name__)
 
+DEFAULT_FRAME_BUFFERS = 4
+
 
 class NemuIpcIncompatible(Exception):
     pass
@@ -246,6 +249,8 @@ class NemuIpcImpl:
         self.connect_id: int = 0
         self.width = 0
         self.height = 0
+        # ((width, height), pointer to a ctypes pixel buffer), reused by every screenshot at that resolution
+        self._pixels = None
 
     def connect(self, on_thread=True):
         if self.connect_id > 0:
@@ -356,7 +361,11 @@ class NemuIpcImpl:
         width_ptr = ctypes.pointer(ctypes.c_int(self.width))
         height_ptr = ctypes.pointer(ctypes.c_int(self.height))
         length = self.width * self.height * 4
-        pixels_pointer = ctypes.pointer((ctypes.c_ubyte * length)())
+        pixels = self._pixels
+        if pixels is None or pixels[0] != (self.width, self.height):
+            pixels = ((self.width, self.height), ctypes.pointer((ctypes.c_ubyte * length)()))
+            self._pixels = pixels
+        pixels_pointer = pixels[1]
 
         ret = self.lib.nemu_capture_display(
             self.connect_id, self.display_id, length, width_ptr, height_ptr, pixels_pointer,
@@ -377,11 +386,17 @@ class NemuIpcImpl:
         Returns:
             np.ndarray: Image array in RGBA color space
                 Note that image is upside down
+                It is a view of the pixel buffer reused by the next screenshot, convert or copy it before that
         """
         if self.connect_id == 0:
             self.connect()
 
-        pixels_pointer = self.run_func(self._screenshot, timeout=timeout)
+        try:
+            pixels_pointer = self.run_func(self._screenshot, timeout=timeout)
+        except JobTimeout:
+            # the abandoned call may still write into the buffer, the next screenshot gets a fresh one
+            self._pixels = None
+            raise
 
         # image = np.ctypeslib.as_array(pixels_pointer, shape=(self.height, self.width, 4))
         image = np.ctypeslib.as_array(pixels_pointer.contents).reshape((self.height, self.width, 4))
@@ -460,11 +475,13 @@ class NemuIpcImpl:
 class NemuIpc:
     _screenshot_interval = Timer(0.1)
 
-    def __init__(self, nemu_folder: str, instance_id: int, display_id: int = 0):
+    def __init__(self, nemu_folder: str, instance_id: int, display_id: int = 0,
+                 frame_buffers: int = DEFAULT_FRAME_BUFFERS):
         self.nemu_ipc = None
         self.nemu_folder = nemu_folder
         self.instance_id = instance_id
         self.display_id = display_id
+        self.frame_pool = FramePool(frame_buffers)
         self.nemu_ipc = self.init_nemu_ipc()
 
     def init_nemu_ipc(self) -> NemuIpcImpl:
@@ -516,12 +533,22 @@ class NemuIpc:
             raise Exception
         return True
 
-    def screenshot(self, timeout=0.5):
+    def screenshot(self, timeout=0.5, copy=False):
+        """
+        Returns:
+            np.ndarray: BGR frame, upright
+                Without copy, the frame is a buffer of frame_pool, which is reused only once nothing references
+                the frame or a view of it anymore. copy=True returns a fresh array outside the pool
+        """
         image = self.nemu_ipc.screenshot(timeout=timeout)
 
-        image = cv2.cvtColor(image, cv2.COLOR_BGRA2RGB)
-        cv2.flip(image, 0, dst=image)
-        return image
+        frame = self.frame_buffer(image.shape[0], image.shape[1])
+        cv2.cvtColor(image, cv2.COLOR_BGRA2RGB, dst=frame)
+        cv2.flip(frame, 0, dst=frame)
+        return frame.copy() if copy else frame
+
+    def frame_buffer(self, height, width):
+        return self.frame_pool.acquire((height, width, 3))
 
     def sleep(self, second):
         """
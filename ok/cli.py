@@ -68,6 +68,39 @@ def run_web_command(args):
     return 0
 
 
+def _parse_bool(value):
+    value = value.lower()
+    if value in ("1", "true", "yes", "on"):
+        return True
+    if value in ("0", "false", "no", "off"):
+        return False
+    raise argparse.ArgumentTypeError(f"Invalid boolean: {value}")
+
+
+def bench_ocr_command(args):
+    import json
+
+    from ok.ocr.benchmark import run_ocr_benchmark
+
+    report = run_ocr_benchmark(
+        load_config(args.config),
+        args.folder,
+        names=args.lib,
+        target_heights=args.target_height or [0],
+        grayscale=args.grayscale or [False],
+        frame_height=args.frame_height,
+        repeat=args.repeat,
+        warmup=not args.no_warmup,
+    )
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    else:
+        print(text)
+    return 0
+
+
 def build_parser():
     parser = argparse.ArgumentParser(prog="ok")
     subparsers = parser.add_subparsers(dest="command", required=True)
@@ -103,6 +136,26 @@ def build_parser():
                             help="Port to listen on (default: choose an available port)")
     web_parser.set_defaults(func=run_web_command)
 
+    bench_ocr_parser = subparsers.add_parser("bench_ocr", help="Benchmark the configured OCR libs on labeled crops")
+    bench_ocr_parser.add_argument(
+        "folder",
+        help="Folder of crops, labeled by labels.json, labels.txt (file<TAB>text) or the file names",
+    )
+    bench_ocr_parser.add_argument("-c", "--config", help="Config import target")
+    bench_ocr_parser.add_argument("-l", "--lib", action="append",
+                                  help="OCR config name to benchmark, repeatable (default: all configured)")
+    bench_ocr_parser.add_argument("--target-height", "--target_height", dest="target_height", type=int,
+                                  action="append", help="target_height to test, repeatable (default: 0)")
+    bench_ocr_parser.add_argument("--grayscale", type=_parse_bool, action="append",
+                                  help="Grayscale setting to test, true or false, repeatable (default: false)")
+    bench_ocr_parser.add_argument("--frame-height", "--frame_height", dest="frame_height", type=int, default=1080,
+                                  help="Height of the frames the crops were cut from (default: 1080)")
+    bench_ocr_parser.add_argument("-r", "--repeat", type=int, default=1, help="Runs per crop (default: 1)")
+    bench_ocr_parser.add_argument("--no-warmup", "--no_warmup", dest="no_warmup", action="store_true",
+                                  help="Skip the warmup inference before measuring")
+    bench_ocr_parser.add_argument("-o", "--output", help="Write the JSON report to this file instead of stdout")
+    bench_ocr_parser.set_defaults(func=bench_ocr_command)
+
     return parser
 
 
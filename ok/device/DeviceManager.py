@@ -7,7 +7,10 @@ import cv2
 import numpy as np
 
 from ok.device.capture import HwndWindow, BrowserCaptureMethod, update_capture_method, NemuIpcCaptureMethod, \
-    ADBCaptureMethod
+    ADBCaptureMethod, ADBStreamCaptureMethod
+from ok.device.capture_methods.adb import decompress_screencap, local_decompressor_available, parse_raw_screencap, \
+    screencap_command
+from ok.device.capture_methods.base import DEFAULT_PRODUCER_MAX_FPS, DEFAULT_PRODUCER_RING_SIZE
 from ok.device.interaction import PostMessageInteraction, GenshinInteraction, ForegroundPostMessageInteraction, \
     PynputInteraction, PyDirectInteraction, BrowserInteraction, ADBInteraction
 from ok.core.events import communicate
@@ -52,6 +55,8 @@ class DeviceManager:
         self.capture_method = None
         self.global_config = global_config
         self._adb_lock = threading.Lock()
+        self._screencap_compression = {}
+        self._raw_screencap_failed = set()
         if app_config.get('adb'):
             self.packages = app_config.get('adb').get('packages')
         else:
@@ -143,6 +148,18 @@ class DeviceManager:
             except Exception as e:
                 logger.error(f'capture method close failed: {e}')
 
+    def configure_capture_producer(self):
+        """
+        adb config capture_producer: True moves adb and ipc capture to a background thread, capped at capture_max_fps,
+        see enable_producer.
+        """
+        adb_config = self.adb_capture_config or {}
+        if adb_config.get('capture_producer') and self.capture_method is not None \
+                and not self.capture_method.producer:
+            self.capture_method.enable_producer(adb_config.get('capture_ring_size', DEFAULT_PRODUCER_RING_SIZE),
+                                                adb_config.get('capture_max_fps', DEFAULT_PRODUCER_MAX_FPS))
+            logger.info(f'capture producer enabled for {self.capture_method.name}')
+
     def select_hwnd(self, exe, hwnd):
         self.config['selected_exe'] = exe
         self.config['selected_hwnd'] = hwnd
@@ -490,6 +507,11 @@ class DeviceManager:
         if device is None:
             return None
         try:
+            if (self.adb_capture_config or {}).get('screencap') == 'raw' \
+                    and device.serial not in self._raw_screencap_failed:
+                image = self.do_raw_screencap(device)
+                if image is not None:
+                    return image
             png_bytes = self.shell_device(device, "screencap -p", encoding=None, timeout=10)
             if png_bytes is not None and len(png_bytes) > 0:
                 image_data = np.frombuffer(png_bytes, dtype=np.uint8)
@@ -501,6 +523,57 @@ class DeviceManager:
         except Exception as e:
             logger.error('screencap', e)
 
+    def do_raw_screencap(self, device) -> np.ndarray | None:
+        """
+        screencap without -p through exec:, so the device skips the PNG encode and we skip the decode. A device whose
+        output can not be parsed falls back to screencap -p for the rest of the session.
+        """
+        compression = self.screencap_compression(device)
+        try:
+            data = self.exec_out(device, screencap_command(compression), timeout=10)
+            if not data:
+                raise ValueError('empty raw screencap output')
+            return parse_raw_screencap(decompress_screencap(data, compression))
+        except Exception as e:
+            logger.error(f'raw screencap failed on {device.serial}, fall back to screencap -p', e)
+            self._raw_screencap_failed.add(device.serial)
+            return None
+
+    def screencap_compression(self, device):
+        """
+        Negotiates the adb screencap_compression config (gzip, lz4 or auto) once per device: the first one that exists
+        on the device and can be decompressed here is used, None otherwise.
+        """
+        wanted = (self.adb_capture_config or {}).get('screencap_compression')
+        if not wanted:
+            return None
+        if device.serial in self._screencap_compression:
+            return self._screencap_compression[device.serial]
+        chosen = None
+        for compression in (('lz4', 'gzip') if wanted == 'auto' else (wanted,)):
+            if not local_decompressor_available(compression):
+                continue
+            try:
+                if self.shell_device(device, f'command -v {compression}', timeout=3):
+                    chosen = compression
+                    break
+            except Exception as e:
+                logger.error(f'screencap compression probe {compression} failed', e)
+        logger.info(f'screencap compression for {device.serial}: {chosen}')
+        self._screencap_compression[device.serial] = chosen
+        return chosen
+
+    def exec_out(self, device, cmd, timeout=10) -> bytes:
+        """Runs cmd through the exec: service, which streams raw bytes without the shell's pty newline translation."""
+        logger.debug(f'adb exec-out {device} {cmd}')
+        connection = device.open_transport(timeout=timeout)
+        try:
+            connection.send_command(f'exec:{cmd}')
+            connection.check_okay()
+            return connection.read_until_close(encoding=None)
+        finally:
+            connection.close()
+
     def adb_ui_dump(self):
         device = self.device
         if device:
@@ -549,7 +622,7 @@ class DeviceManager:
             return [method_name(item) for item in (methods or ['windows']) if item]
         if kind == 'browser':
             return ['browser']
-        methods = ['adb']
+        methods = ['adb', 'adb_stream']
         emulator = device.get('emulator')
         if emulator is not None:
             try:
@@ -698,7 +771,15 @@ class DeviceManager:
                             self.capture_method.close()
                         self.capture_method = NemuIpcCaptureMethod(self, self.exit_event)
                     self.capture_method.update_emulator(self.get_preferred_device().get('emulator'))
+                    self.capture_method.copy_frames = (self.adb_capture_config or {}).get('ipc_copy_frames', False)
                     logger.info(f'use ipc capture {preferred}')
+                elif self.config.get('capture') == 'adb_stream':
+                    if not isinstance(self.capture_method, ADBStreamCaptureMethod):
+                        if self.capture_method is not None:
+                            self.capture_method.close()
+                        self.capture_method = ADBStreamCaptureMethod(self, self.exit_event, width=width,
+                                                                     height=height)
+                        logger.info(f'use adb stream capture {preferred}')
                 else:
                     if not isinstance(self.capture_method, ADBCaptureMethod):
                         logger.debug(f'use adb capture')
@@ -707,6 +788,7 @@ class DeviceManager:
                         self.capture_method = ADBCaptureMethod(self, self.exit_event, width=width,
                                                                height=height)
                         logger.info(f'use adb capture {preferred}')
+                self.configure_capture_producer()
                 if preferred.get('full_path'):
                     logger.info(f'ensure_hwnd for debugging {preferred} {width, height}')
                     emulator = preferred.get('emulator')
@@ -1059,7 +1141,7 @@ class DeviceManager:
                 self.set_interaction(adb_config['interaction'])
             if 'capture_method' in adb_config:
                 self.set_capture(adb_config['capture_method'])
-            elif self.config.get('capture') not in ('adb', 'ipc'):
+            elif self.config.get('capture') not in ('adb', 'adb_stream', 'ipc'):
                 self.set_capture('adb')
                 
             if self.packages:
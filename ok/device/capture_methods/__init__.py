@@ -1,4 +1,5 @@
 from ok.device.capture_methods.adb import ADBCaptureMethod
+from ok.device.capture_methods.adb_stream import ADBStreamCaptureMethod
 from ok.device.capture_methods.base import BaseCaptureMethod, BaseWindowsCaptureMethod
 from ok.device.capture_methods.bitblt import BitBltCaptureMethod, ForegroundBitBltCaptureMethod
 from ok.device.capture_methods.bitblt_utils import (
@@ -1,5 +1,23 @@
+import gzip
+import struct
+
+import cv2
+import numpy as np
+
 from ok.device.capture_methods.base import BaseCaptureMethod
 
+# android.graphics.PixelFormat values screencap writes in its raw header
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_BGRA_8888 = 5
+
+# on-device compressor command and local decompressor per screencap compression
+SCREENCAP_COMPRESSIONS = {
+    'lz4': 'lz4 -1 -c',
+    'gzip': 'gzip -1',
+}
+
+
 class ADBCaptureMethod(BaseCaptureMethod):
     name = "ADB command line Capture"
     description = "use the adb screencap command, slow but works when in background/minimized, takes 300ms per frame"
@@ -24,3 +42,70 @@ class ADBCaptureMethod(BaseCaptureMethod):
         if not self._connected and self.device_manager.device is not None:
             self.get_frame()
         return self._connected and self.device_manager.device is not None
+
+
+def parse_raw_screencap(data):
+    """
+    Parses the output of screencap without -p into a BGR frame.
+
+    The header is width, height and pixel format as little endian uint32, plus a uint32 color space since Android 9.
+    Rows may be padded to the surface stride, which is derived from the payload size. The pixels are read through a
+    strided view of data, so the only copy is the single pass colour conversion into the returned BGR frame.
+    """
+    return decode_raw_screencap(data, raw_screencap_layout(data))
+
+
+def raw_screencap_layout(data):
+    """(width, height, pixel format, header size, row stride in bytes) of one raw screencap output."""
+    if len(data) < 12:
+        raise ValueError(f'raw screencap too short: {len(data)} bytes')
+    width, height, pixel_format = struct.unpack_from('<III', data, 0)
+    if width <= 0 or height <= 0:
+        raise ValueError(f'raw screencap invalid size {width}x{height}')
+    row_bytes = width * 4
+    for header_size in (16, 12):
+        payload = len(data) - header_size
+        if payload >= row_bytes * height and payload % height == 0:
+            return width, height, pixel_format, header_size, payload // height
+    raise ValueError(f'raw screencap size mismatch {width}x{height} format {pixel_format} {len(data)} bytes')
+
+
+def raw_screencap_size(layout):
+    _, height, _, header_size, stride = layout
+    return header_size + stride * height
+
+
+def decode_raw_screencap(data, layout):
+    width, height, pixel_format, header_size, stride = layout
+    buffer = np.frombuffer(data, dtype=np.uint8, offset=header_size, count=stride * height)
+    frame = np.lib.stride_tricks.as_strided(buffer, shape=(height, width, 4), strides=(stride, 4, 1),
+                                            writeable=False)
+    if pixel_format == PIXEL_FORMAT_BGRA_8888:
+        return cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR)
+    if pixel_format in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888):
+        return cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
+    raise ValueError(f'raw screencap unsupported pixel format {pixel_format}')
+
+
+def screencap_command(compression=None):
+    if compression:
+        return f'screencap | {SCREENCAP_COMPRESSIONS[compression]}'
+    return 'screencap'
+
+
+def decompress_screencap(data, compression=None):
+    if compression == 'gzip':
+        return gzip.decompress(data)
+    if compression == 'lz4':
+        import lz4.frame
+        return lz4.frame.decompress(data)
+    return data
+
+
+def local_decompressor_available(compression):
+    if compression == 'lz4':
+        try:
+            import lz4.frame  # noqa: F401
+        except ImportError:
+            return False
+    return compression in SCREENCAP_COMPRESSIONS
@@ -0,0 +1,167 @@
+import struct
+import threading
+import time
+
+from ok.core.events import communicate
+from ok.device.capture_methods.adb import decode_raw_screencap, raw_screencap_layout, raw_screencap_size
+from ok.device.capture_methods.base import BaseCaptureMethod
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+STREAM_COMMAND = 'while true; do screencap; done'
+STREAM_READ_TIMEOUT = 10
+STREAM_FRAME_TIMEOUT = 2
+STREAM_STATS_INTERVAL = 1
+STREAM_IDLE_TIMEOUT = 10
+
+
+class ADBStreamCaptureMethod(BaseCaptureMethod):
+    name = "ADB Stream Capture"
+    description = "one long lived adb exec-out stream of raw screencap frames, decoded on a background thread"
+
+    def __init__(self, device_manager, exit_event, width=0, height=0):
+        super().__init__()
+        self.device_manager = device_manager
+        self.exit_event = exit_event
+        self._connected = (width != 0 and height != 0)
+        self._stream_condition = threading.Condition()
+        self._stream_thread = None
+        self._stream_stop = False
+        self._connection = None
+        self._latest = None
+        self._served_id = 0
+        self._failures = 0
+        self._last_request = 0
+        self.fps = 0.0
+        self.frame_time = 0.0
+
+    def enable_producer(self, ring_size=None, max_fps=None):
+        logger.info(f'{self.name} already captures on its own thread, producer mode ignored')
+
+    def close(self):
+        with self._stream_condition:
+            self._stream_stop = True
+            connection, self._connection = self._connection, None
+            thread, self._stream_thread = self._stream_thread, None
+            self._stream_condition.notify_all()
+        if connection is not None:
+            try:
+                connection.close()
+            except Exception as e:
+                logger.error('adb stream close error', e)
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1)
+        super().close()
+
+    def do_get_frame(self):
+        """The newest streamed frame not returned before, waiting up to STREAM_FRAME_TIMEOUT for one."""
+        if self.exit_event.is_set():
+            return None
+        deadline = time.time() + STREAM_FRAME_TIMEOUT
+        with self._stream_condition:
+            self._last_request = time.time()
+            self._start_stream()
+            while not self._stream_stop and not self.exit_event.is_set():
+                if self._latest is not None and self._latest[0] > self._served_id:
+                    self._served_id = self._latest[0]
+                    return self._latest[1]
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    return None
+                self._stream_condition.wait(min(remaining, 0.1))
+        return None
+
+    def connected(self):
+        if not self._connected and self.device_manager.device is not None:
+            self.get_frame()
+        return self._connected and self.device_manager.device is not None
+
+    def _start_stream(self):
+        if self._stream_thread is None or not self._stream_thread.is_alive():
+            self._stream_stop = False
+            self._stream_thread = threading.Thread(target=self._stream, name="ADBStreamCapture", daemon=True)
+            self._stream_thread.start()
+
+    def _idle(self):
+        return time.time() - self._last_request > STREAM_IDLE_TIMEOUT
+
+    def _stream(self):
+        self._failures = 0
+        while not self._stream_stop and not self.exit_event.is_set():
+            with self._stream_condition:
+                if self._idle():
+                    # nobody asked for frames for a while, stop the device side loop until the next request
+                    logger.info(f'adb stream idle for {STREAM_IDLE_TIMEOUT}s, stopped')
+                    self._stream_thread = None
+                    return
+            device = self.device_manager.device
+            if device is not None:
+                try:
+                    self._read_stream(device)
+                except Exception as e:
+                    self._failures += 1
+                    self._connected = False
+                    if not self._stream_stop:
+                        logger.error(f'adb stream failed {self._failures} times, reconnecting', e)
+            with self._stream_condition:
+                if not self._stream_stop:
+                    self._stream_condition.wait(min(5.0, 0.5 * 2 ** self._failures) if device is not None else 1)
+
+    def _read_stream(self, device):
+        # one plain screencap tells the frame layout, every frame of the stream then has exactly that size
+        layout = raw_screencap_layout(self.device_manager.exec_out(device, 'screencap', timeout=STREAM_READ_TIMEOUT))
+        frame_size = raw_screencap_size(layout)
+        connection = device.open_transport(timeout=STREAM_READ_TIMEOUT)
+        with self._stream_condition:
+            if self._stream_stop:
+                connection.close()
+                return
+            self._connection = connection
+        logger.info(f'adb stream started {device.serial} {layout[0]}x{layout[1]} format {layout[2]}')
+        try:
+            connection.send_command(f'exec:{STREAM_COMMAND}')
+            connection.check_okay()
+            frame_id = self._latest[0] if self._latest is not None else 0
+            stats_start = time.time()
+            stats_frames = 0
+            stats_latency = 0.0
+            while not self._stream_stop and not self.exit_event.is_set() and not self._idle():
+                read_start = time.time()
+                data = read_exactly(connection, frame_size)
+                if struct.unpack_from('<II', data, 0) != layout[:2]:
+                    raise ValueError(f'adb stream resolution changed {struct.unpack_from("<II", data, 0)}')
+                frame = decode_raw_screencap(data, layout)
+                now = time.time()
+                frame_id += 1
+                with self._stream_condition:
+                    self._latest = (frame_id, frame)
+                    self._stream_condition.notify_all()
+                self._connected = True
+                self._failures = 0
+                stats_frames += 1
+                # latency of a frame is its read plus its decode, the interval between frames is 1000 / fps
+                stats_latency += now - read_start
+                if now - stats_start >= STREAM_STATS_INTERVAL:
+                    self.fps = stats_frames / (now - stats_start)
+                    self.frame_time = stats_latency * 1000 / stats_frames
+                    communicate.fps.emit(round(self.fps, 1))
+                    communicate.frame_time.emit(round(self.frame_time, 1))
+                    stats_start, stats_frames, stats_latency = now, 0, 0.0
+        finally:
+            with self._stream_condition:
+                if self._connection is connection:
+                    self._connection = None
+            connection.close()
+
+
+def read_exactly(connection, size):
+    chunks = []
+    remaining = size
+    while remaining > 0:
+        chunk = connection.read(remaining)
+        if not chunk:
+            raise ConnectionError(f'adb stream closed after {size - remaining}/{size} bytes')
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return chunks[0] if len(chunks) == 1 else b''.join(chunks)
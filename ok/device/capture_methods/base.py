@@ -1,4 +1,16 @@
+import threading
+import time
+from collections import deque
+
+from ok.device.capture_methods.frame_pool import FrameInfo, FrameInfos, FramePool, normalize_frame
 from ok.task.exceptions import CaptureException
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+DEFAULT_PRODUCER_RING_SIZE = 3
+PRODUCER_IDLE_TIMEOUT = 5
+DEFAULT_PRODUCER_MAX_FPS = 30
 
 
 class BaseCaptureMethod:
@@ -8,9 +20,108 @@ class BaseCaptureMethod:
     def __init__(self):
         self._size = (0, 0)
         self.exit_event = None
+        self.producer = False
+        self._capture_lock = threading.RLock()
+        self._ring = deque(maxlen=DEFAULT_PRODUCER_RING_SIZE)
+        self._ring_condition = threading.Condition()
+        self._producer_thread = None
+        self._producer_stop = False
+        self._producer_error = None
+        self._producer_interval = 1 / DEFAULT_PRODUCER_MAX_FPS
+        self._last_frame_request = 0
+        self._served_time = 0
+        self._frame_pool = FramePool()
+        self._frame_infos = FrameInfos()
+        self._frame_id = 0
+        self.last_frame_info = None
 
     def close(self):
-        pass
+        self.stop_producer()
+
+    def enable_producer(self, ring_size=DEFAULT_PRODUCER_RING_SIZE, max_fps=DEFAULT_PRODUCER_MAX_FPS):
+        """
+        Producer mode: a background thread keeps capturing into a ring of the last ring_size (capture start time,
+        frame) pairs, and latest_frame() hands out the newest one, so capture overlaps with whatever the task does
+        with the previous frame. Captures start at most max_fps times a second, 0 for no cap. The thread starts on
+        the first latest_frame() call and stops after PRODUCER_IDLE_TIMEOUT seconds without one.
+        """
+        with self._ring_condition:
+            self.producer = True
+            self._ring = deque(self._ring, maxlen=max(1, ring_size))
+            self._producer_interval = 1 / max_fps if max_fps and max_fps > 0 else 0
+
+    def latest_frame(self, after=0, timeout=None):
+        """
+        Newest produced frame whose capture started at or after the time after, waiting up to timeout seconds for
+        one. A frame is handed out only once, later calls wait for a newer one. Returns None on timeout or exit,
+        raises the producer's CaptureException if capturing failed meanwhile.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._ring_condition:
+            self._last_frame_request = time.time()
+            self._start_producer()
+            while True:
+                if self._ring and self._ring[-1][0] >= after and self._ring[-1][0] > self._served_time:
+                    self._served_time = self._ring[-1][0]
+                    return self._ring[-1][1]
+                if self._producer_error is not None:
+                    error, self._producer_error = self._producer_error, None
+                    raise error
+                if self.exit_event is not None and self.exit_event.is_set():
+                    return None
+                remaining = 0.1 if deadline is None else min(0.1, deadline - time.time())
+                if remaining <= 0:
+                    return None
+                self._ring_condition.wait(remaining)
+                self._last_frame_request = time.time()
+                self._start_producer()
+
+    def _start_producer(self):
+        if self._producer_thread is None or not self._producer_thread.is_alive():
+            self._producer_stop = False
+            self._producer_thread = threading.Thread(target=self._produce, name="CaptureProducer", daemon=True)
+            self._producer_thread.start()
+
+    def stop_producer(self, timeout=1):
+        with self._ring_condition:
+            self._producer_stop = True
+            self._ring_condition.notify_all()
+            thread, self._producer_thread = self._producer_thread, None
+            self._ring.clear()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def _produce(self):
+        logger.info(f'capture producer started {self.get_name()}')
+        failures = 0
+        while True:
+            with self._ring_condition:
+                if self._producer_stop or (self.exit_event is not None and self.exit_event.is_set()):
+                    break
+                if time.time() - self._last_frame_request > PRODUCER_IDLE_TIMEOUT:
+                    self._producer_thread = None
+                    break
+            start = time.time()
+            try:
+                frame = self.get_frame()
+                failures = 0
+            except CaptureException as e:
+                frame = None
+                failures += 1
+                with self._ring_condition:
+                    self._producer_error = e
+                    self._ring_condition.notify_all()
+            with self._ring_condition:
+                if frame is not None:
+                    self._ring.append((start, frame))
+                    self._ring_condition.notify_all()
+                    # a source faster than the cap would otherwise spin a core producing frames nobody reads
+                    remaining = self._producer_interval - (time.time() - start)
+                    if remaining > 0 and not self._producer_stop:
+                        self._ring_condition.wait(remaining)
+                elif not self._producer_stop:
+                    self._ring_condition.wait(min(1.0, 0.05 * 2 ** failures))
+        logger.info(f'capture producer stopped {self.get_name()}')
 
     @property
     def width(self):
@@ -32,17 +143,28 @@ class BaseCaptureMethod:
         if self.exit_event.is_set():
             return
         try:
-            frame = self.do_get_frame()
-            if frame is not None:
-                if frame.shape[0] <= 10 or frame.shape[1] <= 10:
+            with self._capture_lock:
+                timestamp = time.time()
+                frame = self.do_get_frame()
+                if frame is None or frame.shape[0] <= 10 or frame.shape[1] <= 10:
                     return None
                 self._size = (frame.shape[1], frame.shape[0])
-                if frame.shape[2] == 4:
-                    frame = frame[:, :, :3]
+                frame = normalize_frame(frame, self._frame_pool)
+                self._frame_id += 1
+                info = FrameInfo(self._frame_id, timestamp, self.get_name())
+            self._frame_infos.add(frame, info)
+            self.last_frame_info = info
             return frame
         except Exception as e:
             raise CaptureException(str(e)) from e
 
+    def frame_info(self, frame):
+        """
+        FrameInfo (frame_id, capture start timestamp, source capture method) of a frame recently returned by
+        get_frame(), None for anything else. frame_id increases by one per captured frame, so caches can key on it.
+        """
+        return self._frame_infos.get(frame)
+
     def __str__(self):
         return f'{self.get_name()}_{self.width}x{self.height}'
 
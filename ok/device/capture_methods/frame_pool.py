@@ -0,0 +1,97 @@
+import sys
+import threading
+import weakref
+from collections import deque
+from dataclasses import dataclass
+
+import cv2
+import numpy as np
+
+DEFAULT_FRAME_POOL_SIZE = 4
+FRAME_INFO_HISTORY = 16
+
+
+@dataclass(frozen=True)
+class FrameInfo:
+    frame_id: int
+    timestamp: float
+    source: str
+
+
+class FramePool:
+    """
+    Contiguous output arrays of one shape, reused across frames.
+
+    A buffer is handed out again only once nothing outside the pool references it anymore, neither the array
+    nor a view of it, so a frame kept by a task, the producer ring or the screenshot queue is never overwritten.
+    When all size buffers are still in use, acquire() falls back to a fresh array outside the pool.
+    """
+
+    def __init__(self, size=DEFAULT_FRAME_POOL_SIZE):
+        self.size = size
+        self.allocations = 0
+        self._shape = None
+        self._buffers = []
+        self._free_refs = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, shape):
+        with self._lock:
+            if shape != self._shape:
+                self._shape = shape
+                self._buffers = []
+            for index in range(len(self._buffers)):
+                if self._refs(index) <= self._free_refs:
+                    return self._buffers[index]
+            self.allocations += 1
+            if len(self._buffers) >= self.size:
+                return np.empty(shape, dtype=np.uint8)
+            self._buffers.append(np.empty(shape, dtype=np.uint8))
+            # the reference count of a buffer only the pool holds, measured the same way acquire checks it
+            self._free_refs = self._refs(len(self._buffers) - 1)
+            return self._buffers[-1]
+
+    def _refs(self, index):
+        return sys.getrefcount(self._buffers[index])
+
+    def clear(self):
+        with self._lock:
+            self._shape = None
+            self._buffers = []
+
+
+class FrameInfos:
+    """FrameInfo of the last frames, looked up by the frame array itself without keeping it alive."""
+
+    def __init__(self, history=FRAME_INFO_HISTORY):
+        self._frames = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def add(self, frame, info):
+        with self._lock:
+            self._frames.append((weakref.ref(frame), info))
+
+    def get(self, frame):
+        if frame is None:
+            return None
+        with self._lock:
+            for ref, info in reversed(self._frames):
+                if ref() is frame:
+                    return info
+        return None
+
+
+def normalize_frame(frame, pool):
+    """
+    Returns frame as a contiguous BGR array, converting BGRA sources and copying strided views into a pool
+    buffer once, so OpenCV calls on the frame or its crops do not make their own contiguous copies.
+    """
+    if frame.ndim == 3 and frame.shape[2] == 4:
+        out = pool.acquire(frame.shape[:2] + (3,))
+        cv2.cvtColor(frame, cv2.COLOR_BGRA2BGR, dst=out)
+        return out
+    if not frame.flags['C_CONTIGUOUS']:
+        out = pool.acquire(frame.shape)
+        np.copyto(out, frame)
+        return out
+    return frame
@@ -4,7 +4,7 @@ import os
 from ok.util.collection import deep_get
 from ok.util.logger import Logger
 
-from ok.device.capture_methods.base import BaseCaptureMethod
+from ok.device.capture_methods.base import BaseCaptureMethod, DEFAULT_PRODUCER_MAX_FPS, DEFAULT_PRODUCER_RING_SIZE
 
 logger = Logger.get_logger(__name__)
 
@@ -19,6 +19,16 @@ class NemuIpcCaptureMethod(BaseCaptureMethod):
         self._connected = (width != 0 and height != 0)
         self.nemu_impl = None
         self.emulator = None
+        self.copy_frames = False
+        self.frame_buffers = 4
+
+    def enable_producer(self, ring_size=DEFAULT_PRODUCER_RING_SIZE, max_fps=DEFAULT_PRODUCER_MAX_FPS):
+        # the ring, the frame the task holds and the one being captured keep their buffers busy, size the pool so
+        # capturing does not fall back to fresh arrays
+        super().enable_producer(ring_size, max_fps)
+        self.frame_buffers = max(self.frame_buffers, ring_size + 2)
+        if self.nemu_impl:
+            self.nemu_impl.frame_pool.size = self.frame_buffers
 
     def update_emulator(self, emulator):
         self.emulator = emulator
@@ -34,7 +44,8 @@ class NemuIpcCaptureMethod(BaseCaptureMethod):
             self.nemu_impl = NemuIpc(
                 nemu_folder=self.base_folder(),
                 instance_id=self.emulator.player_id,
-                display_id=0
+                display_id=0,
+                frame_buffers=self.frame_buffers
             )
 
     def base_folder(self):
@@ -65,11 +76,16 @@ class NemuIpcCaptureMethod(BaseCaptureMethod):
             self.nemu_impl = None
 
     def do_get_frame(self):
+        """
+        Frames come from a pool of frame_buffers output buffers, a buffer is reused only once no frame or view of
+        it is referenced anymore, so a kept frame is never overwritten. copy_frames (adb config ipc_copy_frames)
+        returns fresh arrays instead.
+        """
         if self.exit_event.is_set():
             return None
         self.init_nemu()
         if self.nemu_impl:
-            return self.nemu_impl.screenshot(timeout=0.5)
+            return self.nemu_impl.screenshot(timeout=0.5, copy=self.copy_frames)
 
     def connected(self):
         return True
@@ -1,7 +1,7 @@
 import math
 import random
 import re
-from functools import cmp_to_key
+from functools import cmp_to_key, lru_cache
 
 from ok.util.logger import Logger
 
@@ -434,19 +434,36 @@ def find_boxes_by_name(boxes, names):
     """
     if isinstance(names, (str, re.Pattern)):
         names = [names]
+    matcher = compile_matcher(tuple(names))
+    return [box for box in boxes if isinstance(box.name, str) and matcher(box.name)]
 
-    result = []
 
-    for box in boxes:
-        matched = False
-        for name in names:
-            if matched:
-                break
-            if (isinstance(name, str) and name == box.name) or (isinstance(box.name, str) and
-                                                                isinstance(name, re.Pattern) and re.search(name,
-                                                                                                           box.name)):
-                matched = True
-        if matched:
-            result.append(box)
+@lru_cache(maxsize=1024)
+def compile_matcher(names):
+    """
+    Builds one predicate for a tuple of names and patterns, memoized per tuple.
 
-    return result
+    Strings are looked up in a set, patterns sharing the same flags and without groups are joined into a single
+    alternation, anything else is searched on its own.
+    """
+    texts = frozenset(name for name in names if isinstance(name, str))
+    grouped = {}
+    separate = []
+    for name in names:
+        if isinstance(name, re.Pattern):
+            if name.groups or not isinstance(name.pattern, str):
+                separate.append(name)
+            else:
+                grouped.setdefault(name.flags, []).append(name.pattern)
+    patterns = separate
+    for flags, group in grouped.items():
+        try:
+            patterns.append(re.compile('|'.join(f'(?:{pattern})' for pattern in group), flags))
+        except re.error:  # e.g. global inline flags, which are only allowed at the start
+            patterns += [re.compile(pattern, flags) for pattern in group]
+    searches = [pattern.search for pattern in patterns]
+
+    def matcher(text):
+        return text in texts or any(search(text) for search in searches)
+
+    return matcher
@@ -1,5 +1,6 @@
 # FeatureSet.py
 import glob
+import hashlib
 import json
 import math
 import os
@@ -7,6 +8,8 @@ import re
 import shutil
 import subprocess
 import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 import cv2
 import numpy as np
@@ -17,6 +20,8 @@ from ok.feature.Box import Box, sort_boxes
 from ok.feature.Feature import Feature
 from ok.core.events import communicate
 from ok.util.file import get_path_relative_to_exe
+from ok.util.frame_cache import to_canny, to_gray
+from ok.util.roi_memo import RoiMemo, copy_boxes
 from ok.util.logger import Logger
 
 
@@ -41,6 +46,18 @@ def scale_box(box, scale_factor: float):
         box.width = int(round(box.width / scale_factor))
         box.height = int(round(box.height / scale_factor))
 
+def configure_opencv_threads(match_workers=0, opencv_threads=None):
+    """
+    Sets OpenCV's process wide thread count once at startup: opencv_threads if configured, else the cores split
+    between match_workers so the match pool and OpenCV's own threads do not oversubscribe them.
+    """
+    if opencv_threads is None and (match_workers or 0) > 1:
+        opencv_threads = max(1, (os.cpu_count() or 1) // match_workers)
+    if opencv_threads is not None:
+        logger.info(f'match_workers {match_workers}, cv2.setNumThreads({opencv_threads})')
+        cv2.setNumThreads(opencv_threads)
+    return opencv_threads
+
 def join_list_elements(input_object) -> str:
     """Joins the elements of a list into a single string."""
     if input_object is None:
@@ -67,10 +84,15 @@ class FeatureSet:
     feature_processor: object
     hcenter_features: list
     vcenter_features: list
+    pyramid_features: set
+    last_seen_features: set
+    multi_scale_features: set
 
     def __init__(self, debug, coco_json: str, default_horizontal_variance,
                  default_vertical_variance, default_threshold=0.95, feature_processor=None,
-                 hcenter_features: list = None, vcenter_features: list = None) -> None:
+                 hcenter_features: list = None, vcenter_features: list = None, feature_bundle_folder=None,
+                 pyramid_features: list = None, last_seen_features: list = None, multi_scale_features: list = None,
+                 scale_range=None, match_workers=0, roi_memo_mb=None, roi_memo_tolerance=0) -> None:
         self.coco_json = get_path_relative_to_exe(coco_json)
         self.debug = debug
         self.feature_dict = {}
@@ -79,7 +101,23 @@ class FeatureSet:
         self.feature_processor = feature_processor
         self.hcenter_features = hcenter_features if hcenter_features is not None else []
         self.vcenter_features = vcenter_features if vcenter_features is not None else []
+        self.pyramid_features = set(pyramid_features) if pyramid_features is not None else set()
+        self.last_seen_features = set(last_seen_features) if last_seen_features is not None else set()
+        self._last_seen = {}
+        self._last_seen_stats = {'hits': 0, 'misses': 0, 'full_searches': 0}
+        self._last_seen_lock = threading.Lock()  # find_feature lists update these from the match pool threads
+        self.multi_scale_features = set(multi_scale_features) if multi_scale_features is not None else set()
+        self.scale_range = tuple(scale_range) if scale_range is not None else DEFAULT_SCALE_RANGE
+        self._best_scales = {}
+        self._scale_misses = {}
+        self.roi_memo = RoiMemo.from_config({'roi_memo_mb': roi_memo_mb, 'roi_memo_tolerance': roi_memo_tolerance})
+        self.match_workers = match_workers or 0
+        self._match_pool = None
+        self._match_pool_lock = threading.Lock()
         self._processed_images = set()
+        self.feature_bundle_folder = feature_bundle_folder
+        self._bundle = None
+        self._bundle_checked = False
 
         logger.debug(f'Loading features from {self.coco_json}')
 
@@ -92,6 +130,22 @@ class FeatureSet:
         self.default_vertical_variance = default_vertical_variance
         self.lock = threading.Lock()
 
+    def map_matches(self, fn, items):
+        """
+        Lazily yields fn(item) for every item, in the order of items.
+
+        With match_workers > 1 the calls run on a shared thread pool (cv2.matchTemplate releases the GIL), otherwise
+        they run one after another on the calling thread.
+        """
+        items = list(items)
+        if self.match_workers <= 1 or len(items) <= 1:
+            return map(fn, items)
+        with self._match_pool_lock:
+            if self._match_pool is None:
+                self._match_pool = ThreadPoolExecutor(max_workers=self.match_workers,
+                                                      thread_name_prefix='FeatureMatch')
+        return self._match_pool.map(fn, items)
+
     def feature_exists(self, feature_name: str) -> bool:
         self.ensure_feature(feature_name)
         return feature_name in self.feature_dict
@@ -109,6 +163,10 @@ class FeatureSet:
                 self.feature_dict = {}
                 self.box_dict = {}
                 self._processed_images = set()
+                self._bundle = None
+                self._bundle_checked = False
+                self._last_seen = {}
+                self.roi_memo.clear()
                 self.load_success = os.path.exists(self.coco_json)
         return self.load_success
 
@@ -135,13 +193,16 @@ class FeatureSet:
             self.feature_dict = {}
             self.box_dict = {}
             self._processed_images = set()
-        features, boxes, compressed, self.load_success, image_keys = read_from_json(self.coco_json, self.width,
-                                                                                   self.height,
-                                                                                   self.hcenter_features,
-                                                                                   self.vcenter_features,
-                                                                                   target_category_name=target_feature,
-                                                                                   processed_images=self._processed_images)
-        self._merge_features(features, boxes, image_keys)
+            self._bundle_checked = False
+        bundle = self._get_bundle()
+        if bundle is not None:
+            self.load_success = True
+            self._merge_features(*bundle)
+        else:
+            features, boxes, compressed, self.load_success, image_keys = read_from_json(
+                self.coco_json, self.width, self.height, self.hcenter_features, self.vcenter_features,
+                target_category_name=target_feature, processed_images=self._processed_images)
+            self._merge_features(features, boxes, image_keys)
         # Also process ok_tasks/assets/coco_annotations.json if it exists, merge data
         ok_tasks_coco = os.path.join('ok_tasks', 'assets', 'coco_annotations.json')
         if os.path.exists(ok_tasks_coco) and os.path.abspath(ok_tasks_coco) != os.path.abspath(self.coco_json):
@@ -178,6 +239,16 @@ class FeatureSet:
                         logger.error(f'Failed to merge import features from {entry}: {e}')
         return self.load_success
 
+    def _get_bundle(self):
+        if not self._bundle_checked:
+            self._bundle_checked = True
+            self._bundle = None
+            if self.width > 0 and self.height > 0 and os.path.exists(self.coco_json):
+                self._bundle = load_feature_bundle(self.coco_json, self.width, self.height, self.hcenter_features,
+                                                   self.vcenter_features, bundle_folder=self.feature_bundle_folder,
+                                                   with_variants=self.feature_processor is None)
+        return self._bundle
+
     def ensure_feature(self, feature_name):
         if feature_name is None or feature_name in self.feature_dict:
             return
@@ -212,29 +283,276 @@ class FeatureSet:
                          vertical_variance: float = 0, threshold: float = 0, use_gray_scale: bool = False, x=-1, y=-1,
                          to_x=-1, to_y=-1, width=-1, height=-1, box=None, canny_lower=0, canny_higher=0,
                          frame_processor=None, template=None, mask_function=None, match_method=cv2.TM_CCOEFF_NORMED,
-                         screenshot=False, limit=0, target_height=0):
-        import time
+                         screenshot=False, limit=0, target_height=0, pyramid=False, last_seen=False,
+                         multi_scale=False, scale_range=None, reuse=False):
         if mat is None:
             return []
         start_time = time.time()
         self.check_size(mat)
         check_size_time = time.time()
 
+        threshold, horizontal_variance, vertical_variance = self._default_match_params(threshold,
+                                                                                      horizontal_variance,
+                                                                                      vertical_variance)
+        feature, template = self._get_template(category_name, template)
+        search_x1, search_y1, search_x2, search_y2 = self._search_rect(mat, feature, horizontal_variance,
+                                                                       vertical_variance, x, y, to_x, to_y, width,
+                                                                       height, box)
+
+        search_area = mat[search_y1:search_y2, search_x1:search_x2, :3]
+        if reuse and feature is not None:
+            search_box = Box(search_x1, search_y1, search_x2 - search_x1, search_y2 - search_y1,
+                             name=box.name if box is not None else None)
+            key = (category_name, search_x1, search_y1, search_x2, search_y2, threshold, bool(use_gray_scale),
+                   canny_lower, canny_higher, frame_processor, mask_function, match_method, limit, target_height,
+                   pyramid, multi_scale, tuple(scale_range) if scale_range else None)
+            boxes = self.roi_memo.get_or_compute(
+                key, search_area,
+                lambda: self.find_one_feature(mat, category_name, threshold=threshold, use_gray_scale=use_gray_scale,
+                                              box=search_box, canny_lower=canny_lower, canny_higher=canny_higher,
+                                              frame_processor=frame_processor, mask_function=mask_function,
+                                              match_method=match_method, screenshot=screenshot, limit=limit,
+                                              target_height=target_height, pyramid=pyramid, last_seen=last_seen,
+                                              multi_scale=multi_scale, scale_range=scale_range),
+                copy_result=copy_boxes)
+            self._draw_match_boxes(category_name, boxes, search_x1, search_y1, search_x2, search_y2)
+            return boxes
+        prepare_time = time.time()
+
+        raw_template = template
+        template, mask = self._prepare_template(feature, template, use_gray_scale, canny_lower, canny_higher,
+                                                mask_function)
+        pyramid = pyramid or category_name in self.pyramid_features
+        if multi_scale or category_name in self.multi_scale_features:
+            search_area = preprocess_search_area(search_area, use_gray_scale, canny_lower, canny_higher,
+                                                 frame_processor)
+            boxes = self._match_multi_scale(mat, search_area, feature, raw_template, template, mask, category_name, box,
+                                            search_x1, search_y1, threshold, match_method, limit, target_height,
+                                            use_gray_scale, canny_lower, canny_higher, pyramid,
+                                            scale_range or self.scale_range)
+            self._draw_match_boxes(category_name, boxes, search_x1, search_y1, search_x2, search_y2)
+            return boxes
+        last_seen_key = None
+        if limit == 1 and category_name and (last_seen or category_name in self.last_seen_features):
+            last_seen_key = (category_name, search_x1, search_y1, search_x2, search_y2, bool(use_gray_scale),
+                             canny_lower, canny_higher, match_method, target_height)
+            boxes = self._match_near_last_seen(mat, last_seen_key, template, mask, box, threshold,
+                                               frame_processor)
+            if boxes:
+                self._draw_match_boxes(category_name, boxes, search_x1, search_y1, search_x2, search_y2)
+                return boxes
+        search_area = preprocess_search_area(search_area, use_gray_scale, canny_lower, canny_higher,
+                                             frame_processor)
+        boxes, match_time = self._match_search_area(mat, search_area, template, mask, category_name, box,
+                                                    search_x1, search_y1, threshold, match_method, screenshot,
+                                                    limit, target_height, canny_lower, canny_higher,
+                                                    pyramid=pyramid)
+        if last_seen_key is not None:
+            self._remember_last_seen(last_seen_key, boxes)
+        end_time = time.time()
+        if end_time - start_time > 0.1:
+            logger.info(f"find_one_feature {category_name} took {(end_time - start_time) * 1000:.2f}ms "
+                        f"(check_size: {(check_size_time - start_time) * 1000:.2f}ms, "
+                        f"prepare: {(prepare_time - check_size_time) * 1000:.2f}ms, "
+                        f"match: {(match_time - prepare_time) * 1000:.2f}ms, "
+                        f"post: {(end_time - match_time) * 1000:.2f}ms)")
+        self._draw_match_boxes(category_name, boxes, search_x1, search_y1, search_x2, search_y2)
+        return boxes
+
+    def find_features_batched(self, mat: np.ndarray, category_names: list, horizontal_variance: float = 0,
+                              vertical_variance: float = 0, threshold: float = 0, use_gray_scale: bool = False,
+                              x=-1, y=-1, to_x=-1, to_y=-1, width=-1, height=-1, box=None, canny_lower=0,
+                              canny_higher=0, frame_processor=None, mask_function=None,
+                              match_method=cv2.TM_CCOEFF_NORMED, screenshot=False, limit=0, pyramid=False) -> list:
+        """
+        Matches several features against one shared, preprocessed search buffer.
+
+        The union of all search areas is cropped once and converted to gray/frame_processor output once, every
+        template is then matched against a view of that buffer. Gray conversion is per pixel, so gray results are
+        the same as calling find_one_feature for each name; a frame_processor that looks at neighbouring pixels may
+        differ near the crop borders. Canny, and search areas spread so far apart that the union is more than
+        BATCH_MAX_UNION_RATIO times their summed area, are preprocessed per search area instead.
+        """
+        if mat is None:
+            return []
+        start_time = time.time()
+        self.check_size(mat)
+        threshold, horizontal_variance, vertical_variance = self._default_match_params(threshold,
+                                                                                      horizontal_variance,
+                                                                                      vertical_variance)
+        jobs = []
+        for category_name in category_names:
+            feature, template = self._get_template(category_name, None)
+            rect = self._search_rect(mat, feature, horizontal_variance, vertical_variance, x, y, to_x, to_y,
+                                     width, height, box)
+            jobs.append((category_name, feature, template, rect))
+
+        union_x1 = min(rect[0] for _, _, _, rect in jobs)
+        union_y1 = min(rect[1] for _, _, _, rect in jobs)
+        union_x2 = max(rect[2] for _, _, _, rect in jobs)
+        union_y2 = max(rect[3] for _, _, _, rect in jobs)
+
+        crops_area = sum((rect[2] - rect[0]) * (rect[3] - rect[1]) for _, _, _, rect in jobs)
+        shared = not (canny_lower != 0 and canny_higher != 0) and \
+            (union_x2 - union_x1) * (union_y2 - union_y1) <= BATCH_MAX_UNION_RATIO * crops_area
+        if shared:
+            buffer = preprocess_search_area(mat[union_y1:union_y2, union_x1:union_x2, :3], use_gray_scale,
+                                            canny_lower, canny_higher, frame_processor)
+
+        def match(job):
+            category_name, feature, template, (search_x1, search_y1, search_x2, search_y2) = job
+            if shared:
+                search_area = buffer[search_y1 - union_y1:search_y2 - union_y1,
+                                     search_x1 - union_x1:search_x2 - union_x1]
+            else:
+                search_area = preprocess_search_area(mat[search_y1:search_y2, search_x1:search_x2, :3],
+                                                      use_gray_scale, canny_lower, canny_higher, frame_processor)
+            template, mask = self._prepare_template(feature, template, use_gray_scale, canny_lower, canny_higher,
+                                                    mask_function)
+            boxes, _ = self._match_search_area(mat, search_area, template, mask, category_name, box,
+                                               search_x1, search_y1, threshold, match_method, screenshot, limit,
+                                               0, canny_lower, canny_higher,
+                                               pyramid=pyramid or category_name in self.pyramid_features)
+            self._draw_match_boxes(category_name, boxes, search_x1, search_y1, search_x2, search_y2)
+            return boxes
+
+        results = []
+        for boxes in self.map_matches(match, jobs):
+            results += boxes
+        end_time = time.time()
+        if end_time - start_time > 0.1:
+            logger.info(f"find_features_batched {len(jobs)} features took {(end_time - start_time) * 1000:.2f}ms "
+                        f"union: {union_x2 - union_x1}x{union_y2 - union_y1} shared: {shared}")
+        return sort_boxes(results)
+
+    def _match_near_last_seen(self, mat, key, template, mask, box, threshold, frame_processor):
+        last = self._last_seen.get(key)
+        if last is None:
+            return []
+        (category_name, search_x1, search_y1, search_x2, search_y2, use_gray_scale, canny_lower, canny_higher,
+         match_method, target_height) = key
+        last_x, last_y, last_confidence = last
+        template_height, template_width = template.shape[:2]
+        margin = max(LAST_SEEN_MIN_MARGIN, round(min(template_width, template_height) * LAST_SEEN_MARGIN_RATIO))
+        x1, y1 = max(search_x1, last_x - margin), max(search_y1, last_y - margin)
+        x2 = min(search_x2, last_x + template_width + margin)
+        y2 = min(search_y2, last_y + template_height + margin)
+        boxes = []
+        if x2 - x1 >= template_width and y2 - y1 >= template_height:
+            window = preprocess_search_area(mat[y1:y2, x1:x2, :3], use_gray_scale, canny_lower, canny_higher,
+                                            frame_processor)
+            boxes, _ = self._match_search_area(mat, window, template, mask, category_name, box, x1, y1, threshold,
+                                               match_method, False, 1, target_height, canny_lower, canny_higher)
+        if boxes and boxes[0].confidence >= last_confidence - LAST_SEEN_CONFIDENCE_DROP:
+            with self._last_seen_lock:
+                self._last_seen[key] = (boxes[0].x, boxes[0].y, last_confidence)
+                self._last_seen_stats['hits'] += 1
+            return boxes
+        with self._last_seen_lock:
+            self._last_seen_stats['misses'] += 1
+        return []
+
+    def _remember_last_seen(self, key, boxes):
+        with self._last_seen_lock:
+            self._last_seen_stats['full_searches'] += 1
+            if boxes:
+                self._last_seen[key] = (boxes[0].x, boxes[0].y, boxes[0].confidence)
+            else:
+                self._last_seen.pop(key, None)
+
+    def last_seen_stats(self) -> dict:
+        """Counts of last-seen fast path hits/misses and full searches, with the fast path hit rate."""
+        with self._last_seen_lock:
+            stats = dict(self._last_seen_stats)
+        attempts = stats['hits'] + stats['misses']
+        stats['hit_rate'] = stats['hits'] / attempts if attempts else 0.0
+        return stats
+
+    def _match_multi_scale(self, mat, search_area, feature, raw_template, template, mask, category_name, box,
+                           search_x1, search_y1, threshold, match_method, limit, target_height, use_gray_scale, canny_lower,
+                           canny_higher, pyramid, scale_range):
+        key = (category_name, self.width, self.height)
+        best_scale = self._best_scales.get(key) if category_name else None
+        scales = scale_candidates(scale_range)
+        misses = self._scale_misses.get(key, 0)
+        if best_scale is not None:
+            ordered = sorted(scales)
+            if best_scale in ordered and (misses + 1) % MULTI_SCALE_FULL_SWEEP_MISSES != 0:
+                # the element is most likely just not on screen, only look next to the remembered scale
+                index = ordered.index(best_scale)
+                scales = [best_scale] + ordered[max(0, index - 1):index] + ordered[index + 1:index + 2]
+            else:
+                scales = [best_scale] + [scale for scale in scales if scale != best_scale]
+        best_boxes, best_found = [], None
+        for scale in scales:
+            if scale == 1:
+                scaled_template, scaled_mask = template, mask
+            else:
+                scaled_template, scaled_mask = self._scaled_template(feature, raw_template, mask, scale,
+                                                                     use_gray_scale, canny_lower, canny_higher)
+            if (scaled_template.shape[0] > search_area.shape[0] or scaled_template.shape[1] > search_area.shape[1]
+                    or min(scaled_template.shape[:2]) < 1):
+                continue
+            boxes, _ = self._match_search_area(mat, search_area, scaled_template, scaled_mask, category_name, box,
+                                               search_x1, search_y1, threshold, match_method, False, limit,
+                                               target_height, canny_lower, canny_higher, pyramid=pyramid)
+            if boxes and scale == best_scale:
+                self._scale_misses.pop(key, None)
+                return boxes
+            if boxes and (not best_boxes or boxes[0].confidence > best_boxes[0].confidence):
+                best_boxes = boxes
+                best_found = scale
+        if best_boxes and category_name:
+            if best_found != best_scale:
+                logger.info(f'find_one_feature {category_name} best scale {best_found} at {self.width}x{self.height}')
+            self._best_scales[key] = best_found
+            self._scale_misses.pop(key, None)
+        elif best_scale is not None:
+            self._scale_misses[key] = misses + 1
+        return best_boxes
+
+    def _scaled_template(self, feature, template, mask, scale, use_gray_scale, canny_lower, canny_higher):
+        cache_key = ('scale', scale, bool(use_gray_scale), canny_lower, canny_higher)
+        if feature is not None and cache_key in feature.template_cache:
+            return feature.template_cache[cache_key]
+        source = feature.mat if feature is not None else template
+        width, height = max(1, round(source.shape[1] * scale)), max(1, round(source.shape[0] * scale))
+        interpolation = cv2.INTER_AREA if scale < 1 else cv2.INTER_LINEAR
+        scaled = cv2.resize(source, (width, height), interpolation=interpolation)
+        if (use_gray_scale or (canny_lower != 0 and canny_higher != 0)) and len(scaled.shape) != 2:
+            scaled = cv2.cvtColor(scaled, cv2.COLOR_BGR2GRAY)
+        if canny_lower != 0 and canny_higher != 0:
+            scaled = cv2.Canny(scaled, canny_lower, canny_higher)
+        if mask is not None:
+            mask = cv2.resize(mask, (width, height), interpolation=cv2.INTER_NEAREST)
+        if feature is not None:
+            feature.template_cache[cache_key] = (scaled, mask)
+        return scaled, mask
+
+    def best_scale(self, category_name):
+        """The template scale multi-scale matching settled on for category_name at the current resolution."""
+        return self._best_scales.get((category_name, self.width, self.height))
+
+    def _default_match_params(self, threshold, horizontal_variance, vertical_variance):
         if threshold == 0:
             threshold = self.default_threshold
         if horizontal_variance == 0:
             horizontal_variance = self.default_horizontal_variance
         if vertical_variance == 0:
             vertical_variance = self.default_vertical_variance
-        if template is None:
-            self.ensure_feature(category_name)
-        if template is None and category_name not in self.feature_dict:
+        return threshold, horizontal_variance, vertical_variance
+
+    def _get_template(self, category_name, template):
+        if template is not None:
+            return None, template
+        self.ensure_feature(category_name)
+        if category_name not in self.feature_dict:
             raise ValueError(f"FeatureSet: {category_name} not found in featureDict")
-        if template is None:
-            feature = self.feature_dict[category_name]
-            template = feature.mat
-        else:
-            feature = None
+        feature = self.feature_dict[category_name]
+        return feature, feature.mat
+
+    def _search_rect(self, mat, feature, horizontal_variance, vertical_variance, x=-1, y=-1, to_x=-1, to_y=-1,
+                     width=-1, height=-1, box=None):
         if box is not None:
             search_x1 = max(box.x, 0)
             search_y1 = max(box.y, 0)
@@ -268,11 +586,9 @@ class FeatureSet:
             feature_width, feature_height = feature.width, feature.height
             search_x2 = min(self.width, round(feature.x + feature_width + x_offset))
             search_y2 = min(self.height, round(feature.y + feature_height + y_offset))
+        return search_x1, search_y1, search_x2, search_y2
 
-        search_area = mat[search_y1:search_y2, search_x1:search_x2, :3]
-        prepare_time = time.time()
-
-        feature_height, feature_width = template.shape[:2]
+    def _prepare_template(self, feature, template, use_gray_scale, canny_lower, canny_higher, mask_function):
         preprocess_key = None
         if use_gray_scale or (canny_lower != 0 and canny_higher != 0):
             preprocess_key = (bool(use_gray_scale), canny_lower, canny_higher)
@@ -283,13 +599,9 @@ class FeatureSet:
         if cached_template is not None:
             template = cached_template
         if use_gray_scale:
-            search_area = cv2.cvtColor(search_area, cv2.COLOR_BGR2GRAY)
             if cached_template is None and len(template.shape) != 2:
                 template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
         if canny_lower != 0 and canny_higher != 0:
-            if len(search_area.shape) != 2:
-                search_area = cv2.cvtColor(search_area, cv2.COLOR_BGR2GRAY)
-            search_area = cv2.Canny(search_area, canny_lower, canny_higher)
             if cached_template is None and len(template.shape) != 2:
                 template = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
             if cached_template is None:
@@ -304,10 +616,12 @@ class FeatureSet:
             mask = feature.mask
         elif mask_function is not None:
             mask = mask_function(template)
+        return template, mask
 
-        if frame_processor is not None:
-            search_area = frame_processor(search_area)
-
+    def _match_search_area(self, mat, search_area, template, mask, category_name, box, search_x1, search_y1,
+                           threshold, match_method, screenshot, limit, target_height, canny_lower, canny_higher,
+                           pyramid=False):
+        feature_height, feature_width = template.shape[:2]
         if template.shape[1] > search_area.shape[1] or template.shape[0] > search_area.shape[0]:
             logger.error(
                 f'feature template {category_name} {box.name if box else ""} size greater than search area {template.shape} > {search_area.shape}')
@@ -333,9 +647,13 @@ class FeatureSet:
             elif search_area.ndim == 2 and template.ndim == 3:
                 search_area = cv2.cvtColor(search_area, cv2.COLOR_GRAY2BGR)
 
-        result = cv2.matchTemplate(search_area, template, match_method,
-                                   mask=mask)
-        np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+        locations = None
+        if pyramid and match_method == cv2.TM_CCOEFF_NORMED:
+            locations = pyramid_match(search_area, template, threshold, mask=mask, limit=limit)
+        if locations is None:
+            result = cv2.matchTemplate(search_area, template, match_method,
+                                       mask=mask)
+            np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
         match_time = time.time()
 
         if screenshot:
@@ -345,13 +663,19 @@ class FeatureSet:
             communicate.screenshot.emit(template, "template", False, None)
 
         boxes = []
-        if limit == 1 and match_method == cv2.TM_CCOEFF_NORMED:
+        if locations is not None:
+            for (x, y), confidence in locations:
+                x, y = round(x / scale_factor) + search_x1, round(y / scale_factor) + search_y1
+                boxes.append(Box(x, y, feature_width, feature_height, confidence, category_name))
+            boxes = sort_boxes(boxes)
+        elif limit == 1 and match_method == cv2.TM_CCOEFF_NORMED:
             min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(result)
             if max_val >= threshold:
                 x, y = round(max_loc[0] / scale_factor) + search_x1, round(max_loc[1] / scale_factor) + search_y1
                 boxes.append(Box(x, y, feature_width, feature_height, max_val, category_name))
         else:
-            locations = filter_and_sort_matches(result, threshold, template.shape[1], template.shape[0])
+            locations = filter_and_sort_matches(result, threshold, template.shape[1], template.shape[0],
+                                                max_results=limit)
             for loc in locations:
                 x, y = round(loc[0][0] / scale_factor) + search_x1, round(loc[0][1] / scale_factor) + search_y1
                 confidence = 1.0 if math.isinf(loc[1]) and loc[1] > 0 else loc[1]
@@ -359,20 +683,15 @@ class FeatureSet:
             boxes = sort_boxes(boxes)
             if limit > 0:
                 boxes = boxes[:limit]
-        end_time = time.time()
-        if end_time - start_time > 0.1:
-            logger.info(f"find_one_feature {category_name} took {(end_time - start_time) * 1000:.2f}ms "
-                        f"(check_size: {(check_size_time - start_time) * 1000:.2f}ms, "
-                        f"prepare: {(prepare_time - check_size_time) * 1000:.2f}ms, "
-                        f"match: {(match_time - prepare_time) * 1000:.2f}ms, "
-                        f"post: {(end_time - match_time) * 1000:.2f}ms)")
+        return boxes, match_time
+
+    def _draw_match_boxes(self, category_name, boxes, search_x1, search_y1, search_x2, search_y2):
         if category_name and self._draw_boxes_enabled():
             communicate.emit_draw_box(category_name, boxes, "red")
             search_name = "search_" + category_name
             communicate.emit_draw_box(search_name,
                                       Box(search_x1, search_y1, search_x2 - search_x1, search_y2 - search_y1,
                                           name=search_name), "blue")
-        return boxes
 
     def _draw_boxes_enabled(self):
         if self.debug:
@@ -392,22 +711,46 @@ class FeatureSet:
                      vertical_variance: float = 0, threshold: float = 0, use_gray_scale: bool = False, x=-1, y=-1,
                      to_x=-1, to_y=-1, width=-1, height=-1, box=None, canny_lower=0, canny_higher=0,
                      frame_processor=None, template=None, mask_function=None, match_method=cv2.TM_CCOEFF_NORMED,
-                     screenshot=False, limit=0, target_height=0):
+                     screenshot=False, limit=0, target_height=0, pyramid=False, last_seen=False,
+                     multi_scale=False, scale_range=None, reuse=False):
         if mat is None:
             return []
         if type(category_name) is list:
-            results = []
+            # Only worth sharing the search buffer when there is a conversion to share. Canny on the union finds
+            # different edges at the crop borders than on each search area, so it is matched per feature.
+            needs_preprocess = (use_gray_scale or frame_processor) and not (canny_lower != 0 and canny_higher != 0)
+            if (len(category_name) > 1 and needs_preprocess and template is None and target_height <= 0
+                    and not last_seen and not multi_scale and not reuse
+                    and not (self.last_seen_features | self.multi_scale_features).intersection(category_name)):
+                return self.find_features_batched(mat, category_name, horizontal_variance=horizontal_variance,
+                                                  vertical_variance=vertical_variance, threshold=threshold,
+                                                  use_gray_scale=use_gray_scale, x=x, y=y, to_x=to_x, to_y=to_y,
+                                                  width=width, height=height, box=box, canny_lower=canny_lower,
+                                                  canny_higher=canny_higher, frame_processor=frame_processor,
+                                                  mask_function=mask_function, match_method=match_method,
+                                                  screenshot=screenshot, limit=limit, pyramid=pyramid)
+            # Load lazily parsed features on this thread before matching on the pool.
+            self.check_size(mat)
             for cn in category_name:
-                results += self.find_one_feature(mat=mat, category_name=cn,
-                                                 horizontal_variance=horizontal_variance,
-                                                 vertical_variance=vertical_variance, threshold=threshold,
-                                                 use_gray_scale=use_gray_scale, x=x, y=y,
-                                                 to_x=to_x, to_y=to_y, width=width, height=height, box=box,
-                                                 canny_lower=canny_lower, canny_higher=canny_higher,
-                                                 frame_processor=frame_processor,
-                                                 template=template, mask_function=mask_function,
-                                                 match_method=match_method, screenshot=screenshot, limit=limit,
-                                                 target_height=target_height)
+                self.ensure_feature(cn)
+
+            def find(cn):
+                return self.find_one_feature(mat=mat, category_name=cn,
+                                             horizontal_variance=horizontal_variance,
+                                             vertical_variance=vertical_variance, threshold=threshold,
+                                             use_gray_scale=use_gray_scale, x=x, y=y,
+                                             to_x=to_x, to_y=to_y, width=width, height=height, box=box,
+                                             canny_lower=canny_lower, canny_higher=canny_higher,
+                                             frame_processor=frame_processor,
+                                             template=template, mask_function=mask_function,
+                                             match_method=match_method, screenshot=screenshot, limit=limit,
+                                             target_height=target_height, pyramid=pyramid,
+                                             last_seen=last_seen, multi_scale=multi_scale,
+                                             scale_range=scale_range, reuse=reuse)
+
+            results = []
+            for boxes in self.map_matches(find, category_name):
+                results += boxes
             return sort_boxes(results)
         else:
             return self.find_one_feature(mat=mat, category_name=category_name,
@@ -418,7 +761,101 @@ class FeatureSet:
                                          canny_lower=canny_lower, canny_higher=canny_higher,
                                          frame_processor=frame_processor,
                                          template=template, mask_function=mask_function, match_method=match_method,
-                                         screenshot=screenshot, limit=limit, target_height=target_height)
+                                         screenshot=screenshot, limit=limit, target_height=target_height,
+                                         pyramid=pyramid, last_seen=last_seen, multi_scale=multi_scale,
+                                         scale_range=scale_range, reuse=reuse)
+
+
+def preprocess_search_area(search_area, use_gray_scale=False, canny_lower=0, canny_higher=0, frame_processor=None):
+    """Applies the gray/Canny/frame_processor conversions used by template matching to a search area."""
+    if canny_lower != 0 and canny_higher != 0:
+        search_area = to_canny(search_area, canny_lower, canny_higher)
+    elif use_gray_scale:
+        search_area = to_gray(search_area)
+    if frame_processor is not None:
+        if not search_area.flags.writeable:
+            search_area = search_area.copy()
+        search_area = frame_processor(search_area)
+    return search_area
+
+
+BATCH_MAX_UNION_RATIO = 2
+
+DEFAULT_SCALE_RANGE = (0.8, 1.2, 0.05)
+# with a remembered scale, a miss only retries the neighbouring scales, every this many misses the whole range
+MULTI_SCALE_FULL_SWEEP_MISSES = 10
+
+
+def scale_candidates(scale_range):
+    """Scales in (min, max, step), nearest to the native 1.0 first."""
+    min_scale, max_scale, step = scale_range
+    scales = {round(min_scale + i * step, 4) for i in range(int(round((max_scale - min_scale) / step)) + 1)}
+    if min_scale <= 1 <= max_scale:
+        scales.add(1.0)
+    return sorted(scales, key=lambda scale: (abs(scale - 1), scale))
+
+
+LAST_SEEN_MIN_MARGIN = 4
+LAST_SEEN_MARGIN_RATIO = 0.25
+LAST_SEEN_CONFIDENCE_DROP = 0.05
+
+PYRAMID_SCALE = 0.5
+PYRAMID_THRESHOLD_MARGIN = 0.15
+PYRAMID_MIN_TEMPLATE_SIZE = 8
+
+
+def pyramid_match(search_area, template, threshold, mask=None, scale=PYRAMID_SCALE, limit=0,
+                  threshold_margin=PYRAMID_THRESHOLD_MARGIN):
+    """
+    Coarse-to-fine TM_CCOEFF_NORMED matching.
+
+    Matches a downscaled template against the downscaled search area to find candidate peaks, then refines each
+    candidate with full resolution matching in a small window around it. Returns the same ((x, y), confidence)
+    list as filter_and_sort_matches, or None when the template is too small to downscale or the search area is
+    not much larger than the template, in which case a full resolution match is cheaper.
+    """
+    template_height, template_width = template.shape[:2]
+    area_height, area_width = search_area.shape[:2]
+    if (min(template_width, template_height) * scale < PYRAMID_MIN_TEMPLATE_SIZE
+            or area_width * area_height < 4 * template_width * template_height):
+        return None
+    small_area = cv2.resize(search_area, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    small_template = cv2.resize(template, (0, 0), fx=scale, fy=scale, interpolation=cv2.INTER_AREA)
+    small_mask = None
+    if mask is not None:
+        small_mask = cv2.resize(mask, (small_template.shape[1], small_template.shape[0]),
+                                interpolation=cv2.INTER_NEAREST)
+    if small_template.shape[0] > small_area.shape[0] or small_template.shape[1] > small_area.shape[1]:
+        return None
+    coarse = cv2.matchTemplate(small_area, small_template, cv2.TM_CCOEFF_NORMED, mask=small_mask)
+    np.nan_to_num(coarse, copy=False, nan=0, posinf=0, neginf=0)
+    candidates = filter_and_sort_matches(coarse, threshold - threshold_margin, small_template.shape[1],
+                                         small_template.shape[0], max_results=limit * 4 if limit > 0 else 0)
+
+    radius = int(math.ceil(1 / scale)) + 1
+    refined = []
+    for (x, y), _ in candidates:
+        x1 = max(0, round(x / scale) - radius)
+        y1 = max(0, round(y / scale) - radius)
+        x2 = min(area_width, round(x / scale) + template_width + radius)
+        y2 = min(area_height, round(y / scale) + template_height + radius)
+        if x2 - x1 < template_width or y2 - y1 < template_height:
+            continue
+        result = cv2.matchTemplate(search_area[y1:y2, x1:x2], template, cv2.TM_CCOEFF_NORMED, mask=mask)
+        np.nan_to_num(result, copy=False, nan=0, posinf=0, neginf=0)
+        _, max_val, _, max_loc = cv2.minMaxLoc(result)
+        if max_val >= threshold:
+            refined.append(((x1 + max_loc[0], y1 + max_loc[1]), max_val))
+
+    refined.sort(key=lambda match: match[1], reverse=True)
+    selected_matches = []
+    for (x, y), confidence in refined:
+        if all(abs(x - sx) >= template_width or abs(y - sy) >= template_height for (sx, sy), _ in selected_matches):
+            selected_matches.append(((x, y), confidence))
+            if 0 < limit <= len(selected_matches):
+                break
+    return selected_matches
+
 
 def read_from_json(coco_json, width=-1, height=-1, hcenter_features=None, vcenter_features=None, adjust=True,
                    target_category_name=None, processed_images=None, image_key_prefix=None):
@@ -427,23 +864,18 @@ def read_from_json(coco_json, width=-1, height=-1, hcenter_features=None, vcente
     ok_compressed = None
     load_success = True
     loaded_image_keys = set()
-    data = load_json(coco_json)
+    index = get_coco_index(coco_json)
     coco_folder = os.path.dirname(coco_json)
-    logger.info(f"read_from_json {coco_folder} {coco_json}")
-
-    image_map = {image['id']: image['file_name'] for image in data['images']}
-    category_map = {category['id']: category['name'] for category in data['categories']}
-    annotations_by_image = {}
-    target_image_ids = set()
-    for annotation in data['annotations']:
-        annotations_by_image.setdefault(annotation['image_id'], []).append(annotation)
-        if target_category_name and category_map[annotation['category_id']] == target_category_name:
-            target_image_ids.add(annotation['image_id'])
-
-    if target_category_name and not target_image_ids:
-        return feature_dict, box_dict, ok_compressed, load_success, loaded_image_keys
-
-    for image_id, file_name in image_map.items():
+    category_map = index.category_map
+    annotations_by_image = index.annotations_by_image
+    target_image_ids = None
+    if target_category_name:
+        target_image_ids = index.category_image_ids.get(target_category_name)
+        if not target_image_ids:
+            return feature_dict, box_dict, ok_compressed, load_success, loaded_image_keys
+    logger.info(f"read_from_json {coco_folder} {coco_json} target: {target_category_name}")
+
+    for image_id, file_name in index.image_map.items():
         if target_category_name and image_id not in target_image_ids:
             continue
         image_key = (image_key_prefix, os.path.abspath(coco_json), image_id)
@@ -500,6 +932,42 @@ def read_from_json(coco_json, width=-1, height=-1, hcenter_features=None, vcente
 
     return feature_dict, box_dict, ok_compressed, load_success, loaded_image_keys
 
+class CocoIndex:
+    """A parsed coco_annotations.json with annotations grouped by image and category."""
+
+    def __init__(self, coco_json, file_stamp):
+        data = load_json(coco_json)
+        self.coco_json = coco_json
+        self.file_stamp = file_stamp
+        self.image_map = {image['id']: image['file_name'] for image in data['images']}
+        self.category_map = {category['id']: category['name'] for category in data['categories']}
+        self.annotations_by_image = {}
+        self.category_image_ids = {}
+        for annotation in data['annotations']:
+            image_id = annotation['image_id']
+            self.annotations_by_image.setdefault(image_id, []).append(annotation)
+            category_name = self.category_map[annotation['category_id']]
+            self.category_image_ids.setdefault(category_name, set()).add(image_id)
+
+
+_coco_indexes = {}
+_coco_index_lock = threading.Lock()
+
+
+def get_coco_index(coco_json) -> CocoIndex:
+    """Returns the parsed index of a COCO json, parsing it again only when the file's mtime changes."""
+    path = os.path.abspath(coco_json)
+    stat = os.stat(path)
+    file_stamp = (stat.st_mtime_ns, stat.st_size)
+    with _coco_index_lock:
+        index = _coco_indexes.get(path)
+        if index is None or index.file_stamp != file_stamp:
+            index = CocoIndex(path, file_stamp)
+            _coco_indexes[path] = index
+            logger.debug(f'indexed {path} {len(index.image_map)} images {len(index.category_image_ids)} categories')
+        return index
+
+
 def load_json(coco_json):
     with open(coco_json, 'r') as file:
         data = json.load(file)
@@ -540,27 +1008,34 @@ def replace_extension(filename):
     if filename.endswith('.jpg'):
         return filename[:-4] + '.png', True
 
-def filter_and_sort_matches(result, threshold, w, h):
-    threshold_mask = result >= threshold
-    loc = np.where(threshold_mask)
-    matches = list(zip(*loc[::-1]))
+def filter_and_sort_matches(result, threshold, w, h, max_results=0):
+    """
+    Non-maximum suppression of a matchTemplate result.
 
-    confidences = result[threshold_mask]
+    Keeps local maxima above threshold, then greedily selects them by descending confidence while suppressing any
+    candidate whose w x h box overlaps an already selected one. Stops after max_results matches if it is > 0.
+    Returns a list of ((x, y), confidence) ordered by confidence.
+    """
+    threshold_mask = result >= threshold
+    if not threshold_mask.any():
+        return []
+    local_max = cv2.dilate(result, np.ones((3, 3), np.uint8))
+    # flatnonzero on the raveled mask is several times faster than a 2D np.nonzero
+    indices = np.flatnonzero(threshold_mask & (result >= local_max))
+    ys, xs = np.divmod(indices, result.shape[1])
+    confidences = result.ravel()[indices]
 
-    matches_with_confidence = sorted(zip(matches, confidences), key=lambda x: x[1], reverse=True)
+    order = np.argsort(-confidences, kind='stable')
+    xs, ys, confidences = xs[order], ys[order], confidences[order]
 
     selected_matches = []
-
-    def is_overlapping(match, selected):
-        x1, y1 = match
-        for (x2, y2), _ in selected:
-            if (x1 < x2 + w and x1 + w > x2 and y1 < y2 + h and y1 + h > y2):
-                return True
-        return False
-
-    for match, confidence in matches_with_confidence:
-        if not is_overlapping(match, selected_matches):
-            selected_matches.append((match, confidence))
+    while xs.size > 0:
+        x, y, confidence = xs[0], ys[0], confidences[0]
+        selected_matches.append(((x, y), confidence))
+        if 0 < max_results <= len(selected_matches):
+            break
+        keep = (np.abs(xs - x) >= w) | (np.abs(ys - y) >= h)
+        xs, ys, confidences = xs[keep], ys[keep], confidences[keep]
 
     return selected_matches
 
@@ -633,7 +1108,8 @@ def compress_copy_x_anylabeling(x_anylabeling_folder, target_folder, generate_la
 
     compress_copy_coco(coco_json_path, target_folder, x_anylabeling_folder, generate_label_enmu=generate_label_enmu)
 
-def compress_copy_coco(coco_json, target_folder, image_folder, generate_label_enmu=None) -> str:
+def compress_copy_coco(coco_json, target_folder, image_folder, generate_label_enmu=None,
+                       bundle_resolutions=None, hcenter_features=None, vcenter_features=None) -> str:
     import shutil
 
     # Clear target folder before writing
@@ -688,6 +1164,9 @@ def compress_copy_coco(coco_json, target_folder, image_folder, generate_label_en
     logger.info(f'Copied COCO JSON to: {target_coco_json}')
 
     compress_coco(target_coco_json)
+    if bundle_resolutions:
+        build_feature_bundle(target_coco_json, bundle_resolutions, hcenter_features=hcenter_features,
+                             vcenter_features=vcenter_features)
 
     return target_coco_json
 
@@ -866,6 +1345,129 @@ def compress_coco(coco_json) -> None:
             except Exception as e:
                 logger.warning(f"Failed to remove {old_path}: {e}")
 
+FEATURE_BUNDLE_VERSION = 1
+DEFAULT_BUNDLE_CANNY_THRESHOLDS = ((50, 150),)
+
+
+def default_bundle_folder(coco_json):
+    return os.path.join(os.path.dirname(os.path.abspath(coco_json)), 'feature_bundle')
+
+
+def coco_fingerprint(coco_json) -> str:
+    """Hash of the COCO json content and the sizes of the images it references, stable across copies/installs."""
+    index = get_coco_index(coco_json)
+    coco_folder = os.path.dirname(os.path.abspath(coco_json))
+    digest = hashlib.sha1()
+    with open(coco_json, 'rb') as f:
+        digest.update(f.read())
+    for file_name in sorted(set(index.image_map.values())):
+        path = os.path.join(coco_folder, file_name)
+        size = os.path.getsize(path) if os.path.exists(path) else -1
+        digest.update(f'{file_name}:{size}'.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def build_feature_bundle(coco_json, resolutions, hcenter_features=None, vcenter_features=None,
+                         canny_thresholds=DEFAULT_BUNDLE_CANNY_THRESHOLDS, bundle_folder=None) -> list:
+    """
+    Precompiles the features of a COCO json for the given (width, height) resolutions.
+
+    Each resolution is written as a raw uint8 blob ({width}x{height}.npy) holding the scaled BGR template and its
+    gray/Canny variants, plus a json index of offsets and shapes. load_feature_bundle memory-maps the blob, so
+    loading needs no PNG decode or resize.
+    """
+    bundle_folder = bundle_folder or default_bundle_folder(coco_json)
+    os.makedirs(bundle_folder, exist_ok=True)
+    fingerprint = coco_fingerprint(coco_json)
+    written = []
+    for width, height in resolutions:
+        features, _, _, _, _ = read_from_json(coco_json, width, height, hcenter_features, vcenter_features)
+        chunks = []
+        offset = 0
+
+        def add(array):
+            nonlocal offset
+            array = np.ascontiguousarray(array, dtype=np.uint8)
+            chunks.append(array.ravel())
+            entry = {'offset': offset, 'shape': list(array.shape)}
+            offset += array.size
+            return entry
+
+        entries = {}
+        for name, feature in features.items():
+            gray = cv2.cvtColor(feature.mat, cv2.COLOR_BGR2GRAY)
+            entries[name] = {
+                'x': feature.x, 'y': feature.y, 'scaling': feature.scaling,
+                'mat': add(feature.mat),
+                'gray': add(gray),
+                'canny': {f'{lower},{higher}': add(cv2.Canny(gray, lower, higher))
+                          for lower, higher in canny_thresholds or ()},
+            }
+        blob = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.uint8)
+        base_path = os.path.join(bundle_folder, f'{width}x{height}')
+        np.save(f'{base_path}.npy', blob)
+        with open(f'{base_path}.json', 'w') as f:
+            json.dump({
+                'version': FEATURE_BUNDLE_VERSION,
+                'fingerprint': fingerprint,
+                'width': width,
+                'height': height,
+                'hcenter_features': sorted(hcenter_features or []),
+                'vcenter_features': sorted(vcenter_features or []),
+                'features': entries,
+            }, f)
+        logger.info(f'built feature bundle {base_path} {len(entries)} features {blob.size / 1024:.1f}KB')
+        written.append(base_path)
+    return written
+
+
+def load_feature_bundle(coco_json, width, height, hcenter_features=None, vcenter_features=None,
+                        bundle_folder=None, fingerprint=None, with_variants=True):
+    """
+    Maps a bundle built by build_feature_bundle for width x height.
+
+    Returns (feature_dict, box_dict), or None if there is no bundle for the resolution or it was built from a
+    different COCO json or center-feature configuration. Templates are copy-on-write views of the memory map.
+    """
+    base_path = os.path.join(bundle_folder or default_bundle_folder(coco_json), f'{width}x{height}')
+    if not os.path.exists(f'{base_path}.json') or not os.path.exists(f'{base_path}.npy'):
+        return None
+    try:
+        with open(f'{base_path}.json', 'r') as f:
+            index = json.load(f)
+        if fingerprint is None:
+            fingerprint = coco_fingerprint(coco_json)
+        if (index.get('version') != FEATURE_BUNDLE_VERSION or index.get('fingerprint') != fingerprint
+                or index.get('hcenter_features') != sorted(hcenter_features or [])
+                or index.get('vcenter_features') != sorted(vcenter_features or [])):
+            logger.warning(f'feature bundle {base_path} is stale, falling back to {coco_json}')
+            return None
+        blob = np.load(f'{base_path}.npy', mmap_mode='c')
+    except Exception as e:
+        logger.error(f'load feature bundle {base_path} error', e)
+        return None
+
+    def view(entry):
+        start = entry['offset']
+        return blob[start:start + math.prod(entry['shape'])].reshape(entry['shape'])
+
+    feature_dict = {}
+    box_dict = {}
+    for name, entry in index['features'].items():
+        feature = Feature(view(entry['mat']), entry['x'], entry['y'], entry['scaling'])
+        if with_variants:
+            feature.template_cache[(True, 0, 0)] = view(entry['gray'])
+            for thresholds, canny_entry in entry['canny'].items():
+                lower, higher = (int(v) for v in thresholds.split(','))
+                canny = view(canny_entry)
+                feature.template_cache[(False, lower, higher)] = canny
+                feature.template_cache[(True, lower, higher)] = canny
+        feature_dict[name] = feature
+        box_dict[name] = Box(feature.x, feature.y, feature.width, feature.height, name=name)
+    logger.info(f'loaded feature bundle {base_path} {len(feature_dict)} features')
+    return feature_dict, box_dict
+
+
 def replace_extension(i, file_name):
     folder_name = os.path.dirname(file_name)
     new_base_name = f'{i}.png'
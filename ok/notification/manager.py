@@ -28,7 +28,7 @@ class NotificationManager:
             from ok.notification.system import WindowsSystemNotifier
             system_notifier = WindowsSystemNotifier(self.app_name, self.app_icon)
         self.system_notifier = system_notifier
-        self.ocr = NotificationPPOCR(executor.ocr_lib)
+        self.ocr = NotificationPPOCR(executor.ocr_pool)
         self.pipeline = NotificationPipeline(self._send, exit_event=exit_event, interval=5)
         self.queue = self.pipeline.queue
         self.thread = self.pipeline.thread
@@ -4,15 +4,17 @@ import numpy as np
 
 
 class NotificationPPOCR:
-    """Small task-independent adapter around the app's shared PP-OCR instance."""
+    """Small task-independent adapter around the app's pooled PP-OCR instances."""
 
-    def __init__(self, instance_factory):
-        self._instance_factory = instance_factory
-        self._instance = None
-        self._instance_lock = threading.Lock()
+    def __init__(self, pool_factory):
+        self._pool_factory = pool_factory
+        self._pool = None
+        self._pool_lock = threading.Lock()
 
     def recognize(self, frame, threshold=.1):
-        result = self._get_instance().ocr(frame)
+        # checked out like task OCR, so the engine is never used by two threads at once
+        with self._get_pool().instance() as instance:
+            result = instance.ocr(frame)
         detections = result[0] if result else []
         boxes = []
         for detection in detections or []:
@@ -37,12 +39,12 @@ class NotificationPPOCR:
             ))
         return boxes
 
-    def _get_instance(self):
-        if self._instance is None:
-            with self._instance_lock:
-                if self._instance is None:
-                    self._instance = self._instance_factory()
+    def _get_pool(self):
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = self._pool_factory()
                     # Release the bound TaskExecutor method. From this point
-                    # onward the notification pipeline only retains PP-OCR.
-                    self._instance_factory = None
-        return self._instance
+                    # onward the notification pipeline only retains the OCR pool.
+                    self._pool_factory = None
+        return self._pool
@@ -0,0 +1,199 @@
+import json
+import os
+import time
+
+import cv2
+import numpy as np
+
+from ok.feature.FeatureSet import resize_image
+from ok.ocr.engines import create_ocr_lib, ocr_lines
+from ok.ocr.warmup import synthetic_ocr_image, warmup_ocr_lib
+from ok.util.frame_cache import to_gray
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.bmp', '.webp')
+DEFAULT_FRAME_HEIGHT = 1080
+
+
+def load_labeled_crops(folder):
+    """
+    Loads the crops of a benchmark folder as (file name, BGR image, expected text).
+
+    Labels come from labels.json ({"file.png": "text"}), else labels.txt (one "file.png<TAB>text" per line, the
+    PaddleOCR recognition dataset format), else the file name without extension.
+    """
+    labels = None
+    json_path = os.path.join(folder, 'labels.json')
+    txt_path = os.path.join(folder, 'labels.txt')
+    if os.path.isfile(json_path):
+        with open(json_path, encoding='utf-8') as f:
+            labels = json.load(f)
+    elif os.path.isfile(txt_path):
+        labels = {}
+        with open(txt_path, encoding='utf-8') as f:
+            for line in f:
+                line = line.rstrip('\r\n')
+                if '\t' in line:
+                    file_name, text = line.split('\t', 1)
+                    labels[file_name] = text
+    if labels is not None:
+        file_names = list(labels)
+    else:
+        file_names = sorted(name for name in os.listdir(folder) if name.lower().endswith(IMAGE_EXTENSIONS))
+    samples = []
+    for file_name in file_names:
+        image = cv2.imdecode(np.fromfile(os.path.join(folder, file_name), dtype=np.uint8), cv2.IMREAD_COLOR)
+        if image is None:
+            logger.warning(f'skip unreadable crop {file_name}')
+            continue
+        label = labels[file_name] if labels is not None else os.path.splitext(os.path.basename(file_name))[0]
+        samples.append((file_name, image, label))
+    return samples
+
+
+def join_lines(lines):
+    """Joins detected lines top to bottom, then left to right, the way a crop is read."""
+    if not lines:
+        return ''
+    ordered = sorted(lines, key=lambda line: (line[3], line[2]))
+    return ' '.join(line[0] for line in ordered)
+
+
+def edit_distance(a, b):
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        previous = current
+    return previous[-1]
+
+
+def compact_text(text):
+    return ''.join(text.split())
+
+
+def character_error_rate(expected, actual):
+    """Edit distance over the length of expected, both compared without whitespace."""
+    expected, actual = compact_text(expected), compact_text(actual)
+    if not expected:
+        return 0.0 if not actual else 1.0
+    return edit_distance(expected, actual) / len(expected)
+
+
+def latency_summary(seconds):
+    if not seconds:
+        return {}
+    ms = np.array(seconds) * 1000
+    return {
+        'p50': round(float(np.percentile(ms, 50)), 3),
+        'p90': round(float(np.percentile(ms, 90)), 3),
+        'p99': round(float(np.percentile(ms, 99)), 3),
+        'mean': round(float(ms.mean()), 3),
+        'max': round(float(ms.max()), 3),
+    }
+
+
+def rss_mb():
+    import psutil
+    return psutil.Process().memory_info().rss / 1024 / 1024
+
+
+def prepare_crop(image, target_height, grayscale, frame_height):
+    """The same preprocessing ocr() applies to a box of a frame frame_height tall."""
+    if grayscale:
+        image = to_gray(image)
+    image, _ = resize_image(image, frame_height, target_height)
+    return image
+
+
+def benchmark_setting(lib, ocr_lib, samples, target_height=0, grayscale=False, frame_height=DEFAULT_FRAME_HEIGHT,
+                      repeat=1):
+    """Runs every sample repeat times through one engine and setting, returns latency, memory and accuracy."""
+    images = [prepare_crop(image, target_height, grayscale, frame_height) for _, image, _ in samples]
+    latencies = []
+    peak_rss = rss_mb()
+    exact = 0
+    cer_total = 0.0
+    failures = []
+    start = time.perf_counter()
+    for _ in range(max(1, repeat)):
+        for (file_name, _, label), image in zip(samples, images):
+            call_start = time.perf_counter()
+            text = join_lines(ocr_lines(lib, ocr_lib, image))
+            latencies.append(time.perf_counter() - call_start)
+            peak_rss = max(peak_rss, rss_mb())
+            if len(latencies) > len(samples):
+                continue
+            cer = character_error_rate(label, text)
+            cer_total += cer
+            if compact_text(text) == compact_text(label):
+                exact += 1
+            else:
+                failures.append({'file': file_name, 'expected': label, 'actual': text, 'cer': round(cer, 4)})
+    elapsed = time.perf_counter() - start
+    count = len(samples)
+    return {
+        'target_height': target_height,
+        'grayscale': grayscale,
+        'samples': count,
+        'latency_ms': latency_summary(latencies),
+        'throughput': round(len(latencies) / elapsed, 3) if elapsed > 0 else 0.0,
+        'peak_rss_mb': round(peak_rss, 1),
+        'exact_match': round(exact / count, 4) if count else 0.0,
+        'cer': round(cer_total / count, 4) if count else 0.0,
+        'failures': failures,
+    }
+
+
+def run_ocr_benchmark(config, folder, names=None, target_heights=(0,), grayscale=(False,),
+                      frame_height=DEFAULT_FRAME_HEIGHT, repeat=1, warmup=True, factory=create_ocr_lib):
+    """
+    Benchmarks every OCR config entry in names (all entries with a lib by default) over the labeled crops in
+    folder, once per target_height and grayscale combination. Returns a JSON serializable report.
+    """
+    samples = load_labeled_crops(folder)
+    if not samples:
+        raise ValueError(f'No labeled crops found in {folder}')
+    ocr_config = config.get('ocr') or {}
+    configured = [name for name, value in ocr_config.items() if isinstance(value, dict) and value.get('lib')]
+    if names:
+        missing = [name for name in names if name not in configured]
+        if missing:
+            raise ValueError(f'OCR config not found: {", ".join(missing)}, configured: {", ".join(configured)}')
+        configured = list(names)
+    report = {
+        'folder': os.path.abspath(folder),
+        'samples': len(samples),
+        'frame_height': frame_height,
+        'repeat': repeat,
+        'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'libs': [],
+    }
+    for name in configured:
+        lib = ocr_config[name]['lib']
+        entry = {'name': name, 'lib': lib, 'results': []}
+        report['libs'].append(entry)
+        rss_before = rss_mb()
+        try:
+            start = time.perf_counter()
+            ocr_lib = factory(ocr_config[name], config)
+            entry['init_seconds'] = round(time.perf_counter() - start, 3)
+            if warmup:
+                entry['warmup_seconds'] = round(warmup_ocr_lib(lib, ocr_lib, synthetic_ocr_image()), 3)
+            entry['engine_rss_mb'] = round(rss_mb() - rss_before, 1)
+            for height in target_heights:
+                for gray in grayscale:
+                    result = benchmark_setting(lib, ocr_lib, samples, height, gray, frame_height, repeat)
+                    logger.info(f"bench_ocr {name} target_height={height} grayscale={gray} "
+                                f"p50={result['latency_ms']['p50']}ms exact={result['exact_match']:.2%} "
+                                f"cer={result['cer']:.4f}")
+                    entry['results'].append(result)
+        except Exception as e:
+            logger.error(f'bench_ocr {name} failed', e)
+            entry['error'] = str(e)
+    return report
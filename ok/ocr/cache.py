@@ -0,0 +1,88 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+OCR_CACHE_LOG_INTERVAL = 1000
+
+
+class OcrResultCache:
+    """
+    LRU cache of OCR results keyed by the content of the preprocessed crop.
+
+    Boxes are stored relative to the crop, so the same label recognized at another position is a hit as well;
+    callers offset the returned copies to their box. Memory use is estimated per entry and bounded by max_bytes.
+    """
+
+    def __init__(self, max_bytes=16 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self._entries.move_to_end(key)
+            lookups = self.hits + self.misses
+        if lookups % OCR_CACHE_LOG_INTERVAL == 0:
+            stats = self.stats()
+            logger.info(f"ocr cache hit rate {stats['hit_rate']:.2%} entries {stats['entries']} "
+                        f"{stats['bytes'] / 1024:.1f}KB")
+        if entry is None:
+            return None
+        return [box.copy() for box in entry[0]]
+
+    def put(self, key, boxes):
+        boxes = [box.copy() for box in boxes]
+        size = estimate_size(key, boxes)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.bytes -= previous[1]
+            self._entries[key] = (boxes, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.bytes -= evicted_size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+                'bytes': self.bytes,
+            }
+
+
+def ocr_cache_key(image, *params):
+    """Hash of the image bytes, shape and dtype, plus the OCR params that change the result."""
+    image = np.ascontiguousarray(image)
+    digest = hashlib.blake2b(image.data, digest_size=16)
+    digest.update(f'{image.shape}{image.dtype}'.encode())
+    return (digest.digest(),) + params
+
+
+def estimate_size(key, boxes):
+    return 200 + len(key) * 50 + sum(150 + len(box.name or '') * 4 for box in boxes)
@@ -0,0 +1,115 @@
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+
+class OcrColumns:
+    """
+    OCR engine output as parallel arrays: rects (N, 4) float x, y, width, height in the coordinates of the image the
+    engine saw, scores (N,) float and texts (N,) object.
+
+    Thresholding, scaling back to the frame and offsetting by the OCR box are done on the arrays, Box objects are only
+    created by to_boxes() for the detections that survive.
+    """
+
+    def __init__(self, rects, scores, texts):
+        self.rects = rects
+        self.scores = scores
+        self.texts = texts
+
+    def __len__(self):
+        return len(self.scores)
+
+    @classmethod
+    def empty(cls):
+        return cls(np.zeros((0, 4), dtype=np.float64), np.zeros(0, dtype=np.float64), np.zeros(0, dtype=object))
+
+    @classmethod
+    def from_quads(cls, quads, scores, texts):
+        """From four-point polygons, top left first and bottom right third, the layout of the paddle based engines."""
+        if quads is None or len(quads) == 0:
+            return cls.empty()
+        quads = np.asarray(quads, dtype=np.float64).reshape(-1, 4, 2)
+        x, y = quads[:, 0, 0], quads[:, 0, 1]
+        rects = np.stack([x, y, quads[:, 2, 0] - x, quads[:, 2, 1] - y], axis=1)
+        return cls(rects, np.asarray(scores, dtype=np.float64), to_object_array(texts))
+
+    @classmethod
+    def from_corners(cls, corners, scores, texts):
+        """From x1, y1, x2, y2 rectangles."""
+        if corners is None or len(corners) == 0:
+            return cls.empty()
+        corners = np.asarray(corners, dtype=np.float64).reshape(-1, 4)
+        rects = np.concatenate([corners[:, :2], corners[:, 2:] - corners[:, :2]], axis=1)
+        return cls(rects, np.asarray(scores, dtype=np.float64), to_object_array(texts))
+
+    def select(self, mask):
+        return OcrColumns(self.rects[mask], self.scores[mask], self.texts[mask])
+
+    def to_frame(self, threshold=0, scale_factor=1.0, x_offset=0, y_offset=0):
+        """
+        Drops detections below threshold or with an empty rect, maps the rest back to frame coordinates, rounded
+        the same way Box and scale_box round a single box.
+        """
+        rects = np.rint(self.rects)
+        positive = (rects[:, 2] > 0) & (rects[:, 3] > 0)
+        if not positive.all():
+            logger.debug(f'ocr result negative box {self.texts[~positive]} {self.rects[~positive]}')
+        mask = positive & (self.scores >= threshold)
+        rects = rects[mask]
+        if scale_factor != 1:
+            rects = np.rint(rects / scale_factor)
+            rects[:, 2:] = np.maximum(rects[:, 2:], 1)
+        rects[:, 0] += x_offset
+        rects[:, 1] += y_offset
+        return OcrColumns(rects, self.scores[mask], self.texts[mask])
+
+    def to_boxes(self):
+        return [Box(int(x), int(y), int(width), int(height), float(score), text)
+                for (x, y, width, height), score, text in zip(self.rects.tolist(), self.scores, self.texts)]
+
+
+def to_object_array(texts):
+    array = np.empty(len(texts), dtype=object)
+    array[:] = list(texts)
+    return array
+
+
+def rapid_columns(result):
+    return OcrColumns.from_quads(result.boxes, result.scores, result.txts)
+
+
+def onnx_columns(result):
+    lines = result[0] or []
+    return OcrColumns.from_quads([line[0] for line in lines], [line[1][1] for line in lines],
+                                 [line[1][0] for line in lines])
+
+
+def duguang_columns(results):
+    # duguang returns a list of per-image results, each a list of [pos, (text, confidence)] detections
+    lines = [line for image_results in results if image_results for line in image_results]
+    return OcrColumns.from_quads([line[0] for line in lines], [line[1][1] for line in lines],
+                                 [line[1][0] for line in lines])
+
+
+def paddle_columns(results):
+    if not results:
+        return OcrColumns.empty()
+    result = results[0]
+    return OcrColumns.from_corners(result['rec_boxes'], result['rec_scores'], result['rec_texts'])
+
+
+ENGINE_COLUMNS = {
+    'rapidocr': rapid_columns,
+    'onnxocr': onnx_columns,
+    'dgocr': duguang_columns,
+    'paddleocr': paddle_columns,
+}
+
+
+def engine_columns(lib, result):
+    """Maps the raw output of the engine lib to OcrColumns, new engines only need an entry in ENGINE_COLUMNS."""
+    return ENGINE_COLUMNS.get(lib, rapid_columns)(result)
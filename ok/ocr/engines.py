@@ -0,0 +1,82 @@
+from ok.ocr.columns import engine_columns
+from ok.util.logger import Logger, config_logger
+from ok.util.process import is_cuda_12_or_above
+
+logger = Logger.get_logger(__name__)
+
+
+def create_ocr_lib(ocr_config, config):
+    """Creates the engine described by one entry of the ocr config, downloading its models first if needed."""
+    lib = ocr_config.get('lib')
+    to_download = ocr_config.get('download_models')
+    if to_download:
+        models = config.get('download_models').get(to_download)
+        from ok.core.downloads import download_models
+        download_models(models)
+
+    config_params = ocr_config.get('params')
+    if config_params is None:
+        config_params = {}
+    else:
+        config_params = dict(config_params)
+    intra_op_threads = ocr_config.get('intra_op_threads')
+    if lib == 'paddleocr':
+        logger.info('use paddleocr as ocr lib')
+        from paddleocr import PaddleOCR
+        config_params['use_textline_orientation'] = False
+        config_params['use_doc_unwarping'] = False
+        config_params['use_doc_orientation_classify'] = False
+        config_params['device'] = "gpu" if is_cuda_12_or_above() else "cpu"
+        if intra_op_threads:
+            config_params.setdefault('cpu_threads', intra_op_threads)
+        logger.info(f'init PaddleOCR with {config_params}')
+        ocr_lib = PaddleOCR(**config_params)
+        import logging
+        logging.getLogger('ppocr').setLevel(logging.ERROR)
+        config_logger(config)
+    elif lib == 'dgocr':
+        if config_params.get('use_dml', True):
+            config_params['use_dml'] = True
+        from dgocr import DGOCR
+        ocr_lib = DGOCR(**config_params)
+    elif lib == 'onnxocr':
+        from onnxocr.onnx_paddleocr import ONNXPaddleOcr
+        logger.info(f'init onnxocr {config_params}')
+        ocr_lib = ONNXPaddleOcr(use_angle_cls=False,
+                                logger=logger,
+                                use_npu=config_params.get('use_npu', True),
+                                use_openvino=config_params.get('use_openvino', False))
+    elif lib == 'rapidocr':
+        from rapidocr import RapidOCR
+        params = {"Global.use_cls": False, "Global.max_side_len": 100000, "Global.min_side_len": 0,
+                  "EngineConfig.onnxruntime.use_dml": False}
+        if intra_op_threads:
+            params["EngineConfig.onnxruntime.intra_op_num_threads"] = intra_op_threads
+        params.update(config_params)
+        logger.info(f'init rapidocr {params}')
+        ocr_lib = RapidOCR(params=params)
+    else:
+        raise Exception(f'ocr lib not supported: {lib}')
+    if intra_op_threads and lib in ('dgocr', 'onnxocr'):
+        logger.warning(f'intra_op_threads is not supported by {lib}, ignored')
+    logger.info(f'ocr_lib init {ocr_lib} {lib}')
+    return ocr_lib
+
+
+def run_ocr_lib(lib, ocr_lib, image):
+    """Runs the full detect + recognize pipeline through the engine's own entry point, returns its raw output."""
+    if lib == 'paddleocr':
+        return ocr_lib.predict(image)
+    elif lib == 'dgocr':
+        return ocr_lib.run(image)
+    elif lib == 'onnxocr':
+        return ocr_lib.ocr(image)
+    else:
+        return ocr_lib(image, use_det=True, use_cls=False, use_rec=True)
+
+
+def ocr_lines(lib, ocr_lib, image):
+    """Runs the full pipeline, returns (text, confidence, x, y) per detected line."""
+    columns = engine_columns(lib, run_ocr_lib(lib, ocr_lib, image))
+    return [(text, float(score), x, y) for (x, y, _, _), score, text in
+            zip(columns.rects.tolist(), columns.scores, columns.texts)]
@@ -0,0 +1,76 @@
+import threading
+import time
+from contextlib import contextmanager
+
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+
+class OcrLibPool:
+    """
+    Bounded pool of engine instances for one OCR config.
+
+    Instances are created lazily by factory, at most size of them. checkout() hands an instance to exactly one
+    caller until it is given back with checkin(), blocking while all of them are in use, so engines that are not
+    thread safe can still serve concurrent callers. primary() is the first instance, shared without checkout, for
+    callers that keep an engine for their own use.
+    """
+
+    def __init__(self, factory, size=1, name='default'):
+        self.factory = factory
+        self.size = max(1, int(size or 1))
+        self.name = name
+        self._primary = None
+        self._idle = []
+        self._created = 0
+        self._condition = threading.Condition()
+        self.waits = 0
+
+    def primary(self):
+        if self._primary is None:
+            instance = self.checkout()
+            self.checkin(instance)
+        return self._primary
+
+    def checkout(self, timeout=None):
+        deadline = None if timeout is None else time.time() + timeout
+        with self._condition:
+            while not self._idle and self._created >= self.size:
+                self.waits += 1
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    raise TimeoutError(f'no idle {self.name} ocr instance after {timeout}s')
+                self._condition.wait(remaining)
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            instance = self.factory()
+        except Exception:
+            with self._condition:
+                self._created -= 1
+                self._condition.notify()
+            raise
+        with self._condition:
+            if self._primary is None:
+                self._primary = instance
+        logger.info(f'ocr pool {self.name} created instance {self._created}/{self.size}')
+        return instance
+
+    def checkin(self, instance):
+        with self._condition:
+            self._idle.append(instance)
+            self._condition.notify()
+
+    @contextmanager
+    def instance(self, timeout=None):
+        instance = self.checkout(timeout)
+        try:
+            yield instance
+        finally:
+            self.checkin(instance)
+
+    def stats(self) -> dict:
+        with self._condition:
+            return {'size': self.size, 'created': self._created, 'idle': len(self._idle), 'waits': self.waits}
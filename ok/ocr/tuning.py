@@ -0,0 +1,118 @@
+import threading
+
+from ok.util.file import get_relative_path, read_json_file, write_json_file
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+DEFAULT_TUNING_CANDIDATES = (360, 480, 540, 720)
+DEFAULT_TUNING_SAMPLES = 5
+DEFAULT_CONFIDENCE_DROP = 0.05
+TUNING_FILE_NAME = 'ocr_target_height.json'
+
+
+class TargetHeightTuner:
+    """
+    Picks a target_height per named OCR region from the first calls on it, and remembers the choice on disk.
+
+    While a region is being tuned, every call also recognizes the crop at each candidate target_height that would
+    actually downscale it. Once samples calls have seen text, the smallest candidate that returned the same texts as
+    the full resolution crop every time, with a mean confidence no more than confidence_drop lower, is locked in;
+    0 (no resize) when none qualifies. Nothing is locked in before a call has seen text; after that, regions that
+    keep showing no text give up after 3 * samples calls.
+    """
+
+    def __init__(self, path, candidates=DEFAULT_TUNING_CANDIDATES, samples=DEFAULT_TUNING_SAMPLES,
+                 confidence_drop=DEFAULT_CONFIDENCE_DROP):
+        self.path = path
+        self.candidates = sorted(candidates)
+        self.samples = max(1, samples)
+        self.confidence_drop = confidence_drop
+        self._tuned = (read_json_file(path) or {}) if path else {}
+        self._trials = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, value, config_folder):
+        """value is the ocr auto_target_height config, True or a dict of candidates, samples and confidence_drop."""
+        if not value:
+            return None
+        options = value if isinstance(value, dict) else {}
+        return cls(get_relative_path(config_folder, TUNING_FILE_NAME),
+                   candidates=options.get('candidates', DEFAULT_TUNING_CANDIDATES),
+                   samples=options.get('samples', DEFAULT_TUNING_SAMPLES),
+                   confidence_drop=options.get('confidence_drop', DEFAULT_CONFIDENCE_DROP))
+
+    def target_height(self, key):
+        """The tuned target_height of key, None while it is still being tuned."""
+        entry = self._tuned.get(key)
+        return entry['target_height'] if entry is not None else None
+
+    def candidate_heights(self, frame_height):
+        return [height for height in self.candidates if frame_height >= 1.5 * height]
+
+    def record(self, key, reference, reference_latency, results):
+        """
+        Adds one tuning call of key: reference are the boxes found at full resolution, results maps each candidate
+        target_height to (boxes, latency in seconds). Returns the locked in target_height once tuning is done.
+        """
+        with self._lock:
+            if key in self._tuned:
+                return self._tuned[key]['target_height']
+            trial = self._trials.setdefault(key, {'calls': 0, 'samples': 0, 'latency': {0: []},
+                                                  'stable': {height: True for height in results}})
+            trial['calls'] += 1
+            if reference:
+                trial['samples'] += 1
+                trial['latency'][0].append(reference_latency)
+                expected_texts, expected_confidence = summarize(reference)
+                for height, (boxes, latency) in results.items():
+                    trial['latency'].setdefault(height, []).append(latency)
+                    texts, confidence = summarize(boxes)
+                    if texts != expected_texts or confidence < expected_confidence - self.confidence_drop:
+                        trial['stable'][height] = False
+            if results and (not trial['samples'] or
+                            trial['samples'] < self.samples and trial['calls'] < 3 * self.samples):
+                return None
+            del self._trials[key]
+            stable = [height for height, ok in trial['stable'].items() if ok]
+            target_height = min(stable, default=0)
+            self._tuned[key] = {
+                'target_height': target_height,
+                'samples': trial['samples'],
+                'latency_ms': {str(height): round(sum(values) / len(values) * 1000, 2)
+                               for height, values in trial['latency'].items() if values},
+            }
+            tuned = dict(self._tuned)
+        logger.info(f'ocr tuned {key} target_height={target_height} {tuned[key]}')
+        self.save(tuned)
+        return target_height
+
+    def save(self, tuned=None):
+        if not self.path:
+            return
+        try:
+            write_json_file(self.path, tuned if tuned is not None else dict(self._tuned))
+        except Exception as e:
+            logger.error(f'save ocr tuning error {self.path}', e)
+
+    def reset(self, key=None):
+        with self._lock:
+            if key is None:
+                self._tuned.clear()
+                self._trials.clear()
+            else:
+                self._tuned.pop(key, None)
+                self._trials.pop(key, None)
+        self.save()
+
+
+def summarize(boxes):
+    texts = sorted(box.name for box in boxes)
+    confidence = sum(box.confidence for box in boxes) / len(boxes) if boxes else 0.0
+    return texts, confidence
+
+
+def tuning_key(name, lib, frame_height, use_grayscale):
+    """target_height is relative to the frame height, so a region is tuned once per resolution."""
+    return f'{name}|{lib}|{frame_height}|{"gray" if use_grayscale else "color"}'
@@ -0,0 +1,31 @@
+import time
+
+import cv2
+import numpy as np
+
+from ok.ocr.engines import run_ocr_lib
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+DEFAULT_WARMUP_HEIGHT = 720
+
+
+def synthetic_ocr_image(height=0):
+    """A 16:9 BGR image with a few lines of text, the size of a frame resized to target_height."""
+    height = height or DEFAULT_WARMUP_HEIGHT
+    width = round(height * 16 / 9)
+    image = np.full((height, width, 3), 235, dtype=np.uint8)
+    scale = max(0.4, height / 720)
+    thickness = max(1, round(scale * 2))
+    for i, text in enumerate(['OK 0123456789', 'Start Settings Exit', 'Lv. 42  99/100']):
+        y = round(height * (i + 1) / 4)
+        cv2.putText(image, text, (round(width * 0.1), y), cv2.FONT_HERSHEY_SIMPLEX, scale, (20, 20, 20), thickness)
+    return image
+
+
+def warmup_ocr_lib(lib, ocr_lib, image):
+    """Runs one inference with the engine's own entry point, returns the time it took."""
+    start = time.time()
+    run_ocr_lib(lib, ocr_lib, image)
+    return time.time() - start
@@ -34,6 +34,10 @@ class DiagnosisTask(BaseTask):
             self.info['Game Resolution'] = f'{self.frame.shape[1]}x{self.frame.shape[0]}'
             if self.info['Frame Count'] == 1:
                 self.ocr()  # warm up
+                for name, status in self.executor.ocr_status.items():
+                    self.info[f'OCR {name} Startup'] = (
+                        f"init {status.get('init', '-')}s warmup {status.get('warmup', '-')}s"
+                        if status.get('ready') else status.get('error', 'not ready'))
             operation_start = time.time()
             boxes = self.ocr(threshold=0.1)
             ocr_total += time.time() - operation_start
@@ -43,6 +47,17 @@ class DiagnosisTask(BaseTask):
             if self.info['Frame Count'] % 20 == 1:
                 rss, vms, _ = get_current_process_memory_usage()  # We don't care about shm here
                 self.info['Memory'] = f'{round(rss)} MB'
+                frame_cache_stats = self.executor.frame_cache.stats()
+                self.info['Frame Cache Hit Rate'] = (f"{round(frame_cache_stats['hit_rate'] * 100, 2)}% "
+                                                     f"({frame_cache_stats['hits']}/"
+                                                     f"{frame_cache_stats['hits'] + frame_cache_stats['misses']})")
+                if self.executor.ocr_cache is not None:
+                    ocr_cache_stats = self.executor.ocr_cache.stats()
+                    self.info['OCR Cache Hit Rate'] = (f"{round(ocr_cache_stats['hit_rate'] * 100, 2)}% "
+                                                       f"({ocr_cache_stats['entries']} entries)")
+                last_seen_stats = self.executor.feature_set.last_seen_stats() if self.executor.feature_set else None
+                if last_seen_stats and last_seen_stats['hits'] + last_seen_stats['misses']:
+                    self.info['Last Seen Hit Rate'] = f"{round(last_seen_stats['hit_rate'] * 100, 2)}%"
 
             cpu_usage = process.cpu_percent(interval=0)
             cpu_readings.append(cpu_usage)
@@ -1,25 +1,45 @@
 import sys
 import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 
 from ok.core.events import communicate
 from ok.core.notifications import alert_info
 from ok.task.exceptions import FinishedException, TaskDisabledException, WaitFailedException, CaptureException, \
     HotkeyConfigException
 from ok.util.GlobalConfig import basic_options
-from ok.util.logger import Logger, config_logger
-from ok.util.process import is_cuda_12_or_above, prevent_sleeping
+from ok.ocr.cache import OcrResultCache
+from ok.ocr.engines import create_ocr_lib
+from ok.ocr.pool import OcrLibPool
+from ok.ocr.tuning import TargetHeightTuner
+from ok.ocr.warmup import synthetic_ocr_image, warmup_ocr_lib
+from ok.util.frame_cache import FrameCache
+from ok.util.roi_memo import RoiMemo
+from ok.util.logger import Logger
+from ok.util.process import prevent_sleeping
 from ok.util.window import ratio_text_to_number
 
 logger = Logger.get_logger(__name__)
 
+_ocr_worker_thread = threading.local()
+
+
+def _mark_ocr_worker():
+    _ocr_worker_thread.active = True
+
 
 class TaskExecutor:
     _frame: object
+    frame_info: object
+    frame_cache: object
+    roi_memo: object
+    ocr_cache: object
+    ocr_tuner: object
     paused: bool
     pause_start: float
     pause_end_time: float
     _last_frame_time: float
+    _scene_reset_time: float
     wait_until_timeout: float
     device_manager: object
     feature_set: object
@@ -47,6 +67,8 @@ class TaskExecutor:
     lock: object
     _ocr_lib_lock: object
     _ocr_init_thread: object
+    _ocr_worker: object
+    ocr_status: dict
 
     def __init__(self, device_manager,
                  wait_until_timeout=10, wait_until_settle_time=-1,
@@ -54,10 +76,18 @@ class TaskExecutor:
                  ocr_lib=None,
                  config_folder=None, debug=False, global_config=None, ocr_target_height=0, config=None):
         self._frame = None
+        self.frame_info = None
+        self.frame_cache = FrameCache()
+        ocr_config = config.get('ocr') or {}
+        self.roi_memo = RoiMemo.from_config(ocr_config)
+        self.ocr_cache = OcrResultCache(int(ocr_config.get('result_cache_mb', 16) * 1024 * 1024)) \
+            if ocr_config.get('result_cache_mb', 16) else None
+        self.ocr_tuner = TargetHeightTuner.from_config(ocr_config.get('auto_target_height'), config_folder or "config")
         device_manager.executor = self
         self.pause_start = time.time()
         self.pause_end_time = time.time()
         self._last_frame_time = 0
+        self._scene_reset_time = 0
         self.paused = True
         self.config = config
         self.scene = None
@@ -95,6 +125,8 @@ class TaskExecutor:
             self.exit_event.bind_condition(self._wake_condition)
         self._ocr_lib_lock = threading.Lock()
         self._ocr_init_thread = None
+        self._ocr_worker = None
+        self.ocr_status = {}
         self.blur_overlay_processor = None
         if callable(self.config.get('blur_area')):
             from ok.util.blur import BlurOverlayProcessor, DEFAULT_BLUR_ALGORITHM
@@ -119,6 +151,8 @@ class TaskExecutor:
         except:
             logger.info(f'install ocr translations error for {locale_name}')
             self.ocr_po_translation = None
+        if self.ocr_cache is not None:  # cached texts were normalized for the previous locale
+            self.ocr_cache.clear()
 
     @property
     def interaction(self):
@@ -129,80 +163,86 @@ class TaskExecutor:
         return self.device_manager.capture_method
 
     def ocr_lib(self, name="default"):
+        """
+        The first engine of the named OCR config, shared without checkout. Only for inspecting the engine, run
+        inference through ocr_instance() so no two threads use one engine at once.
+        """
+        return self.ocr_pool(name).primary()
+
+    def ocr_pool(self, name="default"):
         if name not in self._ocr_lib:
             with self._ocr_lib_lock:
                 if name not in self._ocr_lib:
-                    self._ocr_lib[name] = self._create_ocr_lib(name)
+                    pool_size = self.config.get('ocr').get(name).get('pool_size', 1)
+                    self._ocr_lib[name] = OcrLibPool(lambda: self._create_ocr_lib(name), pool_size, name)
         return self._ocr_lib[name]
 
+    def ocr_instance(self, name="default"):
+        """Checks out an engine of the named OCR config for one inference, use as a context manager."""
+        return self.ocr_pool(name).instance()
+
+    def submit_ocr(self, fn, *args, **kwargs):
+        """Runs fn on the background OCR worker, one thread per instance of the default OCR pool."""
+        if self._ocr_worker is None:
+            with self._ocr_lib_lock:
+                if self._ocr_worker is None:
+                    workers = self.config.get('ocr').get('default').get('pool_size', 1)
+                    self._ocr_worker = ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix='OCRWorker',
+                                                          initializer=_mark_ocr_worker)
+        return self._ocr_worker.submit(fn, *args, **kwargs)
+
+    @staticmethod
+    def on_ocr_worker():
+        """True on the background OCR worker threads, which must not sleep, capture or reset the scene."""
+        return getattr(_ocr_worker_thread, 'active', False)
+
     def init_default_ocr(self):
+        """
+        Creates every configured OCR lib in parallel on a background thread and warms each one up with an inference on
+        a synthetic image at its target_height, so the first ocr() call doesn't pay for model loading and graph
+        optimization. Progress and timings are kept in ocr_status.
+        """
         ocr_config = self.config.get('ocr')
         if not ocr_config:
             return
         default_ocr = ocr_config.get('default')
         if not default_ocr or not default_ocr.get('lib'):
             return
-        self._ocr_init_thread = threading.Thread(target=self._init_default_ocr, name="DefaultOCRInit", daemon=True)
+        names = [name for name, lib_config in ocr_config.items()
+                 if isinstance(lib_config, dict) and lib_config.get('lib')]
+        self.ocr_status = {name: {'ready': False} for name in names}
+        self._ocr_init_thread = threading.Thread(target=self._init_ocr_libs, args=(names,), name="OCRInit",
+                                                 daemon=True)
         self._ocr_init_thread.start()
 
-    def _init_default_ocr(self):
+    def _init_ocr_libs(self, names):
+        start = time.time()
+        logger.info(f'start init ocr libs {names}')
+        with ThreadPoolExecutor(max_workers=len(names), thread_name_prefix='OCRInit') as pool:
+            list(pool.map(self._init_ocr_lib, names))
+        ready = [name for name in names if self.ocr_status[name]['ready']]
+        logger.info(f'ocr libs ready {ready}/{names}, cost: {time.time() - start:.2f}s')
+
+    def _init_ocr_lib(self, name):
+        status = self.ocr_status[name]
         start = time.time()
         try:
-            logger.info('start init default ocr')
-            self.ocr_lib()
-            logger.info(f'default ocr init end, cost: {time.time() - start:.2f}s')
+            self.ocr_lib(name)
+            status['init'] = round(time.time() - start, 3)
+            ocr_config = self.config.get('ocr').get(name)
+            if ocr_config.get('warmup', True):
+                target_height = ocr_config.get('target_height', self.ocr_target_height)
+                with self.ocr_instance(name) as instance:
+                    status['warmup'] = round(
+                        warmup_ocr_lib(ocr_config.get('lib'), instance, synthetic_ocr_image(target_height)), 3)
+            status['ready'] = True
+            logger.info(f'ocr {name} ready, init: {status["init"]:.2f}s warmup: {status.get("warmup", 0):.2f}s')
         except Exception as e:
-            logger.error(f'init default ocr error, cost: {time.time() - start:.2f}s', e)
+            status['error'] = str(e)
+            logger.error(f'init ocr {name} error, cost: {time.time() - start:.2f}s', e)
 
     def _create_ocr_lib(self, name):
-        ocr_config = self.config.get('ocr').get(name)
-        lib = ocr_config.get('lib')
-        to_download = ocr_config.get('download_models')
-        if to_download:
-            models = self.config.get('download_models').get(to_download)
-            from ok.core.downloads import download_models
-            download_models(models)
-
-        config_params = ocr_config.get('params')
-        if config_params is None:
-            config_params = {}
-        else:
-            config_params = dict(config_params)
-        if lib == 'paddleocr':
-            logger.info('use paddleocr as ocr lib')
-            from paddleocr import PaddleOCR
-            config_params['use_textline_orientation'] = False
-            config_params['use_doc_unwarping'] = False
-            config_params['use_doc_orientation_classify'] = False
-            config_params['device'] = "gpu" if is_cuda_12_or_above() else "cpu"
-            logger.info(f'init PaddleOCR with {config_params}')
-            ocr_lib = PaddleOCR(**config_params)
-            import logging
-            logging.getLogger('ppocr').setLevel(logging.ERROR)
-            config_logger(self.config)
-        elif lib == 'dgocr':
-            if config_params.get('use_dml', True):
-                config_params['use_dml'] = True
-            from dgocr import DGOCR
-            ocr_lib = DGOCR(**config_params)
-        elif lib == 'onnxocr':
-            from onnxocr.onnx_paddleocr import ONNXPaddleOcr
-            logger.info(f'init onnxocr {config_params}')
-            ocr_lib = ONNXPaddleOcr(use_angle_cls=False,
-                                    logger=logger,
-                                    use_npu=config_params.get('use_npu', True),
-                                    use_openvino=config_params.get('use_openvino', False))
-        elif lib == 'rapidocr':
-            from rapidocr import RapidOCR
-            params = {"Global.use_cls": False, "Global.max_side_len": 100000, "Global.min_side_len": 0,
-                      "EngineConfig.onnxruntime.use_dml": False}
-            params.update(config_params)
-            logger.info(f'init rapidocr {params}')
-            ocr_lib = RapidOCR(params=params)
-        else:
-            raise Exception(f'ocr lib not supported: {lib}')
-        logger.info(f'ocr_lib init {ocr_lib} {lib}')
-        return ocr_lib
+        return create_ocr_lib(self.config.get('ocr').get(name), self.config)
 
     def nullable_frame(self):
         return self._frame
@@ -248,6 +288,7 @@ class TaskExecutor:
                 and self.interaction is not None and self.interaction.should_capture())
 
     def next_frame(self, time_out=6):
+        after = self._scene_reset_time
         self.reset_scene()
         start = time.time()
         while not self.exit_event.is_set():
@@ -255,12 +296,21 @@ class TaskExecutor:
             if time_out is not None and time.time() - start >= time_out:
                 return None
             if self.can_capture():
-                frame = self.method.get_frame()
+                if getattr(self.method, 'producer', False):
+                    wait = 1 if time_out is None else min(1, max(0, time_out - (time.time() - start)))
+                    frame = self.method.latest_frame(after, timeout=wait)
+                    if frame is None:
+                        continue
+                else:
+                    frame = self.method.get_frame()
                 if frame is not None:
                     height, width = frame.shape[:2]
                     if height <= 0 or width <= 0:
                         logger.warning(f"captured wrong size frame: {width}x{height}")
                     self._frame = frame
+                    frame_info = getattr(self.method, 'frame_info', None)
+                    self.frame_info = frame_info(frame) if frame_info is not None else None
+                    self._reset_frame_cache(frame, self.frame_info.frame_id if self.frame_info is not None else None)
                     self._last_frame_time = time.time()
                     if self.blur_overlay_processor:
                         self.blur_overlay_processor.next_frame(frame)
@@ -448,10 +498,16 @@ class TaskExecutor:
     def reset_scene(self, check_enabled=True):
         if check_enabled:
             self.check_enabled()
+        self._scene_reset_time = time.time()
         self._frame = None
+        self.frame_info = None
+        self._reset_frame_cache()
         if self.scene:
             self.scene.reset()
 
+    def _reset_frame_cache(self, frame=None, frame_id=None):
+        self.frame_cache.reset(frame, frame_id)
+
     def enqueue_onetime_task(self, task):
         if task not in self.onetime_tasks:
             self._wake_executor()
@@ -648,6 +704,9 @@ class TaskExecutor:
                 self.interaction.on_destroy()
             except Exception as error:
                 logger.error(f'interaction on_destroy failed: {error}')
+        ocr_worker = getattr(self, '_ocr_worker', None)
+        if ocr_worker is not None:
+            ocr_worker.shutdown(wait=False, cancel_futures=True)
 
     def request_destroy(self):
         """Run cleanup away from the GUI close event when needed."""
@@ -1,19 +1,27 @@
 import re
 import threading
 import time
+from concurrent.futures import Future
+from functools import lru_cache
 from typing import List
 import cv2
+import numpy as np
 from numpy import ndarray
 
 from ok.core.events import communicate
 from ok.core.icons import Icon
 from ok.feature.Box import find_boxes_by_name, find_boxes_within_boundary, Box, find_box_by_name, relative_box, \
     sort_boxes, find_highest_confidence_box
-from ok.feature.FeatureSet import adjust_coordinates, resize_image, scale_box, join_list_elements
-from ok.task.exceptions import HotkeyConfigException
+from ok.feature.FeatureSet import adjust_coordinates, resize_image, join_list_elements
+from ok.ocr.cache import ocr_cache_key
+from ok.ocr.columns import duguang_columns, onnx_columns, paddle_columns, rapid_columns
+from ok.ocr.tuning import tuning_key
+from ok.task.exceptions import HotkeyConfigException, WaitFailedException
 from ok.util.color import calculate_color_percentage
 from ok.util.config import Config
 from ok.util.explorer import reveal_in_explorer
+from ok.util.frame_cache import to_gray
+from ok.util.roi_memo import copy_boxes
 from ok.util.handler import Handler
 from ok.util.logger import Logger
 from ok.util.process import create_shortcut
@@ -586,7 +594,8 @@ class FindFeature(ExecutorOperation):
                      use_gray_scale=False, x=-1, y=-1, to_x=-1, to_y=-1, width=-1, height=-1, box=None, canny_lower=0,
                      canny_higher=0, frame_processor=None, template=None, match_method=cv2.TM_CCOEFF_NORMED,
                      screenshot=False,
-                     mask_function=None, frame=None, limit=0, target_height=0) -> List[Box]:
+                     mask_function=None, frame=None, limit=0, target_height=0, pyramid=False,
+                     last_seen=False, multi_scale=False, reuse=False) -> List[Box]:
         image = frame if frame is not None else self.executor.frame
         if image is None:
             return []
@@ -600,7 +609,8 @@ class FindFeature(ExecutorOperation):
                                                       canny_lower=canny_lower, canny_higher=canny_higher,
                                                       frame_processor=frame_processor,
                                                       template=template, mask_function=mask_function, limit=limit,
-                                                      target_height=target_height)
+                                                      target_height=target_height, pyramid=pyramid,
+                                                      last_seen=last_seen, multi_scale=multi_scale, reuse=reuse)
 
     def get_feature_by_name(self, name):
         if self.executor.feature_set:
@@ -650,12 +660,13 @@ class FindFeature(ExecutorOperation):
     def wait_feature(self, feature, horizontal_variance=0, vertical_variance=0, threshold=0,
                      time_out=0, pre_action=None, post_action=None, use_gray_scale=False, box=None,
                      raise_if_not_found=False, canny_lower=0, canny_higher=0, settle_time=-1,
-                     frame_processor=None, target_height=0):
+                     frame_processor=None, target_height=0, last_seen=False, multi_scale=False, reuse=False):
         return self.wait_until(
             lambda: self.find_one(feature, horizontal_variance, vertical_variance, threshold,
                                   use_gray_scale=use_gray_scale, box=box,
                                   canny_lower=canny_lower, canny_higher=canny_higher,
-                                  frame_processor=frame_processor, target_height=target_height),
+                                  frame_processor=frame_processor, target_height=target_height,
+                                  last_seen=last_seen, multi_scale=multi_scale, reuse=reuse),
             time_out=time_out,
             pre_action=pre_action,
             post_action=post_action,
@@ -684,13 +695,15 @@ class FindFeature(ExecutorOperation):
     def find_one(self, feature_name=None, horizontal_variance=0, vertical_variance=0, threshold=0,
                  use_gray_scale=False, box=None, canny_lower=0, canny_higher=0,
                  frame_processor=None, template=None, mask_function=None, frame=None, match_method=cv2.TM_CCOEFF_NORMED,
-                 screenshot=False, limit=1, target_height=0) -> Box:
+                 screenshot=False, limit=1, target_height=0, pyramid=False, last_seen=False,
+                 multi_scale=False, reuse=False) -> Box:
         boxes = self.find_feature(feature_name=feature_name, horizontal_variance=horizontal_variance,
                                   vertical_variance=vertical_variance, threshold=threshold,
                                   use_gray_scale=use_gray_scale, box=box, canny_lower=canny_lower,
                                   canny_higher=canny_higher, match_method=match_method, screenshot=screenshot,
                                   frame_processor=frame_processor, template=template, mask_function=mask_function,
-                                  frame=frame, limit=limit, target_height=target_height)
+                                  frame=frame, limit=limit, target_height=target_height, pyramid=pyramid,
+                                  last_seen=last_seen, multi_scale=multi_scale, reuse=reuse)
         if len(boxes) > 0:
             if len(boxes) > 1:
                 logger.warning(f"find_one:found {feature_name} too many {len(boxes)}")
@@ -708,11 +721,8 @@ class FindFeature(ExecutorOperation):
                                frame_processor=None, mask_function=None):
         max_conf = 0
         max_box = None
-        for feature_name in to_find:
-            feature = self.find_one(feature_name, box=box,
-                                    threshold=threshold, use_gray_scale=use_gray_scale,
-                                    canny_lower=canny_lower, canny_higher=canny_higher,
-                                    frame_processor=frame_processor, mask_function=mask_function)
+        for feature in self._find_each_in_box(box, to_find, threshold, use_gray_scale, canny_lower, canny_higher,
+                                              frame_processor, mask_function):
             if feature and feature.confidence > max_conf:
                 max_conf = feature.confidence
                 max_box = feature
@@ -722,15 +732,93 @@ class FindFeature(ExecutorOperation):
     def find_first_match_in_box(self, box, to_find, threshold, use_gray_scale=False,
                                 canny_lower=0, canny_higher=0,
                                 frame_processor=None, mask_function=None):
-        for feature_name in to_find:
-            feature = self.find_one(feature_name, box=box,
-                                    threshold=threshold, use_gray_scale=use_gray_scale,
-                                    canny_lower=canny_lower, canny_higher=canny_higher,
-                                    frame_processor=frame_processor, mask_function=mask_function)
+        for feature in self._find_each_in_box(box, to_find, threshold, use_gray_scale, canny_lower, canny_higher,
+                                              frame_processor, mask_function):
             if feature:
                 logger.debug(f'find_first_match_in_box: {feature}')
                 return feature
 
+    def _find_each_in_box(self, box, to_find, threshold, use_gray_scale, canny_lower, canny_higher,
+                          frame_processor, mask_function):
+        frame = self.frame
+        if frame is None:
+            return []
+        if box and isinstance(box, str):
+            box = self.get_box_by_name(box)
+        feature_set = self.executor.feature_set
+        feature_set.check_size(frame)
+        for feature_name in to_find:
+            feature_set.ensure_feature(feature_name)
+        return feature_set.map_matches(
+            lambda feature_name: self.find_one(feature_name, box=box,
+                                               threshold=threshold, use_gray_scale=use_gray_scale,
+                                               canny_lower=canny_lower, canny_higher=canny_higher,
+                                               frame_processor=frame_processor, mask_function=mask_function,
+                                               frame=frame), to_find)
+
+
+OCR_STITCH_PADDING = 24
+
+
+@lru_cache(maxsize=1024)
+def translate_pattern(translation, pattern):
+    """The pattern with its source translated, compiled once per translation and original pattern object."""
+    translated_pattern_string = translation.gettext(pattern.pattern)
+    if isinstance(translated_pattern_string, str):
+        return re.compile(translated_pattern_string, pattern.flags)
+    logger.warning(
+        f"Warning: Translation failed for pattern: {pattern.pattern} {translated_pattern_string}. Keeping original.")
+    return pattern
+
+
+@lru_cache(maxsize=8192)
+def normalize_ocr_text(text, translation=None, simplify=False):
+    """Traditional to simplified Chinese conversion, strip and translation of a recognized text, memoized."""
+    if simplify:
+        converters = opencc_converters()
+        if converters is not None:
+            jp2t, t2s = converters
+            text = t2s.convert(jp2t.convert(text))
+    text = text.strip()
+    if translation is not None:
+        fix = translation.gettext(text)
+        if fix != text:
+            text = fix
+        else:
+            no_space = text.replace(" ", "")
+            fix = translation.gettext(no_space)
+            if fix != no_space:
+                text = fix
+    return text
+
+
+@lru_cache(maxsize=1)
+def opencc_converters():
+    try:
+        from opencc import OpenCC
+        return OpenCC('jp2t'), OpenCC('t2s')
+    except ImportError:
+        logger.error("opencc is not installed, but auto_simplify is enabled.")
+        return None
+
+
+def stitch_crops(crops, padding=OCR_STITCH_PADDING):
+    """
+    Stacks crops vertically on one black canvas, separated by padding rows so the detector keeps them apart.
+
+    Returns the canvas and the y offset of each crop in it.
+    """
+    width = max(crop.shape[1] for crop in crops)
+    height = sum(crop.shape[0] for crop in crops) + padding * (len(crops) + 1)
+    canvas = np.zeros((height, width + 2 * padding) + crops[0].shape[2:], dtype=crops[0].dtype)
+    offsets = []
+    y = padding
+    for crop in crops:
+        canvas[y:y + crop.shape[0], padding:padding + crop.shape[1]] = crop
+        offsets.append(y)
+        y += crop.shape[0] + padding
+    return canvas, offsets
+
 
 class OCR(FindFeature):
     """
@@ -748,7 +836,7 @@ class OCR(FindFeature):
 
     def ocr(self, x=0, y=0, to_x=1, to_y=1, match=None, width=0, height=0, box=None, name=None,
             threshold=0, frame=None, target_height=0, use_grayscale=False, log=False,
-            screenshot=False, frame_processor=None, lib='default'):
+            screenshot=False, frame_processor=None, lib='default', reuse=False, detect=True):
         """
         Performs OCR on a region of an image.
 
@@ -764,9 +852,13 @@ class OCR(FindFeature):
             name (str): A name for the region.
             threshold (double): The confidence threshold for OCR results.
             frame (np.ndarray): The image frame to perform OCR on.
-            target_height (int): The target height for resizing the image before OCR.
+            target_height (int): The target height for resizing the image before OCR. With ocr auto_target_height
+                enabled, 0 on a named region uses the target height tuned for it.
             use_grayscale (bool): Whether to convert the image to grayscale before OCR.
             log (bool): Whether to log the OCR results.
+            reuse (bool): Return the previous result of the same call while the region's pixels are unchanged.
+            detect (bool): False skips text detection for single-line fields, the region is sent straight to the
+                recognizer and the result is one Box covering it.
 
         Returns:
             list: A list of Box objects representing the detected text regions, sorted by y-coordinate.
@@ -777,7 +869,7 @@ class OCR(FindFeature):
             return []
         if box and isinstance(box, str):
             box = self.get_box_by_name(box)
-        if self.executor.paused:
+        if self.executor.paused and not self.executor.on_ocr_worker():
             self.executor.sleep(1)
         if threshold == 0:
             threshold = self.ocr_default_threshold
@@ -786,17 +878,48 @@ class OCR(FindFeature):
         frame_height, frame_width = image.shape[0], image.shape[1]
         if box is None:
             box = relative_box(frame_width, frame_height, x, y, to_x, to_y, width, height, name)
+        region_name = box.name if box is not None else None
         if box is not None:
             image = image[box.y:box.y + box.height, box.x:box.x + box.width]
             if not box.name and match:
                 box.name = str(match)
+        roi = image
         if use_grayscale:
-            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-
+            image = to_gray(image)
+
+        tuner = getattr(self.executor, 'ocr_tuner', None)
+        tune_key = None
+        if tuner is not None and region_name and target_height == 0 and detect and frame_processor is None:
+            tune_key = tuning_key(region_name, lib, frame_height, use_grayscale)
+            tuned_height = tuner.target_height(tune_key)
+            if tuned_height is not None:
+                target_height = tuned_height
+                tune_key = None
+        full_image = image
         image, scale_factor = resize_image(image, frame_height, target_height)
         if frame_processor is not None:
+            if not image.flags.writeable:
+                image = image.copy()
             image = frame_processor(image)
-        detected_boxes, ocr_boxes = self.ocr_fun(lib)(box, image, match, scale_factor, threshold, lib)
+        if detect:
+            ocr_fun = self.ocr_fun(lib)
+        else:
+            ocr_fun = self.recognize_only
+        if getattr(self.executor, 'ocr_cache', None) is not None:
+            ocr_fun = self._cached_ocr_fun(ocr_fun, target_height, detect)
+        ocr_start = time.time()
+        if reuse:
+            key = ('ocr', lib, (box.x, box.y, box.width, box.height) if box else None,
+                   tuple(match) if isinstance(match, list) else match, threshold, target_height,
+                   bool(use_grayscale), frame_processor, detect)
+            detected_boxes, ocr_boxes = self.executor.roi_memo.get_or_compute(
+                key, roi, lambda: ocr_fun(box, image, match, scale_factor, threshold, lib),
+                copy_result=lambda result: (copy_boxes(result[0]), copy_boxes(result[1])))
+        else:
+            detected_boxes, ocr_boxes = ocr_fun(box, image, match, scale_factor, threshold, lib)
+        if tune_key is not None:
+            self._tune_target_height(tuner, tune_key, full_image, frame_height, threshold, lib, ocr_boxes,
+                                     time.time() - ocr_start)
 
         communicate.emit_draw_box("ocr" + join_list_elements(name), detected_boxes, "red")
         communicate.emit_draw_box("ocr_zone" + join_list_elements(name), [box] if box else [],
@@ -817,6 +940,163 @@ class OCR(FindFeature):
             level(f'ocr detected but no match: {match} {ocr_boxes}')
         return sort_boxes(detected_boxes)
 
+    def _tune_target_height(self, tuner, key, image, frame_height, threshold, lib, reference, reference_latency):
+        """Runs one tuning sample of a named region: recognizes image again at every candidate target_height."""
+        heights = tuner.candidate_heights(frame_height)
+        if not reference and heights:
+            return  # nothing to compare the candidates against until the region shows text
+        ocr_fun = self.ocr_fun(lib)
+        results = {}
+        for height in heights:
+            start = time.time()
+            resized, scale_factor = resize_image(image, frame_height, height)
+            _, boxes = ocr_fun(None, resized, None, scale_factor, threshold, lib)
+            results[height] = (boxes, time.time() - start)
+        tuner.record(key, reference, reference_latency, results)
+
+    def ocr_async(self, *args, frame=None, **kwargs) -> Future:
+        """
+        Runs ocr() on the background OCR worker and returns a Future of its result.
+
+        The frame is taken now (the current frame unless one is passed in), so the task can keep clicking, sleeping or
+        capturing while inference runs. Takes the same arguments as ocr(). Pause and enabled are checked here, on the
+        calling thread, the worker never touches the executor's scene.
+        """
+        self.executor.check_enabled()
+        if frame is None:
+            frame = self.executor.frame
+        if isinstance(kwargs.get('box'), str):
+            kwargs['box'] = self.get_box_by_name(kwargs['box'])
+        return self.executor.submit_ocr(self.ocr, *args, frame=frame, **kwargs)
+
+    def ocr_many(self, boxes, match=None, threshold=0, frame=None, target_height=0, use_grayscale=False, log=False,
+                 lib='default', detect=True):
+        """
+        Performs OCR on several regions of the same frame with one inference call.
+
+        The crops are stitched into one padded canvas, recognized once, and every detection is mapped back to the
+        region it came from. With detect=False the crops are sent to the recognizer as one batch instead and each
+        region yields at most one Box covering it.
+
+        Args:
+            boxes (List[Box | str]): The regions to recognize, Box objects or box names.
+            match: Same as in ocr(), applied to each region's results.
+            threshold (double): The confidence threshold for OCR results.
+            frame (np.ndarray): The image frame to perform OCR on.
+            target_height (int): The target height for resizing the canvas before OCR.
+            use_grayscale (bool): Whether to convert the crops to grayscale before OCR.
+            log (bool): Whether to log the OCR results.
+            detect (bool): False skips text detection, see ocr().
+
+        Returns:
+            List[List[Box]]: The sorted detections of each region, in the order of boxes.
+        """
+        image = frame if frame is not None else self.executor.frame
+        if image is None or not boxes:
+            return [[] for _ in boxes]
+        if self.executor.paused:
+            self.executor.sleep(1)
+        if threshold == 0:
+            threshold = self.ocr_default_threshold
+        start = time.time()
+        match = self.fix_match_regex(match)
+        boxes = [self.get_box_by_name(box) if isinstance(box, str) else box for box in boxes]
+        crops = [image[box.y:box.y + box.height, box.x:box.x + box.width, :3] for box in boxes]
+        if use_grayscale:
+            crops = [to_gray(crop) for crop in crops]
+        if not detect:
+            crops = [resize_image(crop, image.shape[0], target_height)[0] for crop in crops]
+            recognized = self.recognize(boxes, crops, threshold, lib)
+            results = [[recognized_box] if recognized_box else [] for recognized_box in recognized]
+            return self._finish_ocr_many(boxes, results, match, log, start, f'{len(crops)} crops')
+        canvas, offsets = stitch_crops(crops)
+        canvas, scale_factor = resize_image(canvas, image.shape[0], target_height)
+        _, ocr_boxes = self.ocr_fun(lib)(None, canvas, None, scale_factor, threshold, lib)
+
+        results = [[] for _ in boxes]
+        for detected_box in ocr_boxes:
+            center_y = detected_box.y + detected_box.height / 2
+            for i, (box, crop, offset) in enumerate(zip(boxes, crops, offsets)):
+                if offset <= center_y < offset + crop.shape[0]:  # crops are clipped at the frame edge
+                    detected_box.x += box.x - OCR_STITCH_PADDING
+                    detected_box.y += box.y - offset
+                    results[i].append(detected_box)
+                    break
+        return self._finish_ocr_many(boxes, results, match, log, start,
+                                     f'canvas: {canvas.shape} scale_factor: {scale_factor:.2f}')
+
+    def _finish_ocr_many(self, boxes, results, match, log, start, details):
+        for i, box in enumerate(boxes):
+            if match is not None:
+                results[i] = find_boxes_by_name(results[i], match)
+            results[i] = sort_boxes(results[i])
+            communicate.emit_draw_box("ocr" + join_list_elements(box.name), results[i], "red")
+            communicate.emit_draw_box("ocr_zone" + join_list_elements(box.name), [box], "blue")
+        if log:
+            logger.info(f"ocr_many {len(boxes)} zones found result: {results} time: {(time.time() - start):.2f} "
+                        f"{details}")
+        return results
+
+    def _cached_ocr_fun(self, ocr_fun, target_height, detect):
+        """Wraps an ocr_fun so identical preprocessed crops are answered from executor.ocr_cache."""
+
+        def cached_ocr_fun(box, image, match, scale_factor, threshold, lib):
+            ocr_cache = self.executor.ocr_cache
+            key = ocr_cache_key(image, lib, threshold, target_height, scale_factor, detect)
+            crop_boxes = ocr_cache.get(key)
+            if crop_boxes is None:
+                _, crop_boxes = ocr_fun(None, image, None, scale_factor, threshold, lib)
+                ocr_cache.put(key, crop_boxes)
+            ocr_boxes = [crop_box.copy(x_offset=box.x, y_offset=box.y) if box is not None else crop_box.copy()
+                         for crop_box in crop_boxes]
+            detected_boxes = ocr_boxes
+            if match is not None:
+                detected_boxes = find_boxes_by_name(detected_boxes, match)
+            return detected_boxes, ocr_boxes
+
+        return cached_ocr_fun
+
+    def recognize_only(self, box, image, match, scale_factor, threshold, lib):
+        """ocr_fun compatible adapter that skips detection, the recognized text covers the whole box."""
+        if box is None:
+            box = Box(0, 0, round(image.shape[1] / scale_factor), round(image.shape[0] / scale_factor))
+        recognized_box = self.recognize([box], [image], threshold, lib)[0]
+        detected_boxes = [recognized_box] if recognized_box else []
+        ocr_boxes = detected_boxes
+        if match is not None:
+            detected_boxes = find_boxes_by_name(detected_boxes, match)
+        return detected_boxes, ocr_boxes
+
+    def recognize(self, boxes, images, threshold, lib):
+        """
+        Recognition-only OCR of images in one recognizer call.
+
+        Returns one Box per image covering the matching entry of boxes, or None when nothing was recognized above
+        threshold.
+        """
+        recognize_fun = self.recognize_fun(lib)
+        results = recognize_fun(images, lib)
+        recognized = []
+        for box, image, (text, confidence) in zip(boxes, images, results):
+            if text and confidence >= threshold:
+                if box is None:
+                    box = Box(0, 0, image.shape[1], image.shape[0])
+                recognized.append(Box(box.x, box.y, box.width, box.height, float(confidence), text))
+            else:
+                recognized.append(None)
+        if recognize_fun != self.detect_and_join:  # the full pipeline already fixed its texts
+            self.fix_texts([recognized_box for recognized_box in recognized if recognized_box])
+        return recognized
+
+    def recognize_fun(self, lib):
+        lib_name = self.executor.config.get('ocr').get(lib).get('lib')
+        if lib_name == 'onnxocr':
+            return self.onnx_recognize
+        elif lib_name in ('paddleocr', 'dgocr'):
+            return self.detect_and_join
+        else:
+            return self.rapid_recognize
+
     def ocr_fun(self, lib):
         lib_name = self.executor.config.get('ocr').get(lib).get('lib')
         if lib_name == 'paddleocr':
@@ -829,59 +1109,27 @@ class OCR(FindFeature):
             return self.rapid_ocr
 
     def fix_match_regex(self, match):
-        if match and self.executor.ocr_po_translation:
+        translation = self.executor.ocr_po_translation
+        if match and translation:
             if not isinstance(match, list):
                 match = [match]
-            for i in range(len(match)):
-                if isinstance(match[i], re.Pattern):
-                    original_pattern_object = match[i]
-                    original_pattern_string = original_pattern_object.pattern
-                    original_flags = original_pattern_object.flags
-
-                    # 2. Translate the ORIGINAL PATTERN STRING
-                    translated_pattern_string = self.executor.ocr_po_translation.gettext(original_pattern_string)
-                    # logger.debug(f'translate regex {original_pattern_string} {translated_pattern_string}')
-                    if isinstance(translated_pattern_string, str):
-                        match[i] = re.compile(translated_pattern_string, original_flags)
-                    else:
-                        logger.warning(
-                            f"Warning: Translation failed for pattern: {original_pattern_string} {translated_pattern_string}. Keeping original.")
+            match = [translate_pattern(translation, pattern) if isinstance(pattern, re.Pattern) else pattern
+                     for pattern in match]
         return match
 
     def fix_texts(self, detected_boxes):
         ocr_config = self.executor.config.get('ocr', {})
-
         auto_simplify = False
         if isinstance(ocr_config, dict):
             auto_simplify = ocr_config.get('auto_simplify', False)
-
+        simplify = False
         if auto_simplify:
             locale = self.executor.locale
             locale_name = locale.name() if hasattr(locale, "name") else str(locale)
-            if locale_name.startswith('zh_TW') or locale_name.startswith('zh_HK') or locale_name.startswith('zh_MO'):
-                try:
-                    from opencc import OpenCC
-                    if not hasattr(self, '_cc_jp2t'):
-                        self._cc_jp2t = OpenCC('jp2t')
-                        self._cc_t2s = OpenCC('t2s')
-
-                    for detected_box in detected_boxes:
-                        t_name = self._cc_jp2t.convert(detected_box.name)
-                        detected_box.name = self._cc_t2s.convert(t_name)
-                except ImportError:
-                    logger.error("opencc is not installed, but auto_simplify is enabled.")
-
+            simplify = locale_name.startswith(('zh_TW', 'zh_HK', 'zh_MO'))
+        translation = self.executor.ocr_po_translation
         for detected_box in detected_boxes:
-            detected_box.name = detected_box.name.strip()
-            if self.executor.ocr_po_translation is not None:
-                fix = self.executor.ocr_po_translation.gettext(detected_box.name)
-                if fix != detected_box.name:
-                    detected_box.name = fix
-                else:
-                    no_space = detected_box.name.replace(" ", "")
-                    fix = self.executor.ocr_po_translation.gettext(no_space)
-                    if fix != no_space:
-                        detected_box.name = fix
+            detected_box.name = normalize_ocr_text(detected_box.name, translation, simplify)
             if fix := self.executor.text_fix.get(detected_box.name):
                 logger.debug(f'text_fixed {detected_box.name} -> {fix}')
                 detected_box.name = fix
@@ -895,10 +1143,52 @@ class OCR(FindFeature):
         :param fix: A dictionary mapping incorrect OCR text to correct text. 映射错误 OCR 文本到正确文本的字典。
         """
         self.executor.text_fix.update(fix)
+        if getattr(self.executor, 'ocr_cache', None) is not None:
+            self.executor.ocr_cache.clear()
+
+    def rapid_recognize(self, images, lib):
+        try:
+            with self.executor.ocr_instance(lib) as ocr_lib:
+                text_rec = getattr(ocr_lib, 'text_rec', None)
+                if text_rec is not None and len(images) > 1:
+                    from rapidocr.ch_ppocr_rec import TextRecInput
+                    # the recognizer expects BGR, ocr_lib() converts grayscale itself but text_rec does not
+                    images = [cv2.cvtColor(image, cv2.COLOR_GRAY2BGR) if image.ndim == 2 else image
+                              for image in images]
+                    result = text_rec(TextRecInput(img=images))
+                    return list(zip(result.txts, result.scores))
+                results = []
+                for image in images:
+                    result = ocr_lib(image, use_det=False, use_cls=False, use_rec=True)
+                    results.append((result.txts[0], result.scores[0]) if result.txts else ('', 0))
+                return results
+        except Exception as e:
+            logger.error('rapid_recognize_exception', e)
+            raise e
+
+    def onnx_recognize(self, images, lib):
+        try:
+            with self.executor.ocr_instance(lib) as ocr_lib:
+                result = ocr_lib.ocr(list(images), det=False, rec=True, cls=False)
+        except Exception as e:
+            logger.error('onnx_recognize_exception', e)
+            raise e
+        return [(text, confidence) for text, confidence in result[0]]
+
+    def detect_and_join(self, images, lib):
+        """Engines without a recognizer-only entry point run the full pipeline and join the lines."""
+        results = []
+        for image in images:
+            _, ocr_boxes = self.ocr_fun(lib)(None, image, None, 1, 0, lib)
+            ocr_boxes = sort_boxes(ocr_boxes)
+            confidence = min((ocr_box.confidence for ocr_box in ocr_boxes), default=0)
+            results.append((' '.join(ocr_box.name for ocr_box in ocr_boxes), confidence))
+        return results
 
     def onnx_ocr(self, box, image, match, scale_factor, threshold, lib):
         try:
-            result = self.executor.ocr_lib(lib).ocr(image)
+            with self.executor.ocr_instance(lib) as ocr_lib:
+                result = ocr_lib.ocr(image)
         except Exception as e:
             logger.error('onnx_ocr', e)
             self.screenshot('onnx_ocr_exception', frame=image)
@@ -906,138 +1196,56 @@ class OCR(FindFeature):
                 raise Exception(self._app.tr(
                     'NPU inferring Error, you might need to update the Intel NPU driver!'))
             raise e
-        detected_boxes = []
-        # logger.debug(f'rapid_ocr result {result}')
-        # Process the results and create Box objects
-        if result[0] is not None:
-            for i in range(len(result[0])):
-                pos = result[0][i][0]
-                text = result[0][i][1][0]
-                confidence = result[0][i][1][1]
-                width, height = round(pos[2][0] - pos[0][0]), round(pos[2][1] - pos[0][1])
-                if width <= 0 or height <= 0:
-                    logger.debug(f'ocr result negative box {text} {confidence} {width}x{height} pos:{pos}')
-                    continue
-                detected_box = self.get_box(box, confidence, height, pos, scale_factor, text, threshold, width)
-                # logger.debug(f'rapid_ocr {text} {box} {confidence} {threshold} detected_box {detected_box}')
-                if detected_box:
-                    detected_boxes.append(detected_box)
-        ocr_boxes = detected_boxes
-        self.fix_texts(detected_boxes)
-        if match is not None:
-            detected_boxes = find_boxes_by_name(detected_boxes, match)
-        return detected_boxes, ocr_boxes
+        return self.columns_to_boxes(box, onnx_columns(result), match, scale_factor, threshold)
 
     def rapid_ocr(self, box, image, match, scale_factor, threshold, lib):
         try:
-            result = self.executor.ocr_lib(lib)(image, use_det=True, use_cls=False, use_rec=True)
+            with self.executor.ocr_instance(lib) as ocr_lib:
+                result = ocr_lib(image, use_det=True, use_cls=False, use_rec=True)
         except Exception as e:
             logger.error('rapid_ocr_exception', e)
             self.screenshot('rapid_ocr_exception', frame=image)
             raise e
-        detected_boxes = []
-        # logger.debug(f'rapid_ocr result {result}')
-        # Process the results and create Box objects
-        if result.boxes is not None:
-            for i in range(len(result.boxes)):
-                pos = result.boxes[i]
-                text = result.txts[i]
-                confidence = result.scores[i]
-                width, height = round(pos[2][0] - pos[0][0]), round(pos[2][1] - pos[0][1])
-                if width <= 0 or height <= 0:
-                    logger.debug(f'ocr result negative box {text} {confidence} {width}x{height} pos:{pos}')
-                    continue
-                detected_box = self.get_box(box, confidence, height, pos, scale_factor, text, threshold, width)
-                # logger.debug(f'rapid_ocr {text} {box} {confidence} {threshold} detected_box {detected_box}')
-                if detected_box:
-                    detected_boxes.append(detected_box)
-        ocr_boxes = detected_boxes
-        self.fix_texts(detected_boxes)
-        if match is not None:
-            detected_boxes = find_boxes_by_name(detected_boxes, match)
-        return detected_boxes, ocr_boxes
+        return self.columns_to_boxes(box, rapid_columns(result), match, scale_factor, threshold)
 
     def duguang_ocr(self, box, image, match, scale_factor, threshold, lib):
         try:
-            results = self.executor.ocr_lib(lib).run(image)
+            with self.executor.ocr_instance(lib) as ocr_lib:
+                results = ocr_lib.run(image)
         except Exception as e:
             logger.error('duguang_ocr_exception', e)
             self.screenshot('duguang_ocr_exception', frame=image)
             raise e
-        detected_boxes = []
-        # logger.debug(f'rapid_ocr result {result}')
-        # Process the results and create Box objects
-        # duguang_ocr returns a list of per-image results (第1张图片结果, 第2张图片结果, ...)
-        # each element is itself a list of [pos, (text, confidence)] detections
-        for image_results in results:
-            if not image_results:
-                continue
-            for result in image_results:
-                pos = result[0]
-                text, confidence = result[1]
-                width, height = round(pos[2][0] - pos[0][0]), round(pos[2][1] - pos[0][1])
-                if width <= 0 or height <= 0:
-                    logger.debug(f'ocr result negative box {text} {confidence} {width}x{height} pos:{pos}')
-                    continue
-                detected_box = self.get_box(box, confidence, height, pos, scale_factor, text, threshold, width)
-                # logger.debug(f'rapid_ocr {text} {box} {confidence} {threshold} detected_box {detected_box}')
-                if detected_box:
-                    detected_boxes.append(detected_box)
-        ocr_boxes = detected_boxes
-        self.fix_texts(detected_boxes)
-        if match is not None:
-            detected_boxes = find_boxes_by_name(detected_boxes, match)
-        return detected_boxes, ocr_boxes
+        return self.columns_to_boxes(box, duguang_columns(results), match, scale_factor, threshold)
 
     def paddle_ocr(self, box, image, match, scale_factor, threshold, lib):
-        start = time.time()
-        results = self.executor.ocr_lib(lib).predict(image)
-        detected_boxes = []
-        # Process the results and create Box objects
-        if results:
-            result = results[0]
-
-            for idx in range(len(result['rec_texts'])):
-                pos = result['rec_boxes'][idx]
-                text = result['rec_texts'][idx]
-                confidence = result['rec_scores'][idx]
-
-                width, height = round(pos[2] - pos[0]), round(pos[3] - pos[1])
-                if width <= 0 or height <= 0:
-                    logger.error(f'ocr result negative box {text} {confidence} {width}x{height} pos:{pos}')
-                    continue
-                if confidence >= threshold:
-                    detected_box = Box(pos[0], pos[1], width, height, confidence, text)
-                    scale_box(detected_box, scale_factor)
-                    if box is not None:
-                        detected_box.x += box.x
-                        detected_box.y += box.y
-                    detected_boxes.append(detected_box)
-        ocr_boxes = detected_boxes
-        self.fix_texts(detected_boxes)
+        with self.executor.ocr_instance(lib) as ocr_lib:
+            results = ocr_lib.predict(image)
+        return self.columns_to_boxes(box, paddle_columns(results), match, scale_factor, threshold)
+
+    def columns_to_boxes(self, box, columns, match, scale_factor, threshold):
+        """
+        Shared tail of the engine adapters: thresholds, scales and offsets the OcrColumns of one engine call on the
+        arrays, then builds Box objects for the remaining detections only.
+        """
+        columns = columns.to_frame(threshold, scale_factor, box.x if box is not None else 0,
+                                   box.y if box is not None else 0)
+        ocr_boxes = columns.to_boxes()
+        self.fix_texts(ocr_boxes)
+        detected_boxes = ocr_boxes
         if match is not None:
             detected_boxes = find_boxes_by_name(detected_boxes, match)
         return detected_boxes, ocr_boxes
 
-    def get_box(self, box, confidence, height, pos, scale_factor, text, threshold, width):
-        detected_box = None
-        if confidence >= threshold:
-            detected_box = Box(pos[0][0], pos[0][1], width, height, confidence, text)
-            scale_box(detected_box, scale_factor)
-            if box is not None:
-                detected_box.x += box.x
-                detected_box.y += box.y
-        return detected_box
-
     def wait_click_ocr(self, x=0, y=0, to_x=1, to_y=1, width=0, height=0, box=None, name=None, match=None, threshold=0,
                        frame=None, target_height=0, time_out=0, raise_if_not_found=False, recheck_time=0, after_sleep=0,
-                       post_action=None, log=False, screenshot=False, settle_time=-1, lib="default"):
+                       post_action=None, log=False, screenshot=False, settle_time=-1, lib="default", pipeline=False):
 
         result = self.wait_ocr(x, y, width=width, height=height, to_x=to_x, to_y=to_y, box=box, name=name, match=match,
                                threshold=threshold, frame=frame, target_height=target_height, time_out=time_out,
                                raise_if_not_found=raise_if_not_found, post_action=post_action, log=log,
                                screenshot=screenshot,
-                               settle_time=settle_time, lib=lib)
+                               settle_time=settle_time, lib=lib, pipeline=pipeline)
         if recheck_time > 0:
             self.sleep(1)
             result = self.ocr(x, y, width=width, height=height, to_x=to_x, to_y=to_y, box=box, name=name, match=match,
@@ -1051,14 +1259,28 @@ class OCR(FindFeature):
 
     def wait_ocr(self, x=0, y=0, to_x=1, to_y=1, width=0, height=0, name=None, box=None, match=None, threshold=0,
                  frame=None, target_height=0, time_out=0, post_action=None, raise_if_not_found=False, log=False,
-                 screenshot=False, settle_time=-1, lib="default"):
-        boxes = self.wait_until(
-            lambda: self.ocr(x, y, to_x=to_x, to_y=to_y, width=width, height=height, box=box, name=name,
-                             match=match, threshold=threshold, frame=frame, target_height=target_height, log=log,
-                             screenshot=screenshot,
-                             lib=lib),
-            time_out=time_out, post_action=post_action,
-            raise_if_not_found=raise_if_not_found, settle_time=settle_time)
+                 screenshot=False, settle_time=-1, lib="default", reuse=False, pipeline=False):
+        """
+        Waits until ocr() finds a match, see ocr() for the OCR arguments.
+
+        With pipeline=True inference of each frame runs on the background OCR worker while the next frame is
+        captured, instead of capturing and recognizing one after the other.
+        """
+        if pipeline:
+            boxes = self._wait_ocr_pipelined(
+                dict(x=x, y=y, to_x=to_x, to_y=to_y, width=width, height=height, box=box, name=name, match=match,
+                     threshold=threshold, frame=frame, target_height=target_height, log=log, screenshot=screenshot,
+                     lib=lib, reuse=reuse),
+                time_out=time_out, post_action=post_action, raise_if_not_found=raise_if_not_found,
+                settle_time=settle_time)
+        else:
+            boxes = self.wait_until(
+                lambda: self.ocr(x, y, to_x=to_x, to_y=to_y, width=width, height=height, box=box, name=name,
+                                 match=match, threshold=threshold, frame=frame, target_height=target_height, log=log,
+                                 screenshot=screenshot,
+                                 lib=lib, reuse=reuse),
+                time_out=time_out, post_action=post_action,
+                raise_if_not_found=raise_if_not_found, settle_time=settle_time)
         if not boxes and raise_if_not_found:
             logger.error(f'wait_ocr failed, ocr again and log')
             boxes = self.ocr(x, y, to_x=to_x, to_y=to_y, width=width, height=height, box=box, name=name,
@@ -1066,6 +1288,26 @@ class OCR(FindFeature):
                              lib=lib)
         return boxes
 
+    def _wait_ocr_pipelined(self, ocr_kwargs, time_out=0, post_action=None, raise_if_not_found=False,
+                            settle_time=-1):
+        """
+        wait_until over ocr_async(): each check submits the frame just captured and returns the result of the previous
+        one, which was recognized while this frame was captured.
+        """
+        pending = []
+
+        def condition():
+            previous = pending.pop() if pending else None
+            pending.append(self.ocr_async(**ocr_kwargs))
+            return previous.result() if previous is not None else None
+
+        try:
+            return self.wait_until(condition, time_out=time_out, post_action=post_action, settle_time=settle_time,
+                                   raise_if_not_found=raise_if_not_found)
+        finally:
+            for future in pending:
+                future.cancel()
+
 
 class BaseTask(OCR):
     """
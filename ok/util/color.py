@@ -2,6 +2,7 @@ import cv2
 import numpy as np
 
 from ok.feature.Box import Box
+from ok.util.frame_cache import in_range_mask, to_hsv
 
 black_color = {
     'r': (0, 0),
@@ -88,7 +89,7 @@ def get_saturation(image, box=None):
                 box.width > 0 and box.height > 0):
             image = image[box.y:box.y + box.height, box.x:box.x + box.width, :3]
 
-    hsv_image = cv2.cvtColor(image, cv2.COLOR_BGR2HSV)
+    hsv_image = to_hsv(image)
     saturation_channel = hsv_image[:, :, 1]
     mean_saturation = saturation_channel.mean() / 255
 
@@ -109,7 +110,7 @@ def find_color_rectangles(image, color_range, min_width, min_height,
         y_offset = 0
 
     lower_bound, upper_bound = color_range_to_bound(color_range)
-    mask = cv2.inRange(image, lower_bound, upper_bound)
+    mask = in_range_mask(image, lower_bound, upper_bound)
     contours, _ = cv2.findContours(mask, cv2.RETR_LIST, cv2.CHAIN_APPROX_SIMPLE)
     results = []
 
@@ -160,8 +161,8 @@ def calculate_color_percentage(image, color_ranges, box=None):
     else:
         image = image[:, :, :3]
 
-    mask = cv2.inRange(image, (color_ranges['b'][0], color_ranges['g'][0], color_ranges['r'][0]),
-                       (color_ranges['b'][1], color_ranges['g'][1], color_ranges['r'][1]))
+    mask = in_range_mask(image, (color_ranges['b'][0], color_ranges['g'][0], color_ranges['r'][0]),
+                         (color_ranges['b'][1], color_ranges['g'][1], color_ranges['r'][1]))
     target_pixels = cv2.countNonZero(mask)
     total_pixels = image.size / 3
     percentage = target_pixels / total_pixels
@@ -0,0 +1,160 @@
+import threading
+import weakref
+
+import cv2
+
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+_frame_caches = weakref.WeakSet()
+
+
+class FrameCache:
+    """
+    Derived images (gray, HSV, color masks, Canny edges) of the executor's current frame.
+
+    Entries are keyed by the kind of conversion and the region of the frame it was computed on, so repeated
+    find_feature/ocr/color calls on the same frame convert each region once. Pixel-wise conversions computed on
+    the whole frame also serve any crop of it. Cached arrays are read-only and live until reset() is called with
+    the next frame.
+
+    frame_id is the capture method's id of the cached frame (see BaseCaptureMethod.frame_info), None when unknown.
+    """
+
+    def __init__(self):
+        self.frame = None
+        self.frame_id = None
+        self._images = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._kind_stats = {}
+        _frame_caches.add(self)
+
+    def reset(self, frame=None, frame_id=None):
+        with self._lock:
+            self.frame = frame
+            self.frame_id = frame_id
+            self._images = {}
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'kinds': {kind: dict(counts) for kind, counts in self._kind_stats.items()},
+            }
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self._kind_stats = {}
+
+    def region_of(self, image, frame=None):
+        """Returns (x, y, width, height) if image is frame (the cached frame by default) or a crop view of it."""
+        if frame is None:
+            frame = self.frame
+        if frame is None or image is None:
+            return None
+        if image is frame:
+            return 0, 0, frame.shape[1], frame.shape[0]
+        if (image.base is None or image.dtype != frame.dtype or image.ndim != frame.ndim
+                or image.shape[2:] != frame.shape[2:] or image.strides != frame.strides):
+            return None
+        offset = image.__array_interface__['data'][0] - frame.__array_interface__['data'][0]
+        if offset < 0:
+            return None
+        y, remainder = divmod(offset, frame.strides[0])
+        x, remainder = divmod(remainder, frame.strides[1])
+        height, width = image.shape[:2]
+        if remainder != 0 or y + height > frame.shape[0] or x + width > frame.shape[1]:
+            return None
+        return x, y, width, height
+
+    def get(self, image, kind, create, pixel_wise=False):
+        """
+        Returns create(image) for a view of the cached frame, computing it at most once per region.
+
+        pixel_wise conversions may be sliced out of a result computed on a larger region of the same frame.
+        """
+        # the region and the lookup use one snapshot of the frame, reset() may swap it from another thread
+        with self._lock:
+            frame = self.frame
+            region = self.region_of(image, frame)
+            if region is not None:
+                cached = self._lookup(kind, region, pixel_wise)
+                self._count(kind, cached is not None)
+        if region is None:
+            return create(image)
+        if cached is not None:
+            return cached
+        result = create(image)
+        result.setflags(write=False)
+        with self._lock:
+            if self.frame is frame:
+                self._images[(kind, region)] = result
+        return result
+
+    def _lookup(self, kind, region, pixel_wise):
+        cached = self._images.get((kind, region))
+        if cached is not None or not pixel_wise:
+            return cached
+        x, y, width, height = region
+        for (cached_kind, (cx, cy, cw, ch)), image in self._images.items():
+            if (cached_kind == kind and cx <= x and cy <= y and x + width <= cx + cw
+                    and y + height <= cy + ch):
+                return image[y - cy:y - cy + height, x - cx:x - cx + width]
+        return None
+
+    def _count(self, kind, hit):
+        kind_name = kind[0] if isinstance(kind, tuple) else kind
+        counts = self._kind_stats.setdefault(kind_name, {'hits': 0, 'misses': 0})
+        if hit:
+            self.hits += 1
+            counts['hits'] += 1
+        else:
+            self.misses += 1
+            counts['misses'] += 1
+
+
+def find_frame_cache(image):
+    """Returns the FrameCache whose current frame owns image, if any."""
+    if image is None:
+        return None
+    for frame_cache in list(_frame_caches):
+        if frame_cache.region_of(image) is not None:
+            return frame_cache
+    return None
+
+
+def cached(image, kind, create, pixel_wise=False):
+    frame_cache = find_frame_cache(image)
+    if frame_cache is None:
+        return create(image)
+    return frame_cache.get(image, kind, create, pixel_wise=pixel_wise)
+
+
+def to_gray(image):
+    """BGR to gray, shared per frame region."""
+    return cached(image, 'gray', lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2GRAY), pixel_wise=True)
+
+
+def to_hsv(image):
+    """BGR to HSV, shared per frame region."""
+    return cached(image, 'hsv', lambda img: cv2.cvtColor(img, cv2.COLOR_BGR2HSV), pixel_wise=True)
+
+
+def to_canny(image, canny_lower, canny_higher):
+    """Canny edges of a BGR region, shared only for the exact same region since edges depend on the borders."""
+    return cached(image, ('canny', canny_lower, canny_higher),
+                  lambda img: cv2.Canny(to_gray(img), canny_lower, canny_higher))
+
+
+def in_range_mask(image, lower_bound, upper_bound):
+    """cv2.inRange mask of a BGR region, shared per frame region and color range."""
+    key = ('in_range', tuple(int(v) for v in lower_bound), tuple(int(v) for v in upper_bound))
+    return cached(image, key, lambda img: cv2.inRange(img, lower_bound, upper_bound), pixel_wise=True)
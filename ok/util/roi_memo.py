@@ -0,0 +1,125 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+from ok.util.logger import Logger
+
+logger = Logger.get_logger(__name__)
+
+ROI_THUMBNAIL_SIZE = 16
+DEFAULT_ROI_MEMO_BYTES = 4 * 1024 * 1024
+
+
+class RoiMemo:
+    """
+    Reuses the result of an expensive call (template match, OCR) while the region it looked at stays unchanged.
+
+    Each key remembers a digest of the ROI pixels it was computed on, plus a ROI_THUMBNAIL_SIZE thumbnail when
+    tolerance > 0. A later call with the same key returns the stored result when the new ROI has the same digest, or
+    when the mean absolute difference of the thumbnails is within tolerance. Entries are evicted least recently used
+    once their estimated size exceeds max_bytes. Results are copied on the way out via copy_result.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_ROI_MEMO_BYTES, tolerance=0):
+        self.max_bytes = max_bytes
+        self.tolerance = tolerance
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_config(cls, config):
+        """config holds roi_memo_mb (size cap, 4 by default) and roi_memo_tolerance (0, exact reuse only)."""
+        config = config or {}
+        max_mb = config.get('roi_memo_mb')
+        max_bytes = DEFAULT_ROI_MEMO_BYTES if max_mb is None else int(max_mb * 1024 * 1024)
+        return cls(max_bytes=max_bytes, tolerance=config.get('roi_memo_tolerance') or 0)
+
+    def get_or_compute(self, key, roi, compute, copy_result=None):
+        tolerance = self.tolerance
+        digest = roi_digest(roi)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+        if entry is not None and roi_unchanged(entry[0], entry[1], entry[2], digest, roi, tolerance):
+            with self._lock:
+                self.hits += 1
+            result = entry[3]
+            return copy_result(result) if copy_result is not None else result
+        result = compute()
+        thumbnail = roi_thumbnail(roi) if tolerance > 0 else None
+        entry = (digest, roi.shape, thumbnail, result, estimate_size(thumbnail, result))
+        with self._lock:
+            self.misses += 1
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[4]
+            self._entries[key] = entry
+            self._bytes += entry[4]
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= evicted[4]
+        return copy_result(result) if copy_result is not None else result
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+
+def roi_digest(roi):
+    """Hash of the ROI bytes, shape and dtype."""
+    roi = np.ascontiguousarray(roi)
+    digest = hashlib.blake2b(roi.data, digest_size=16)
+    digest.update(f'{roi.shape}{roi.dtype}'.encode())
+    return digest.digest()
+
+
+def roi_thumbnail(roi):
+    """Downsampled int16 copy of roi used for the near-identical comparison."""
+    height, width = roi.shape[:2]
+    size = (min(ROI_THUMBNAIL_SIZE, width), min(ROI_THUMBNAIL_SIZE, height))
+    return cv2.resize(roi, size, interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def roi_unchanged(previous_digest, previous_shape, previous_thumbnail, digest, roi, tolerance=0):
+    if previous_digest == digest:
+        return True
+    if tolerance <= 0 or previous_thumbnail is None or previous_shape != roi.shape:
+        return False
+    return float(np.mean(np.abs(previous_thumbnail - roi_thumbnail(roi)))) <= tolerance
+
+
+def estimate_size(thumbnail, result):
+    """Rough bytes held by an entry, boxes in (nested) lists and tuples counted at 150 bytes each."""
+    size = 200 + (thumbnail.nbytes if thumbnail is not None else 0)
+    pending = [result]
+    while pending:
+        item = pending.pop()
+        if isinstance(item, (list, tuple)):
+            size += 64 + 8 * len(item)
+            pending.extend(item)
+        else:
+            size += 150
+    return size
+
+
+def copy_boxes(boxes):
+    return [box.copy() for box in boxes]
@@ -0,0 +1,176 @@
+import gzip
+import struct
+import threading
+import unittest
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from ok.device.DeviceManager import DeviceManager
+from ok.device.capture_methods.adb import ADBCaptureMethod, parse_raw_screencap
+
+
+def raw_screencap(image_bgr, header_size=16, stride_pixels=None, pixel_format=1):
+    """The bytes screencap writes without -p, for a BGR image."""
+    height, width = image_bgr.shape[:2]
+    stride_pixels = stride_pixels or width
+    rgba = np.zeros((height, stride_pixels, 4), dtype=np.uint8)
+    code = cv2.COLOR_BGR2BGRA if pixel_format == 5 else cv2.COLOR_BGR2RGBA
+    rgba[:, :width] = cv2.cvtColor(image_bgr, code)
+    header = struct.pack('<III', width, height, pixel_format)
+    if header_size == 16:
+        header += struct.pack('<I', 0)
+    return header + rgba.tobytes()
+
+
+class FakeConnection:
+
+    def __init__(self, device):
+        self.device = device
+        self.output = b''
+
+    def send_command(self, command):
+        self.device.commands.append(command)
+        self.output = self.device.exec(command.removeprefix('exec:'))
+
+    def check_okay(self):
+        pass
+
+    def read_until_close(self, encoding=None):
+        return self.output
+
+    def close(self):
+        pass
+
+
+class FakeAdbDevice:
+    """Answers the adb commands screencap uses from a fixed BGR screen."""
+
+    def __init__(self, screen, serial='127.0.0.1:5555', tools=('gzip',), header_size=16, stride_pixels=None):
+        self.screen = screen
+        self.serial = serial
+        self.tools = tools
+        self.header_size = header_size
+        self.stride_pixels = stride_pixels
+        self.commands = []
+
+    def shell(self, cmd, encoding='utf-8', timeout=None):
+        self.commands.append(cmd)
+        if cmd == 'screencap -p':
+            return cv2.imencode('.png', self.screen)[1].tobytes()
+        if cmd.startswith('command -v '):
+            tool = cmd.split()[-1]
+            return f'/system/bin/{tool}\n' if tool in self.tools else ''
+        raise AssertionError(f'unexpected shell command {cmd}')
+
+    def exec(self, cmd):
+        raw = raw_screencap(self.screen, self.header_size, self.stride_pixels)
+        if cmd == 'screencap':
+            return raw
+        if cmd == 'screencap | gzip -1':
+            return gzip.compress(raw)
+        if cmd == 'screencap-broken':
+            return b'garbage'
+        raise AssertionError(f'unexpected exec command {cmd}')
+
+    def open_transport(self, timeout=None):
+        return FakeConnection(self)
+
+
+def create_manager(adb_config):
+    manager = DeviceManager.__new__(DeviceManager)
+    manager.adb_capture_config = adb_config
+    manager._screencap_compression = {}
+    manager._raw_screencap_failed = set()
+    return manager
+
+
+def create_screen():
+    screen = np.zeros((48, 64, 3), dtype=np.uint8)
+    screen[:, :, 0] = np.arange(64, dtype=np.uint8)
+    screen[:, :, 1] = np.arange(48, dtype=np.uint8)[:, None]
+    screen[10:20, 30:50, 2] = 255
+    return screen
+
+
+class TestRawScreencap(unittest.TestCase):
+
+    def test_parse_handles_old_header_stride_and_bgra(self):
+        screen = create_screen()
+        for header_size, stride, pixel_format in ((12, None, 1), (16, 72, 1), (16, None, 2), (12, 80, 5)):
+            frame = parse_raw_screencap(raw_screencap(screen, header_size, stride, pixel_format))
+            np.testing.assert_array_equal(screen, frame)
+
+    def test_parse_rejects_truncated_output(self):
+        data = raw_screencap(create_screen())
+        with self.assertRaises(ValueError):
+            parse_raw_screencap(data[:-100])
+
+    def test_raw_mode_uses_exec_out_without_png(self):
+        screen = create_screen()
+        device = FakeAdbDevice(screen, stride_pixels=70)
+        manager = create_manager({'screencap': 'raw'})
+
+        np.testing.assert_array_equal(screen, manager.do_screencap(device))
+        self.assertEqual(['exec:screencap'], device.commands)
+
+    def test_gzip_is_negotiated_once_per_device(self):
+        screen = create_screen()
+        device = FakeAdbDevice(screen)
+        manager = create_manager({'screencap': 'raw', 'screencap_compression': 'auto'})
+
+        for _ in range(2):
+            np.testing.assert_array_equal(screen, manager.do_screencap(device))
+
+        self.assertEqual('gzip', manager._screencap_compression[device.serial])
+        self.assertEqual(1, sum(command.startswith('command -v') for command in device.commands))
+        self.assertEqual(2, device.commands.count('exec:screencap | gzip -1'))
+
+    def test_no_compression_when_device_lacks_tools(self):
+        device = FakeAdbDevice(create_screen(), tools=())
+        manager = create_manager({'screencap': 'raw', 'screencap_compression': 'gzip'})
+
+        manager.do_screencap(device)
+
+        self.assertIsNone(manager._screencap_compression[device.serial])
+        self.assertIn('exec:screencap', device.commands)
+
+    def test_unparseable_raw_output_falls_back_to_png(self):
+        screen = create_screen()
+        device = FakeAdbDevice(screen)
+        device.exec = lambda cmd: b'garbage'
+        manager = create_manager({'screencap': 'raw'})
+
+        np.testing.assert_array_equal(screen, manager.do_screencap(device))
+        np.testing.assert_array_equal(screen, manager.do_screencap(device))
+        self.assertEqual(['exec:screencap', 'screencap -p', 'screencap -p'], device.commands)
+
+    def test_empty_or_failed_raw_output_falls_back_to_png(self):
+        def fail(cmd):
+            raise ConnectionError('exec: not supported')
+
+        for exec_out in (lambda cmd: b'', fail):
+            screen = create_screen()
+            device = FakeAdbDevice(screen)
+            device.exec = exec_out
+            manager = create_manager({'screencap': 'raw'})
+
+            np.testing.assert_array_equal(screen, manager.do_screencap(device))
+            self.assertIn(device.serial, manager._raw_screencap_failed)
+            self.assertEqual(['exec:screencap', 'screencap -p'], device.commands)
+
+    def test_png_mode_is_the_default(self):
+        screen = create_screen()
+        device = FakeAdbDevice(screen)
+        manager = create_manager(None)
+
+        capture = ADBCaptureMethod(SimpleNamespace(device=device, do_screencap=manager.do_screencap),
+                                   threading.Event(), 64, 48)
+
+        np.testing.assert_array_equal(screen, capture.get_frame())
+        self.assertEqual(['screencap -p'], device.commands)
+
+
+if __name__ == '__main__':
+    unittest.main()
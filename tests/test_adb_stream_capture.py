@@ -0,0 +1,139 @@
+import struct
+import threading
+import time
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+
+import ok.device.capture_methods.adb_stream as adb_stream
+from ok.core.events import communicate
+from ok.device.capture_methods.adb_stream import ADBStreamCaptureMethod
+
+
+def raw_frame(value, width=32, height=24):
+    rgba = np.full((height, width, 4), value, dtype=np.uint8)
+    rgba[:, :, 0] = value // 2
+    return struct.pack('<IIII', width, height, 1, 0) + rgba.tobytes()
+
+
+class FakeStreamConnection:
+    """Streams the frames of a FakeStreamDevice in odd sized chunks, then ends or blocks until closed."""
+
+    def __init__(self, device):
+        self.device = device
+        self.buffer = b''
+        self.closed = threading.Event()
+
+    def send_command(self, command):
+        self.device.commands.append(command)
+
+    def check_okay(self):
+        pass
+
+    def read(self, size):
+        while not self.buffer:
+            if self.closed.is_set():
+                return b''
+            if not self.device.frames:
+                if self.device.end_of_stream:
+                    return b''
+                self.closed.wait(0.01)
+                continue
+            self.buffer = self.device.frames.pop(0)
+            time.sleep(self.device.interval)
+        chunk, self.buffer = self.buffer[:min(size, 1000)], self.buffer[min(size, 1000):]
+        return chunk
+
+    def close(self):
+        self.closed.set()
+
+
+class FakeStreamDevice:
+
+    def __init__(self, frames, interval=0.005, end_of_stream=False):
+        self.serial = 'emulator-5554'
+        self.frames = list(frames)
+        self.interval = interval
+        self.end_of_stream = end_of_stream
+        self.commands = []
+        self.connections = []
+
+    def open_transport(self, timeout=None):
+        connection = FakeStreamConnection(self)
+        self.connections.append(connection)
+        return connection
+
+
+def create_capture(device):
+    device_manager = SimpleNamespace(device=device, exec_out=lambda device, cmd, timeout=10: raw_frame(0))
+    return ADBStreamCaptureMethod(device_manager, threading.Event())
+
+
+class TestADBStreamCaptureMethod(unittest.TestCase):
+
+    def test_frames_are_decoded_in_order_and_returned_once(self):
+        device = FakeStreamDevice([raw_frame(value) for value in (10, 20, 30)], interval=0.05)
+        capture = create_capture(device)
+        try:
+            values = [int(capture.get_frame()[0, 0, 0]) for _ in range(3)]
+        finally:
+            capture.close()
+
+        self.assertEqual([10, 20, 30], values)
+        self.assertEqual([f'exec:{adb_stream.STREAM_COMMAND}'], device.commands)
+        self.assertEqual(15, int(capture._latest[1][0, 0, 2]))
+
+    def test_get_frame_skips_to_the_newest_frame(self):
+        device = FakeStreamDevice([raw_frame(value) for value in range(1, 6)], interval=0)
+        capture = create_capture(device)
+        try:
+            capture.get_frame()
+            time.sleep(0.2)
+            self.assertEqual(5, int(capture.get_frame()[0, 0, 0]))
+        finally:
+            capture.close()
+
+    def test_reports_fps_and_frame_time(self):
+        device = FakeStreamDevice([raw_frame(value) for value in range(200)], interval=0.002)
+        capture = create_capture(device)
+        fps, frame_time = [], []
+        with patch.object(adb_stream, 'STREAM_STATS_INTERVAL', 0.05), \
+                communicate.fps.subscribed(fps.append), communicate.frame_time.subscribed(frame_time.append):
+            try:
+                capture.get_frame()
+                time.sleep(0.3)
+            finally:
+                capture.close()
+
+        self.assertTrue(fps and fps[-1] > 0)
+        self.assertTrue(frame_time and frame_time[-1] > 0)
+
+    def test_reconnects_when_stream_ends_or_resolution_changes(self):
+        device = FakeStreamDevice([raw_frame(10), raw_frame(20, width=16)], end_of_stream=True)
+        capture = create_capture(device)
+        try:
+            self.assertEqual(10, int(capture.get_frame()[0, 0, 0]))
+            deadline = time.time() + 3
+            while len(device.connections) < 2 and time.time() < deadline:
+                time.sleep(0.05)
+        finally:
+            capture.close()
+
+        self.assertGreaterEqual(len(device.connections), 2)
+
+    def test_close_stops_the_stream(self):
+        device = FakeStreamDevice([raw_frame(10)])
+        capture = create_capture(device)
+        capture.get_frame()
+        thread = capture._stream_thread
+
+        capture.close()
+
+        self.assertFalse(thread.is_alive())
+        self.assertTrue(device.connections[0].closed.is_set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,8 @@
+import re
 import unittest
 
 from ok import Logger
-from ok.feature.Box import Box, sort_boxes
+from ok.feature.Box import Box, compile_matcher, find_boxes_by_name, sort_boxes
 
 logger = Logger.get_logger(__name__)
 
@@ -25,6 +26,22 @@ class TestBox(unittest.TestCase):
         box_list_sorted = sort_boxes(box_list)
         self.assertEqual([box1, box2], box_list_sorted)
 
+    def test_find_boxes_by_name_mixed_matches(self):
+        boxes = [Box(0, 0, name=name) for name in ['Start', 'start game', 'Lv. 12', 'Exit', 'abc']]
+        names = ['Exit', re.compile('start'), re.compile(r'Lv\. (\d+)'), re.compile('ST', re.IGNORECASE)]
+
+        self.assertEqual(['Start', 'start game', 'Lv. 12', 'Exit'],
+                         [box.name for box in find_boxes_by_name(boxes, names)])
+        self.assertEqual(['Exit'], [box.name for box in find_boxes_by_name(boxes, 'Exit')])
+        self.assertEqual([], find_boxes_by_name([Box(0, 0, name=None)], ['Exit', re.compile('.')]))
+
+    def test_compile_matcher_is_memoized_and_keeps_inline_flags(self):
+        names = (re.compile('(?i)ok'), re.compile('yes'))
+
+        self.assertIs(compile_matcher(names), compile_matcher(names))
+        self.assertTrue(compile_matcher(names)('OK'))
+        self.assertFalse(compile_matcher(names)('no'))
+
 
 if __name__ == '__main__':
     unittest.main()
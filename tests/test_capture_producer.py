@@ -0,0 +1,87 @@
+import threading
+import time
+import unittest
+
+import numpy as np
+
+from ok.device.capture_methods.base import BaseCaptureMethod
+from ok.task.exceptions import CaptureException
+
+
+class CountingCaptureMethod(BaseCaptureMethod):
+    name = "Counting Capture"
+
+    def __init__(self, delay=0.02):
+        super().__init__()
+        self.exit_event = threading.Event()
+        self.delay = delay
+        self.count = 0
+        self.fail = False
+
+    def do_get_frame(self):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError('device lost')
+        self.count += 1
+        return np.full((20, 20, 4), self.count % 256, dtype=np.uint8)
+
+
+class TestCaptureProducer(unittest.TestCase):
+
+    def setUp(self):
+        self.capture = CountingCaptureMethod()
+        self.capture.enable_producer(ring_size=2)
+
+    def tearDown(self):
+        self.capture.close()
+
+    def test_latest_frame_is_captured_after_the_barrier(self):
+        first = self.capture.latest_frame(0, timeout=1)
+        barrier = time.time()
+        second = self.capture.latest_frame(barrier, timeout=1)
+
+        self.assertEqual((20, 20, 3), first.shape)
+        self.assertGreater(int(second[0, 0, 0]), int(first[0, 0, 0]))
+        self.assertLessEqual(len(self.capture._ring), 2)
+
+    def test_frames_are_handed_out_once(self):
+        self.capture.delay = 0.2
+        first = self.capture.latest_frame(0, timeout=1)
+
+        self.assertIsNone(self.capture.latest_frame(0, timeout=0.05))
+        self.assertIsNot(first, self.capture.latest_frame(0, timeout=1))
+
+    def test_capture_error_is_raised_to_the_consumer(self):
+        self.capture.latest_frame(0, timeout=1)
+        self.capture.fail = True
+
+        with self.assertRaises(CaptureException):
+            self.capture.latest_frame(time.time(), timeout=1)
+
+    def test_close_stops_the_thread(self):
+        self.capture.latest_frame(0, timeout=1)
+        thread = self.capture._producer_thread
+
+        self.capture.close()
+
+        self.assertFalse(thread.is_alive())
+
+    def test_producer_is_capped_at_max_fps(self):
+        self.capture.close()
+        self.capture.delay = 0
+        self.capture.enable_producer(ring_size=2, max_fps=20)
+
+        self.capture.latest_frame(0, timeout=1)
+        count = self.capture.count
+        time.sleep(0.3)
+
+        self.assertLessEqual(self.capture.count - count, 8)
+
+    def test_exit_event_returns_none(self):
+        self.capture.exit_event.set()
+
+        self.assertIsNone(self.capture.latest_frame(0, timeout=0.2))
+
+
+if __name__ == '__main__':
+    unittest.main()
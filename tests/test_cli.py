@@ -54,6 +54,21 @@ class TestCli(unittest.TestCase):
 
         run_task.assert_called_once_with(config, task="DailyTask", debug=False, exit_after=False)
 
+    def test_bench_ocr_forwards_settings(self):
+        config = {"ocr": {"default": {"lib": "rapidocr"}}}
+
+        with patch.object(cli, "load_config", return_value=config), \
+                patch("ok.ocr.benchmark.run_ocr_benchmark", return_value={"libs": []}) as run_ocr_benchmark, \
+                patch("builtins.print") as print_report:
+            self.assertEqual(0, cli.main(["bench_ocr", "crops", "-l", "default", "--target-height", "540",
+                                          "--target-height", "720", "--grayscale", "true", "-r", "3"]))
+
+        run_ocr_benchmark.assert_called_once_with(
+            config, "crops", names=["default"], target_heights=[540, 720], grayscale=[True],
+            frame_height=1080, repeat=3, warmup=True,
+        )
+        print_report.assert_called_once()
+
 
 if __name__ == "__main__":
     unittest.main()
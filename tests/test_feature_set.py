@@ -0,0 +1,478 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import cv2
+import numpy as np
+
+from ok.feature.Feature import Feature
+from ok.feature.Box import sort_boxes
+from ok.feature import FeatureSet as feature_set_module
+from ok.feature.FeatureSet import FeatureSet, build_feature_bundle, configure_opencv_threads, \
+    filter_and_sort_matches, get_coco_index, load_feature_bundle, pyramid_match, read_from_json, scale_candidates
+
+
+def create_frame(width=320, height=240, seed=7):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 255, (height, width, 3), dtype=np.uint8)
+    return cv2.GaussianBlur(frame, (3, 3), 0)
+
+
+def create_feature_set(frame, features, folder):
+    coco_json = os.path.join(folder, 'coco_annotations.json')
+    with open(coco_json, 'w') as f:
+        json.dump({'images': [], 'categories': [], 'annotations': []}, f)
+    feature_set = FeatureSet(False, coco_json, 0.05, 0.05, default_threshold=0.9)
+    feature_set.height, feature_set.width = frame.shape[:2]
+    for name, (x, y, w, h) in features.items():
+        feature_set.feature_dict[name] = Feature(frame[y:y + h, x:x + w].copy(), x, y)
+    return feature_set
+
+
+class TestFeatureSetBatched(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = create_frame()
+        self.features = {
+            'icon_a': (20, 30, 24, 24),
+            'icon_b': (60, 40, 20, 28),
+            'icon_c': (100, 35, 30, 18),
+        }
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.feature_set = create_feature_set(self.frame, self.features, self.temp_dir.name)
+
+    def sequential(self, names, **kwargs):
+        results = []
+        for name in names:
+            results += self.feature_set.find_one_feature(self.frame, name, **kwargs)
+        return results
+
+    def assert_same_boxes(self, expected, actual):
+        self.assertEqual([(b.name, b.x, b.y, b.width, b.height) for b in expected],
+                         [(b.name, b.x, b.y, b.width, b.height) for b in actual])
+        for e, a in zip(expected, actual):
+            self.assertAlmostEqual(e.confidence, a.confidence, places=4)
+
+    def test_batched_gray_matches_sequential(self):
+        names = list(self.features)
+        expected = self.sequential(names, use_gray_scale=True, limit=1)
+        actual = self.feature_set.find_feature(self.frame, names, use_gray_scale=True, limit=1)
+
+        self.assertEqual(3, len(actual))
+        self.assert_same_boxes(sort_boxes(expected), actual)
+
+    def test_batched_preprocesses_union_once(self):
+        calls = []
+
+        def processor(image):
+            calls.append(image.shape)
+            return image
+
+        names = list(self.features)
+        boxes = self.feature_set.find_feature(self.frame, names, frame_processor=processor, limit=1)
+
+        self.assertEqual(1, len(calls))
+        self.assertEqual({'icon_a', 'icon_b', 'icon_c'}, {b.name for b in boxes})
+        for box in boxes:
+            x, y, _, _ = self.features[box.name]
+            self.assertEqual((x, y), (box.x, box.y))
+
+    def test_canny_is_not_batched(self):
+        names = list(self.features)
+        with mock.patch.object(self.feature_set, 'find_features_batched') as batched:
+            self.feature_set.find_feature(self.frame, names, canny_lower=50, canny_higher=150, limit=1)
+
+        batched.assert_not_called()
+
+    def test_batched_preprocesses_sparse_areas_separately(self):
+        self.feature_set.feature_dict['corner'] = Feature(self.frame[200:224, 280:304].copy(), 280, 200)
+        calls = []
+
+        def processor(image):
+            calls.append(image.shape)
+            return image
+
+        boxes = self.feature_set.find_feature(self.frame, ['icon_a', 'corner'], frame_processor=processor, limit=1)
+
+        self.assertEqual(2, len(calls))
+        self.assertEqual([('icon_a', 20, 30), ('corner', 280, 200)], [(b.name, b.x, b.y) for b in boxes])
+
+    def test_batched_raises_for_unknown_feature(self):
+        with self.assertRaises(ValueError):
+            self.feature_set.find_feature(self.frame, ['icon_a', 'unknown'], use_gray_scale=True)
+
+
+class TestMatchPool(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = create_frame()
+        self.features = {
+            'icon_a': (20, 30, 24, 24),
+            'icon_b': (60, 40, 20, 28),
+            'icon_c': (100, 35, 30, 18),
+            'icon_d': (200, 150, 26, 26),
+        }
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.feature_set = create_feature_set(self.frame, self.features, self.temp_dir.name)
+
+    def test_pool_results_match_sequential(self):
+        names = list(self.features)
+        for kwargs in [dict(limit=1), dict(use_gray_scale=True, limit=1)]:
+            expected = self.feature_set.find_feature(self.frame, names, **kwargs)
+            self.feature_set.match_workers = 4
+            actual = self.feature_set.find_feature(self.frame, names, **kwargs)
+            self.feature_set.match_workers = 0
+
+            self.assertEqual([(b.name, b.x, b.y) for b in expected], [(b.name, b.x, b.y) for b in actual])
+
+    def test_configure_opencv_threads_splits_cores_between_workers(self):
+        with mock.patch.object(feature_set_module.cv2, 'setNumThreads') as set_num_threads, \
+                mock.patch.object(feature_set_module.os, 'cpu_count', return_value=8):
+            self.assertEqual(2, configure_opencv_threads(4))
+            self.assertEqual(3, configure_opencv_threads(4, opencv_threads=3))
+            self.assertIsNone(configure_opencv_threads(0))
+
+        self.assertEqual([mock.call(2), mock.call(3)], set_num_threads.call_args_list)
+
+    def test_map_matches_keeps_order_and_uses_pool_threads(self):
+        self.feature_set.match_workers = 3
+        thread_names = set()
+
+        def work(i):
+            thread_names.add(threading.current_thread().name)
+            return i * 2
+
+        self.assertEqual([0, 2, 4, 6, 8], list(self.feature_set.map_matches(work, range(5))))
+        self.assertTrue(all(name.startswith('FeatureMatch') for name in thread_names))
+
+    def test_map_matches_runs_inline_without_workers(self):
+        self.assertEqual([threading.current_thread().name] * 2,
+                         list(self.feature_set.map_matches(lambda _: threading.current_thread().name, [1, 2])))
+
+
+class TestReuse(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = create_frame()
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.feature_set = create_feature_set(self.frame, {'icon': (20, 30, 24, 24)}, self.temp_dir.name)
+
+    def find(self, frame):
+        with mock.patch.object(self.feature_set, '_match_search_area',
+                               wraps=self.feature_set._match_search_area) as match:
+            boxes = self.feature_set.find_one_feature(frame, 'icon', limit=1, reuse=True)
+        return boxes, match.call_count
+
+    def test_static_roi_skips_matching(self):
+        first, first_calls = self.find(self.frame)
+        second, second_calls = self.find(self.frame.copy())
+
+        self.assertEqual((1, 0), (first_calls, second_calls))
+        self.assertEqual([(20, 30)], [(b.x, b.y) for b in second])
+
+    def test_changed_roi_matches_again(self):
+        self.find(self.frame)
+        changed = self.frame.copy()
+        changed[30:54, 20:44] = 0
+
+        boxes, calls = self.find(changed)
+
+        self.assertEqual(1, calls)
+        self.assertEqual([], boxes)
+
+
+class TestFilterAndSortMatches(unittest.TestCase):
+
+    def create_result(self):
+        result = np.zeros((60, 80), dtype=np.float32)
+        for x, y, confidence in [(5, 5, 0.95), (40, 8, 0.9), (10, 40, 0.85), (60, 45, 0.99)]:
+            result[y - 2:y + 3, x - 2:x + 3] = confidence - 0.05
+            result[y, x] = confidence
+        return result
+
+    def test_keeps_one_match_per_peak_ordered_by_confidence(self):
+        matches = filter_and_sort_matches(self.create_result(), 0.8, 10, 10)
+
+        self.assertEqual([(60, 45), (5, 5), (40, 8), (10, 40)],
+                         [(int(x), int(y)) for (x, y), _ in matches])
+        self.assertAlmostEqual(0.99, float(matches[0][1]), places=5)
+
+    def test_suppresses_overlapping_peaks(self):
+        result = self.create_result()
+        result[8, 12] = 0.97
+
+        matches = filter_and_sort_matches(result, 0.8, 10, 10)
+
+        self.assertNotIn((5, 5), [(int(x), int(y)) for (x, y), _ in matches])
+        self.assertIn((12, 8), [(int(x), int(y)) for (x, y), _ in matches])
+
+    def test_max_results_stops_early(self):
+        matches = filter_and_sort_matches(self.create_result(), 0.8, 10, 10, max_results=2)
+
+        self.assertEqual([(60, 45), (5, 5)], [(int(x), int(y)) for (x, y), _ in matches])
+
+    def test_returns_empty_below_threshold(self):
+        self.assertEqual([], filter_and_sort_matches(self.create_result(), 0.999, 10, 10))
+
+
+class CocoTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        folder = self.temp_dir.name
+        os.makedirs(os.path.join(folder, 'images'))
+        page = create_frame(100, 80)
+        cv2.imwrite(os.path.join(folder, 'images', '0.png'), page)
+        cv2.imwrite(os.path.join(folder, 'images', '1.png'), page)
+        self.coco_json = os.path.join(folder, 'coco_annotations.json')
+        self.write_coco([('a', 0, [5, 5, 10, 10]), ('b', 0, [30, 5, 12, 8]), ('c', 1, [50, 40, 20, 20])])
+
+    def write_coco(self, annotations):
+        names = sorted({name for name, _, _ in annotations})
+        data = {
+            'images': [{'id': 0, 'file_name': 'images/0.png'}, {'id': 1, 'file_name': 'images/1.png'}],
+            'categories': [{'id': i, 'name': name} for i, name in enumerate(names)],
+            'annotations': [{'id': i, 'image_id': image_id, 'category_id': names.index(name), 'bbox': bbox}
+                            for i, (name, image_id, bbox) in enumerate(annotations)],
+        }
+        with open(self.coco_json, 'w') as f:
+            json.dump(data, f)
+
+
+class TestCocoIndex(CocoTestCase):
+
+    def test_lazy_loads_parse_json_once(self):
+        feature_set = FeatureSet(False, self.coco_json, 0.05, 0.05)
+        feature_set.check_size(np.zeros((80, 100, 3), dtype=np.uint8))
+        with mock.patch.object(feature_set_module, 'load_json', wraps=feature_set_module.load_json) as load_json:
+            get_coco_index(self.coco_json)
+            load_json.reset_mock()
+            self.assertTrue(feature_set.feature_exists('a'))
+            self.assertTrue(feature_set.feature_exists('c'))
+            self.assertFalse(feature_set.feature_exists('missing'))
+            self.assertFalse(feature_set.feature_exists('missing'))
+
+        load_json.assert_not_called()
+        self.assertEqual({'a', 'b', 'c'}, set(feature_set.feature_dict))
+
+    def test_target_category_only_decodes_its_image(self):
+        with mock.patch.object(feature_set_module.cv2, 'imread', wraps=cv2.imread) as imread:
+            features, boxes, _, success, image_keys = read_from_json(self.coco_json, target_category_name='c')
+
+        self.assertTrue(success)
+        self.assertEqual(['c'], list(features))
+        self.assertEqual(1, imread.call_count)
+        self.assertEqual(1, len(image_keys))
+
+    def test_index_reloads_when_file_changes(self):
+        first = get_coco_index(self.coco_json)
+        self.assertIs(first, get_coco_index(self.coco_json))
+
+        self.write_coco([('a', 0, [5, 5, 10, 10]), ('d', 1, [50, 40, 20, 20])])
+        stat = os.stat(self.coco_json)
+        os.utime(self.coco_json, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+
+        second = get_coco_index(self.coco_json)
+        self.assertIsNot(first, second)
+        self.assertEqual({'a', 'd'}, set(second.category_image_ids))
+
+
+class TestFeatureBundle(CocoTestCase):
+
+    def test_bundle_matches_json_features(self):
+        build_feature_bundle(self.coco_json, [(200, 160)], canny_thresholds=[(50, 150)])
+        expected, expected_boxes, _, _, _ = read_from_json(self.coco_json, 200, 160)
+
+        features, boxes = load_feature_bundle(self.coco_json, 200, 160)
+
+        self.assertEqual(set(expected), set(features))
+        for name, feature in features.items():
+            self.assertTrue(np.array_equal(expected[name].mat, feature.mat))
+            self.assertEqual((expected[name].x, expected[name].y), (feature.x, feature.y))
+            self.assertEqual(expected_boxes[name], boxes[name])
+            gray = cv2.cvtColor(feature.mat, cv2.COLOR_BGR2GRAY)
+            self.assertTrue(np.array_equal(gray, feature.template_cache[(True, 0, 0)]))
+            self.assertTrue(np.array_equal(cv2.Canny(gray, 50, 150), feature.template_cache[(False, 50, 150)]))
+
+    def test_missing_resolution_returns_none(self):
+        build_feature_bundle(self.coco_json, [(200, 160)])
+
+        self.assertIsNone(load_feature_bundle(self.coco_json, 100, 80))
+
+    def test_stale_bundle_is_ignored(self):
+        build_feature_bundle(self.coco_json, [(100, 80)])
+        self.write_coco([('a', 0, [5, 5, 10, 10])])
+
+        self.assertIsNone(load_feature_bundle(self.coco_json, 100, 80))
+
+    def test_feature_set_loads_bundle_without_decoding_images(self):
+        build_feature_bundle(self.coco_json, [(100, 80)])
+        feature_set = FeatureSet(False, self.coco_json, 0.05, 0.05)
+        frame = np.zeros((80, 100, 3), dtype=np.uint8)
+
+        with mock.patch.object(feature_set_module.cv2, 'imread', wraps=cv2.imread) as imread:
+            self.assertIsNotNone(feature_set.get_feature_by_name(frame, 'c'))
+
+        imread.assert_not_called()
+        self.assertEqual({'a', 'b', 'c'}, set(feature_set.feature_dict))
+
+
+class TestPyramidMatch(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = cv2.resize(create_frame(120, 80, seed=5), (480, 320), interpolation=cv2.INTER_CUBIC)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.feature_set = create_feature_set(self.frame, {'icon': (300, 200, 40, 32)}, self.temp_dir.name)
+
+    def test_pyramid_finds_same_box_as_full_search(self):
+        full = self.feature_set.find_one_feature(self.frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1)
+        pyramid = self.feature_set.find_one_feature(self.frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1,
+                                                    pyramid=True)
+
+        self.assertEqual([(300, 200)], [(b.x, b.y) for b in full])
+        self.assertEqual([(b.x, b.y, b.width, b.height) for b in full],
+                         [(b.x, b.y, b.width, b.height) for b in pyramid])
+        self.assertAlmostEqual(full[0].confidence, pyramid[0].confidence, places=4)
+
+    def test_pyramid_features_opt_in_per_feature(self):
+        self.feature_set.pyramid_features = {'icon'}
+        with mock.patch.object(feature_set_module, 'pyramid_match', wraps=pyramid_match) as match:
+            boxes = self.feature_set.find_one_feature(self.frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1)
+
+        match.assert_called_once()
+        self.assertEqual([(300, 200)], [(b.x, b.y) for b in boxes])
+
+    def test_small_templates_fall_back_to_full_match(self):
+        template = self.frame[10:20, 10:20]
+
+        self.assertIsNone(pyramid_match(self.frame, template, 0.9))
+
+
+class TestLastSeen(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = create_frame(320, 240, seed=11)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.feature_set = create_feature_set(self.frame, {'icon': (200, 150, 30, 24)}, self.temp_dir.name)
+
+    def find(self, frame):
+        return self.feature_set.find_one_feature(frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1, last_seen=True)
+
+    def shifted(self, dx, dy):
+        return np.roll(self.frame, (dy, dx), axis=(0, 1))
+
+    def test_second_search_uses_window_around_last_location(self):
+        self.assertEqual([(200, 150)], [(b.x, b.y) for b in self.find(self.frame)])
+        with mock.patch.object(feature_set_module, 'preprocess_search_area',
+                               wraps=feature_set_module.preprocess_search_area) as preprocess:
+            boxes = self.find(self.shifted(3, -2))
+
+        self.assertEqual([(203, 148)], [(b.x, b.y) for b in boxes])
+        area = preprocess.call_args[0][0]
+        self.assertLess(area.shape[1], 60)
+        self.assertEqual(1, self.feature_set.last_seen_stats()['hits'])
+
+    def test_falls_back_to_full_search_when_window_misses(self):
+        self.find(self.frame)
+
+        boxes = self.find(self.shifted(-120, -100))
+
+        self.assertEqual([(80, 50)], [(b.x, b.y) for b in boxes])
+        stats = self.feature_set.last_seen_stats()
+        self.assertEqual((0, 1, 2), (stats['hits'], stats['misses'], stats['full_searches']))
+
+    def test_confidence_drop_triggers_full_search(self):
+        self.find(self.frame)
+        noisy = self.frame.copy()
+        noisy[150:174, 200:230] = cv2.GaussianBlur(noisy[150:174, 200:230], (5, 5), 0)
+
+        self.find(noisy)
+
+        self.assertEqual(1, self.feature_set.last_seen_stats()['misses'])
+
+    def test_last_seen_features_opt_in_per_feature(self):
+        self.feature_set.last_seen_features = {'icon'}
+        self.feature_set.find_one_feature(self.frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1)
+        self.feature_set.find_one_feature(self.frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1)
+
+        self.assertEqual(1.0, self.feature_set.last_seen_stats()['hit_rate'])
+
+
+    def test_last_seen_stats_count_every_pool_thread(self):
+        self.feature_set.match_workers = 4
+        list(self.feature_set.map_matches(lambda i: [self.feature_set._remember_last_seen(('icon', i % 3), [])
+                                                     for _ in range(500)], list(range(8))))
+        self.feature_set.match_workers = 0
+
+        self.assertEqual(4000, self.feature_set.last_seen_stats()['full_searches'])
+
+class TestMultiScale(unittest.TestCase):
+
+    def setUp(self):
+        self.frame = cv2.resize(create_frame(160, 120, seed=3), (480, 360), interpolation=cv2.INTER_CUBIC)
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.temp_dir.cleanup)
+        self.feature_set = create_feature_set(self.frame, {'icon': (200, 150, 40, 40)}, self.temp_dir.name)
+        # The UI is drawn 10% larger than the templates were captured at.
+        self.scaled_frame = cv2.resize(self.frame, (528, 396), interpolation=cv2.INTER_LINEAR)[:360, :480]
+
+    def find(self, **kwargs):
+        return self.feature_set.find_one_feature(self.scaled_frame, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1,
+                                                 **kwargs)
+
+    def test_native_scale_misses_scaled_ui(self):
+        self.assertEqual([], self.find())
+
+    def test_finds_scaled_ui_and_remembers_scale(self):
+        boxes = self.find(multi_scale=True)
+
+        self.assertEqual(1, len(boxes))
+        self.assertEqual((220, 165, 44, 44), (boxes[0].x, boxes[0].y, boxes[0].width, boxes[0].height))
+        self.assertEqual(1.1, self.feature_set.best_scale('icon'))
+
+    def test_best_scale_is_tried_first(self):
+        self.find(multi_scale=True)
+        with mock.patch.object(self.feature_set, '_match_search_area',
+                               wraps=self.feature_set._match_search_area) as match:
+            boxes = self.find(multi_scale=True)
+
+        self.assertEqual(1, match.call_count)
+        self.assertEqual((220, 165), (boxes[0].x, boxes[0].y))
+
+    def test_miss_only_retries_neighbouring_scales(self):
+        self.find(multi_scale=True)
+        blank = np.zeros_like(self.scaled_frame)
+        counts = []
+        with mock.patch.object(self.feature_set, '_match_search_area',
+                               wraps=self.feature_set._match_search_area) as match:
+            for _ in range(feature_set_module.MULTI_SCALE_FULL_SWEEP_MISSES):
+                match.reset_mock()
+                self.feature_set.find_one_feature(blank, 'icon', x=0, y=0, to_x=1, to_y=1, limit=1,
+                                                  multi_scale=True)
+                counts.append(match.call_count)
+
+        self.assertEqual([3] * (feature_set_module.MULTI_SCALE_FULL_SWEEP_MISSES - 1), counts[:-1])
+        self.assertEqual(len(scale_candidates(self.feature_set.scale_range)), counts[-1])
+        self.assertEqual(1.1, self.feature_set.best_scale('icon'))
+
+    def test_scaled_templates_are_cached(self):
+        self.find(multi_scale=True, use_gray_scale=True)
+
+        cached_scales = {key[1] for key in self.feature_set.feature_dict['icon'].template_cache if key[0] == 'scale'}
+        self.assertIn(1.1, cached_scales)
+
+    def test_scale_candidates_start_near_native(self):
+        self.assertEqual([1.0, 0.9, 1.1, 0.8, 1.2], scale_candidates((0.8, 1.2, 0.1)))
+
+
+if __name__ == '__main__':
+    unittest.main()
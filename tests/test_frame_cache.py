@@ -0,0 +1,95 @@
+import unittest
+
+import cv2
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.util.color import calculate_color_percentage, find_color_rectangles, get_saturation
+from ok.util.frame_cache import FrameCache, to_canny, to_gray, to_hsv
+
+
+class TestFrameCache(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(3)
+        self.frame = rng.integers(0, 255, (120, 160, 3), dtype=np.uint8)
+        self.frame_cache = FrameCache()
+        self.frame_cache.reset(self.frame)
+        self.addCleanup(self.frame_cache.reset)
+
+    def test_region_of_detects_crop_views(self):
+        self.assertEqual((0, 0, 160, 120), self.frame_cache.region_of(self.frame))
+        self.assertEqual((10, 20, 30, 40), self.frame_cache.region_of(self.frame[20:60, 10:40]))
+        self.assertEqual((10, 20, 30, 40), self.frame_cache.region_of(self.frame[20:60, 10:40, :3]))
+        self.assertIsNone(self.frame_cache.region_of(self.frame[20:60, 10:40].copy()))
+        self.assertIsNone(self.frame_cache.region_of(self.frame[:, :, 1]))
+
+    def test_gray_is_computed_once_per_region(self):
+        crop = self.frame[20:60, 10:40]
+        first = to_gray(crop)
+        second = to_gray(self.frame[20:60, 10:40])
+
+        self.assertIs(first, second)
+        self.assertTrue(np.array_equal(cv2.cvtColor(crop, cv2.COLOR_BGR2GRAY), first))
+        self.assertFalse(first.flags.writeable)
+        stats = self.frame_cache.stats()
+        self.assertEqual((1, 1), (stats['hits'], stats['misses']))
+
+    def test_pixel_wise_crop_is_sliced_from_full_frame(self):
+        full = to_hsv(self.frame)
+        crop = to_hsv(self.frame[5:25, 7:50])
+
+        self.assertTrue(np.array_equal(full[5:25, 7:50], crop))
+        self.assertEqual(1, self.frame_cache.stats()['kinds']['hsv']['hits'])
+
+    def test_canny_only_reuses_exact_region(self):
+        to_canny(self.frame, 50, 150)
+        crop = to_canny(self.frame[5:25, 7:50], 50, 150)
+
+        expected = cv2.Canny(cv2.cvtColor(self.frame[5:25, 7:50], cv2.COLOR_BGR2GRAY), 50, 150)
+        self.assertTrue(np.array_equal(expected, crop))
+        self.assertEqual(0, self.frame_cache.stats()['kinds']['canny']['hits'])
+
+    def test_reset_invalidates_entries(self):
+        first = to_gray(self.frame)
+        self.frame_cache.reset(self.frame)
+
+        self.assertIsNot(first, to_gray(self.frame))
+        self.assertEqual(2, self.frame_cache.stats()['misses'])
+
+    def test_result_of_replaced_frame_is_not_cached(self):
+        new_frame = self.frame.copy()
+        old_crop = self.frame[20:60, 10:40]
+
+        def create(image):
+            # the executor moves on to the next frame while the old crop is converted
+            self.frame_cache.reset(new_frame)
+            return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+
+        self.frame_cache.get(old_crop, 'gray', create, pixel_wise=True)
+
+        self.assertEqual({}, self.frame_cache._images)
+        self.assertIsNot(to_gray(new_frame[20:60, 10:40]), to_gray(old_crop))
+
+    def test_other_images_bypass_cache(self):
+        other = self.frame.copy()
+        to_gray(other)
+
+        self.assertEqual(0, self.frame_cache.stats()['misses'])
+
+    def test_color_helpers_share_masks(self):
+        color = {'r': (0, 128), 'g': (0, 255), 'b': (0, 255)}
+        box = Box(10, 10, 50, 40)
+        percentage = calculate_color_percentage(self.frame, color, box)
+        find_color_rectangles(self.frame, color, 1, 1, box=box)
+        get_saturation(self.frame, box)
+
+        crop = self.frame[10:50, 10:60]
+        mask = cv2.inRange(crop, (0, 0, 0), (255, 255, 128))
+        self.assertAlmostEqual(cv2.countNonZero(mask) / (40 * 50), percentage)
+        stats = self.frame_cache.stats()
+        self.assertEqual({'hits': 1, 'misses': 1}, stats['kinds']['in_range'])
+
+
+if __name__ == '__main__':
+    unittest.main()
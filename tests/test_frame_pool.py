@@ -0,0 +1,92 @@
+import threading
+import unittest
+
+import numpy as np
+
+from ok.device.capture_methods.base import BaseCaptureMethod
+from ok.device.capture_methods.frame_pool import FramePool, normalize_frame
+from ok.util.frame_cache import FrameCache
+
+
+class BgraCaptureMethod(BaseCaptureMethod):
+    name = "Bgra Capture"
+
+    def __init__(self, frame):
+        super().__init__()
+        self.exit_event = threading.Event()
+        self.frame = frame
+
+    def do_get_frame(self):
+        return self.frame
+
+
+class TestFramePool(unittest.TestCase):
+
+    def test_buffer_is_reused_only_when_released(self):
+        pool = FramePool(size=2)
+        first = pool.acquire((20, 30, 3))
+        second = pool.acquire((20, 30, 3))
+        self.assertIsNot(first, second)
+
+        first_id = id(first)
+        crop = first[2:5, 3:8]
+        del first
+        third = pool.acquire((20, 30, 3))
+        self.assertIsNot(third, crop.base)
+        self.assertIsNot(third, second)
+
+        del crop
+        self.assertEqual(first_id, id(pool.acquire((20, 30, 3))))
+        self.assertEqual(3, pool.allocations)
+
+    def test_resolution_change_drops_buffers(self):
+        pool = FramePool(size=2)
+        pool.acquire((20, 30, 3))
+        self.assertEqual((40, 60, 3), pool.acquire((40, 60, 3)).shape)
+        self.assertEqual(2, pool.allocations)
+
+    def test_normalize_frame(self):
+        pool = FramePool()
+        bgra = np.random.randint(0, 255, (20, 30, 4), dtype=np.uint8)
+        frame = normalize_frame(bgra, pool)
+        self.assertTrue(frame.flags['C_CONTIGUOUS'])
+        self.assertTrue(np.array_equal(bgra[:, :, :3], frame))
+
+        strided = bgra[:, 2:, :3]
+        copied = normalize_frame(strided, pool)
+        self.assertTrue(copied.flags['C_CONTIGUOUS'])
+        self.assertTrue(np.array_equal(strided, copied))
+
+        bgr = np.ascontiguousarray(bgra[:, :, :3])
+        self.assertIs(bgr, normalize_frame(bgr, pool))
+
+
+class TestGetFrameNormalization(unittest.TestCase):
+
+    def test_get_frame_returns_contiguous_bgr_with_frame_info(self):
+        capture = BgraCaptureMethod(np.random.randint(0, 255, (20, 30, 4), dtype=np.uint8))
+
+        first = capture.get_frame()
+        second = capture.get_frame()
+
+        self.assertEqual((20, 30, 3), first.shape)
+        self.assertTrue(first.flags['C_CONTIGUOUS'])
+        self.assertEqual((30, 20), capture._size)
+        first_info, second_info = capture.frame_info(first), capture.frame_info(second)
+        self.assertEqual(first_info.frame_id + 1, second_info.frame_id)
+        self.assertLessEqual(first_info.timestamp, second_info.timestamp)
+        self.assertEqual('Bgra Capture', second_info.source)
+        self.assertIs(second_info, capture.last_frame_info)
+        self.assertIsNone(capture.frame_info(first.copy()))
+
+    def test_frame_cache_keeps_frame_id(self):
+        frame_cache = FrameCache()
+        frame = np.zeros((20, 30, 3), dtype=np.uint8)
+        frame_cache.reset(frame, 7)
+        self.assertEqual(7, frame_cache.frame_id)
+        frame_cache.reset()
+        self.assertIsNone(frame_cache.frame_id)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,13 @@
+import ctypes
 import threading
 import unittest
 from types import SimpleNamespace
 from unittest.mock import Mock, patch
 
+import cv2
+import numpy as np
+
+from ok.capture.adb.nemu_ipc import NemuIpc, NemuIpcImpl
 from ok.device.capture_methods.nemu_ipc import NemuIpcCaptureMethod
 
 
@@ -33,7 +38,80 @@ class TestNemuIpcCaptureMethod(unittest.TestCase):
             self.assertEqual('frame', capture.do_get_frame())
 
         capture.check_mumu_app_keep_alive_400.assert_called_once_with()
-        implementation.screenshot.assert_called_once_with(timeout=0.5)
+        implementation.screenshot.assert_called_once_with(timeout=0.5, copy=False)
+
+    def test_producer_mode_keeps_a_buffer_per_ring_entry(self):
+        capture = self.make_capture()
+        capture.nemu_impl = SimpleNamespace(frame_pool=SimpleNamespace(size=4), disconnect=Mock())
+
+        capture.enable_producer(3)
+
+        self.assertEqual(5, capture.frame_buffers)
+        self.assertEqual(5, capture.nemu_impl.frame_pool.size)
+        capture.close()
+
+
+class FakeNemuLib:
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.buffers = []
+
+    def nemu_capture_display(self, connect_id, display_id, length, width_ptr, height_ptr, pixels_pointer):
+        width_ptr.contents.value = self.width
+        height_ptr.contents.value = self.height
+        if length:
+            self.buffers.append(ctypes.addressof(pixels_pointer.contents))
+            pixels = np.ctypeslib.as_array(pixels_pointer.contents)
+            pixels[:] = np.arange(length, dtype=np.uint32).astype(np.uint8)
+        return 0
+
+
+class TestNemuIpcScreenshot(unittest.TestCase):
+    def make_impl(self, lib):
+        impl = NemuIpcImpl.__new__(NemuIpcImpl)
+        impl.lib = lib
+        impl.display_id = 0
+        impl.connect_id = 1
+        impl.width = 0
+        impl.height = 0
+        impl._pixels = None
+        return impl
+
+    def test_pixel_buffer_is_reused_until_resolution_changes(self):
+        lib = FakeNemuLib(4, 3)
+        impl = self.make_impl(lib)
+
+        impl._screenshot()
+        impl._screenshot()
+        lib.width, lib.height = 6, 2
+        impl._screenshot()
+        impl._screenshot()
+
+        self.assertEqual(lib.buffers[0], lib.buffers[1])
+        self.assertNotEqual(lib.buffers[1], lib.buffers[2])
+        self.assertEqual(lib.buffers[2], lib.buffers[3])
+
+    def test_screenshot_never_overwrites_a_held_frame(self):
+        images = [np.random.randint(0, 255, (3, 4, 4), dtype=np.uint8) for _ in range(8)]
+        with patch.object(NemuIpc, 'init_nemu_ipc',
+                          return_value=SimpleNamespace(screenshot=Mock(side_effect=images))):
+            nemu = NemuIpc('', 0, frame_buffers=2)
+        expected = [cv2.flip(cv2.cvtColor(image, cv2.COLOR_BGRA2RGB), 0) for image in images]
+
+        held = nemu.screenshot()
+        crop = nemu.screenshot()[1:2]
+        for index in range(2, 6):
+            self.assertTrue(np.array_equal(expected[index], nemu.screenshot()))
+        self.assertTrue(np.array_equal(expected[0], held))
+        self.assertTrue(np.array_equal(expected[1][1:2], crop))
+
+        held_id = id(held)
+        del held
+        self.assertEqual(held_id, id(nemu.screenshot()))
+        copied = nemu.screenshot(copy=True)
+        self.assertTrue(np.array_equal(expected[7], copied))
+        self.assertFalse(any(copied is buffer for buffer in nemu.frame_pool._buffers))
 
 
 if __name__ == '__main__':
@@ -13,6 +13,7 @@ from ok.notification.providers import (
 from ok.notification.manager import NotificationManager
 from ok.notification.pipeline import NotificationPipeline
 from ok.notification.ppocr import NotificationPPOCR
+from ok.ocr.pool import OcrLibPool
 from ok.notification.system import WindowsSystemNotifier
 from ok.notification.messenger_images import _paste_from_context_menu, _wait_popup_text
 from ok.notification.windows_messenger import MessengerAutomation
@@ -252,19 +253,26 @@ def test_messenger_ocr_crops_region_and_restores_coordinates():
     assert boxes == [('Search', 25, 26, 20, 10)]
 
 
-def test_notification_ppocr_holds_only_lazy_shared_instance():
+def test_notification_ppocr_checks_out_from_lazy_pool():
     instance = Mock()
     instance.ocr.return_value = [[
         [[[5, 6], [25, 6], [25, 16], [5, 16]], ('Search', .9)],
         [[[1, 2], [3, 2], [3, 4], [1, 4]], ('Ignored', .05)],
     ]]
-    factory = Mock(return_value=instance)
+    pool = OcrLibPool(lambda: instance)
+    factory = Mock(return_value=pool)
     ocr = NotificationPPOCR(factory)
 
     boxes = ocr.recognize(np.zeros((20, 30, 3), dtype=np.uint8), threshold=.1)
+    checked_out = pool.checkout()
+    with pytest.raises(TimeoutError):
+        pool.checkout(timeout=.05)
+    pool.checkin(checked_out)
     ocr.recognize(np.zeros((20, 30, 3), dtype=np.uint8), threshold=.1)
 
     assert boxes == [('Search', 5, 6, 20, 10)]
+    assert checked_out is instance
+    assert pool.stats()['idle'] == 1
     factory.assert_called_once_with()
 
 
@@ -0,0 +1,269 @@
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.ocr.cache import OcrResultCache
+from ok.task.task import OCR, stitch_crops
+
+
+class FakeRapidOcr:
+    """Detects white rectangles and reads them as their width in pixels."""
+
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, image, use_det=True, use_cls=False, use_rec=True):
+        self.calls.append((image.shape, use_det))
+        boxes, txts, scores = [], [], []
+        for x, y, w, h in find_white_rects(image):
+            boxes.append([[x, y], [x + w, y], [x + w, y + h], [x, y + h]])
+            txts.append(str(w))
+            scores.append(0.9)
+        if not use_det:
+            return SimpleNamespace(boxes=None, txts=tuple(' '.join(txts).split()[:1]), scores=tuple(scores[:1]))
+        return SimpleNamespace(boxes=boxes or None, txts=txts, scores=scores)
+
+
+class FakeBatchRapidOcr(FakeRapidOcr):
+    """FakeRapidOcr with the batched text_rec recognizer, which only accepts BGR images."""
+
+    def text_rec(self, rec_input):
+        self.calls.append((len(rec_input.img), False))
+        assert all(image.ndim == 3 and image.shape[2] == 3 for image in rec_input.img)
+        rects = [next(iter(find_white_rects(image)), None) for image in rec_input.img]
+        return SimpleNamespace(txts=[str(rect[2]) if rect else '' for rect in rects],
+                               scores=[0.9 if rect else 0.0 for rect in rects])
+
+
+class FakeOnnxOcr:
+
+    def __init__(self):
+        self.calls = []
+
+    def ocr(self, img, det=True, rec=True, cls=True):
+        self.calls.append((len(img), det))
+        return [[(str(rect[2]), 0.9) if rect else ('', 0.0)
+                 for rect in (next(iter(find_white_rects(image)), None) for image in img)]]
+
+
+def find_white_rects(image):
+    gray = image if image.ndim == 2 else cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    contours, _ = cv2.findContours(cv2.inRange(gray, 200, 255), cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+    return [cv2.boundingRect(contour) for contour in contours]
+
+
+def create_operation(frame, lib='rapidocr'):
+    ocr_lib = {'onnxocr': FakeOnnxOcr, 'rapidocr_batch': FakeBatchRapidOcr}.get(lib, FakeRapidOcr)()
+    operation = OCR.__new__(OCR)
+    operation.ocr_default_threshold = 0.2
+    operation._executor = SimpleNamespace(
+        frame=frame,
+        paused=False,
+        config={'ocr': {'default': {'lib': 'rapidocr' if lib == 'rapidocr_batch' else lib}}},
+        locale='en_US',
+        ocr_po_translation=None,
+        text_fix={},
+        ocr_instance=lambda lib: nullcontext(ocr_lib),
+    )
+    return operation, ocr_lib
+
+
+def create_frame():
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    frame[20:30, 15:45] = 255
+    frame[110:122, 210:230] = 255
+    frame[160:170, 100:150] = 255
+    return frame
+
+
+def test_stitch_crops_offsets():
+    crops = [np.ones((10, 30), dtype=np.uint8), np.ones((20, 10), dtype=np.uint8)]
+
+    canvas, offsets = stitch_crops(crops, padding=4)
+
+    assert canvas.shape == (10 + 20 + 4 * 3, 30 + 8)
+    assert offsets == [4, 18]
+    assert canvas[offsets[1]:offsets[1] + 20, 4:14].all()
+
+
+def test_ocr_many_maps_detections_back_to_boxes():
+    operation, ocr_lib = create_operation(create_frame())
+    boxes = [Box(0, 0, 100, 50, name='a'), Box(200, 100, 60, 40, name='b'), Box(0, 60, 100, 40, name='empty')]
+
+    results = operation.ocr_many(boxes)
+
+    assert len(ocr_lib.calls) == 1
+    assert [[(b.name, b.x, b.y, b.width, b.height) for b in result] for result in results] == [
+        [('30', 15, 20, 30, 10)], [('20', 210, 110, 20, 12)], []]
+
+
+def test_ocr_many_maps_by_crop_clipped_at_frame_edge():
+    operation, _ = create_operation(create_frame())
+    boxes = [Box(0, 180, 100, 100, name='clipped'), Box(200, 100, 60, 40, name='b')]
+
+    results = operation.ocr_many(boxes)
+
+    assert [[(b.name, b.x, b.y) for b in result] for result in results] == [[], [('20', 210, 110)]]
+
+
+def test_ocr_many_applies_match_per_box():
+    operation, _ = create_operation(create_frame())
+    boxes = [Box(0, 0, 100, 50), Box(90, 150, 80, 40)]
+
+    results = operation.ocr_many(boxes, match='50')
+
+    assert [[b.name for b in result] for result in results] == [[], ['50']]
+
+
+def test_ocr_without_detection_returns_box_covering_input():
+    operation, ocr_lib = create_operation(create_frame())
+    operation.log_debug = False
+
+    boxes = operation.ocr(box=Box(200, 100, 60, 40, name='field'), detect=False)
+
+    assert ocr_lib.calls == [((40, 60, 3), False)]
+    assert [(b.name, b.x, b.y, b.width, b.height) for b in boxes] == [('20', 200, 100, 60, 40)]
+
+
+def test_ocr_many_without_detection_batches_recognizer_call():
+    operation, ocr_lib = create_operation(create_frame(), lib='onnxocr')
+    boxes = [Box(0, 0, 100, 50), Box(0, 60, 100, 40), Box(90, 150, 80, 40)]
+
+    results = operation.ocr_many(boxes, detect=False)
+
+    assert ocr_lib.calls == [(3, False)]
+    assert [[(b.name, b.x, b.y, b.width, b.height) for b in result] for result in results] == [
+        [('30', 0, 0, 100, 50)], [], [('50', 90, 150, 80, 40)]]
+
+
+class FakeExecutor(SimpleNamespace):
+    """Serves frames from a list, advancing on next_frame, and runs submitted OCR on a real worker thread."""
+
+    def __init__(self, frames, **kwargs):
+        super().__init__(**kwargs)
+        self.frames = frames
+        self.index = 0
+        self.frame = frames[0]
+        self.worker = ThreadPoolExecutor(max_workers=1)
+        self.exit_event = threading.Event()
+        self.wait_scene_timeout = 5
+        self.wait_until_settle_time = 0
+
+    def submit_ocr(self, fn, *args, **kwargs):
+        return self.worker.submit(fn, *args, **kwargs)
+
+    def check_enabled(self, check_pause=True):
+        pass
+
+    @staticmethod
+    def on_ocr_worker():
+        return False
+
+    def wait_condition(self, condition, time_out=0, pre_action=None, post_action=None, settle_time=-1,
+                       raise_if_not_found=False):
+        for _ in range(len(self.frames) + 1):
+            if pre_action is not None:
+                pre_action()
+            self.next_frame()
+            result = condition()
+            if result:
+                return result
+            if post_action is not None:
+                post_action()
+        return None
+
+    def reset_scene(self):
+        pass
+
+    def next_frame(self):
+        self.index = min(self.index + 1, len(self.frames) - 1)
+        self.frame = self.frames[self.index]
+        return self.frame
+
+
+def create_async_operation(frames):
+    operation, ocr_lib = create_operation(frames[0])
+    operation._executor = FakeExecutor(frames, **vars(operation._executor))
+    operation.log_debug = False
+    return operation, ocr_lib
+
+
+def test_ocr_many_without_detection_converts_gray_for_text_rec(monkeypatch):
+    monkeypatch.setitem(sys.modules, 'rapidocr.ch_ppocr_rec',
+                        SimpleNamespace(TextRecInput=lambda img: SimpleNamespace(img=img)))
+    operation, ocr_lib = create_operation(create_frame(), lib='rapidocr_batch')
+    boxes = [Box(0, 0, 100, 50), Box(0, 60, 100, 40), Box(90, 150, 80, 40)]
+
+    results = operation.ocr_many(boxes, detect=False, use_grayscale=True)
+
+    assert ocr_lib.calls == [(3, False)]
+    assert [[b.name for b in result] for result in results] == [['30'], [], ['50']]
+
+
+def test_ocr_async_uses_frame_at_submit_time():
+    blank = np.zeros((200, 300, 3), dtype=np.uint8)
+    operation, _ = create_async_operation([create_frame(), blank])
+
+    future = operation.ocr_async(box=Box(0, 0, 100, 50))
+    operation.executor.next_frame()
+
+    assert [b.name for b in future.result(timeout=5)] == ['30']
+    assert operation.ocr(box=Box(0, 0, 100, 50)) == []
+
+
+def test_wait_ocr_pipeline_captures_while_recognizing():
+    blank = np.zeros((200, 300, 3), dtype=np.uint8)
+    operation, ocr_lib = create_async_operation([blank, blank, create_frame()])
+
+    boxes = operation.wait_ocr(box=Box(0, 0, 100, 50), match='30', pipeline=True)
+
+    assert [b.name for b in boxes] == ['30']
+    assert len(ocr_lib.calls) >= 2
+    assert operation.executor.index == 2
+
+
+def test_wait_ocr_pipeline_uses_passed_frame():
+    blank = np.zeros((200, 300, 3), dtype=np.uint8)
+    operation, _ = create_async_operation([blank, blank, blank])
+
+    boxes = operation.wait_ocr(box=Box(0, 0, 100, 50), match='30', frame=create_frame(), pipeline=True)
+
+    assert [b.name for b in boxes] == ['30']
+
+
+def test_ocr_cache_reuses_result_for_same_crop_at_other_position():
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    frame[20:30, 15:45] = 255
+    frame[120:130, 115:145] = 255
+    operation, ocr_lib = create_operation(frame)
+    operation.log_debug = False
+    operation._executor.ocr_cache = OcrResultCache()
+
+    first = operation.ocr(box=Box(0, 0, 100, 50))
+    second = operation.ocr(box=Box(100, 100, 100, 50))
+
+    assert len(ocr_lib.calls) == 1
+    assert [(b.name, b.x, b.y) for b in first] == [('30', 15, 20)]
+    assert [(b.name, b.x, b.y) for b in second] == [('30', 115, 120)]
+    assert operation.ocr(box=Box(100, 100, 100, 50), match='40') == []
+
+
+def test_ocr_cache_hit_without_box_returns_copies():
+    frame = np.zeros((200, 300, 3), dtype=np.uint8)
+    frame[20:30, 15:45] = 255
+    operation, ocr_lib = create_operation(frame)
+    operation.log_debug = False
+    operation._executor.ocr_cache = OcrResultCache()
+
+    first = operation.ocr()
+    first[0].name = 'changed'
+    second = operation.ocr()
+
+    assert len(ocr_lib.calls) == 1
+    assert [b.name for b in second] == ['30']
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+import unittest
+from types import SimpleNamespace
+
+import cv2
+import numpy as np
+
+from ok.ocr.benchmark import character_error_rate, edit_distance, join_lines, load_labeled_crops, \
+    run_ocr_benchmark
+
+
+class FakeRapidOCR:
+    """Reads back the text drawn by write_crop from the crop's mean color."""
+
+    def __init__(self, texts):
+        self.texts = texts
+        self.calls = 0
+
+    def __call__(self, image, use_det=True, use_cls=False, use_rec=True):
+        self.calls += 1
+        text = self.texts[int(image.mean() + 0.5)]
+        h, w = image.shape[:2]
+        return SimpleNamespace(boxes=[[[0, 0], [w, 0], [w, h], [0, h]]], txts=[text], scores=[0.9])
+
+
+def write_crop(folder, file_name, value):
+    cv2.imwrite(os.path.join(folder, file_name), np.full((40, 120, 3), value, dtype=np.uint8))
+
+
+class TestOcrBenchmark(unittest.TestCase):
+
+    def test_edit_distance_and_cer(self):
+        self.assertEqual(3, edit_distance('kitten', 'sitting'))
+        self.assertEqual(0.0, character_error_rate('Start Game', 'StartGame'))
+        self.assertAlmostEqual(0.25, character_error_rate('abcd', 'abed'))
+        self.assertEqual(1.0, character_error_rate('', 'x'))
+
+    def test_join_lines_reads_top_to_bottom(self):
+        lines = [('World', 0.9, 0, 30), ('Hello', 0.9, 0, 0)]
+        self.assertEqual('Hello World', join_lines(lines))
+
+    def test_labels_from_file_names_and_labels_txt(self):
+        with tempfile.TemporaryDirectory() as folder:
+            write_crop(folder, 'Start.png', 10)
+            self.assertEqual([('Start.png', 'Start')], [(f, label) for f, _, label in load_labeled_crops(folder)])
+            with open(os.path.join(folder, 'labels.txt'), 'w', encoding='utf-8') as f:
+                f.write('Start.png\t开始 游戏\n')
+            self.assertEqual('开始 游戏', load_labeled_crops(folder)[0][2])
+
+    def test_report_per_lib_and_setting(self):
+        fake = FakeRapidOCR({10: 'Start', 20: 'Exlt'})
+        config = {'ocr': {'default': {'lib': 'rapidocr'}, 'target_height': 540}}
+        with tempfile.TemporaryDirectory() as folder:
+            write_crop(folder, 'a.png', 10)
+            write_crop(folder, 'b.png', 20)
+            with open(os.path.join(folder, 'labels.json'), 'w', encoding='utf-8') as f:
+                json.dump({'a.png': 'Start', 'b.png': 'Exit'}, f)
+            report = run_ocr_benchmark(config, folder, target_heights=[0, 540], grayscale=[False, True], repeat=2,
+                                       warmup=False, factory=lambda ocr_config, config: fake)
+
+        json.dumps(report)
+        self.assertEqual(['default'], [entry['name'] for entry in report['libs']])
+        results = report['libs'][0]['results']
+        self.assertEqual([(0, False), (0, True), (540, False), (540, True)],
+                         [(r['target_height'], r['grayscale']) for r in results])
+        self.assertEqual(16, fake.calls)
+        for result in results:
+            self.assertEqual(0.5, result['exact_match'])
+            self.assertAlmostEqual(0.125, result['cer'])
+            self.assertEqual(['b.png'], [failure['file'] for failure in result['failures']])
+            self.assertEqual({'p50', 'p90', 'p99', 'mean', 'max'}, set(result['latency_ms']))
+            self.assertGreater(result['throughput'], 0)
+
+    def test_unknown_lib_is_rejected(self):
+        with tempfile.TemporaryDirectory() as folder:
+            write_crop(folder, 'a.png', 10)
+            with self.assertRaises(ValueError):
+                run_ocr_benchmark({'ocr': {'default': {'lib': 'rapidocr'}}}, folder, names=['missing'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.ocr.cache import OcrResultCache, ocr_cache_key
+
+
+class TestOcrResultCache(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(2)
+        self.image = rng.integers(0, 255, (30, 80), dtype=np.uint8)
+
+    def test_key_depends_on_content_and_params(self):
+        key = ocr_cache_key(self.image, 'default', 0.2)
+
+        self.assertEqual(key, ocr_cache_key(self.image.copy(), 'default', 0.2))
+        self.assertNotEqual(key, ocr_cache_key(self.image, 'default', 0.5))
+        changed = self.image.copy()
+        changed[0, 0] ^= 1
+        self.assertNotEqual(key, ocr_cache_key(changed, 'default', 0.2))
+        self.assertNotEqual(key, ocr_cache_key(self.image.reshape(60, 40), 'default', 0.2))
+
+    def test_returns_copies(self):
+        cache = OcrResultCache()
+        cache.put('key', [Box(1, 2, 3, 4, 0.9, 'start')])
+
+        first = cache.get('key')
+        first[0].x = 100
+
+        self.assertEqual(1, cache.get('key')[0].x)
+        self.assertIsNone(cache.get('missing'))
+        self.assertEqual((2, 1), (cache.stats()['hits'], cache.stats()['misses']))
+
+    def test_evicts_least_recently_used_within_memory_bound(self):
+        cache = OcrResultCache(max_bytes=1300)
+        for key in ['a', 'b', 'c']:
+            cache.put(key, [Box(0, 0, 10, 10, 0.9, key)])
+        cache.get('a')
+        cache.put('d', [Box(0, 0, 10, 10, 0.9, 'd')])
+
+        self.assertLessEqual(cache.stats()['bytes'], 1300)
+        self.assertIsNotNone(cache.get('a'))
+        self.assertIsNone(cache.get('b'))
+
+
+if __name__ == '__main__':
+    unittest.main()
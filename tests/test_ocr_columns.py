@@ -0,0 +1,71 @@
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.ocr.columns import OcrColumns, duguang_columns, engine_columns, onnx_columns, paddle_columns
+from ok.task.task import OCR
+
+
+def quad(x, y, w, h):
+    return [[x, y], [x + w, y], [x + w, y + h], [x, y + h]]
+
+
+def test_from_quads_and_corners_agree():
+    quads = OcrColumns.from_quads([quad(10.4, 20, 30, 12), quad(0, 0, 5, 5)], [0.9, 0.5], ['a', 'b'])
+    corners = OcrColumns.from_corners([[10.4, 20, 40.4, 32], [0, 0, 5, 5]], [0.9, 0.5], ['a', 'b'])
+
+    np.testing.assert_allclose(quads.rects, corners.rects)
+    assert list(quads.texts) == ['a', 'b']
+
+
+def test_to_frame_thresholds_scales_and_offsets():
+    columns = OcrColumns.from_quads([quad(10.4, 20, 30, 12), quad(3, 3, 0.2, 8), quad(50, 60, 10, 10)],
+                                    [0.9, 0.9, 0.1], ['keep', 'empty', 'low'])
+
+    boxes = columns.to_frame(threshold=0.5, scale_factor=0.5, x_offset=100, y_offset=200).to_boxes()
+
+    assert boxes == [Box(120, 240, 60, 24, 0.9, 'keep')]
+    assert isinstance(boxes[0].confidence, float)
+
+
+def test_to_frame_keeps_tiny_boxes_after_scaling():
+    columns = OcrColumns.from_quads([quad(0, 0, 1, 1)], [0.9], ['.'])
+
+    boxes = columns.to_frame(scale_factor=4).to_boxes()
+
+    assert (boxes[0].width, boxes[0].height) == (1, 1)
+
+
+def test_engine_mappings():
+    onnx = onnx_columns([[[quad(1, 2, 3, 4), ('onnx', 0.8)]]])
+    duguang = duguang_columns([[[quad(1, 2, 3, 4), ('dg', 0.7)]], []])
+    paddle = paddle_columns([{'rec_boxes': np.array([[1, 2, 4, 6]]), 'rec_texts': ['paddle'],
+                              'rec_scores': [0.6]}])
+    rapid = engine_columns('rapidocr', SimpleNamespace(boxes=None, txts=(), scores=()))
+
+    for columns, text in ((onnx, 'onnx'), (duguang, 'dg'), (paddle, 'paddle')):
+        np.testing.assert_allclose(columns.rects, [[1, 2, 3, 4]])
+        assert list(columns.texts) == [text]
+    assert len(rapid) == 0
+    assert len(onnx_columns([None])) == 0
+    assert len(paddle_columns([])) == 0
+
+
+def test_adapter_matches_only_fixed_texts():
+    result = SimpleNamespace(boxes=np.array([quad(0, 0, 20, 10), quad(0, 20, 20, 10)], dtype=np.float32),
+                             txts=('Strat', 'Exit'), scores=(0.9, 0.95))
+    operation = OCR.__new__(OCR)
+    operation._executor = SimpleNamespace(
+        config={'ocr': {'default': {'lib': 'rapidocr'}}},
+        ocr_po_translation=None,
+        text_fix={'Strat': 'Start'},
+        ocr_instance=lambda lib: nullcontext(lambda image, **kwargs: result),
+    )
+
+    detected, ocr_boxes = operation.rapid_ocr(Box(5, 5, 40, 40), np.zeros((40, 40, 3), np.uint8), 'Start', 1, 0.5,
+                                              'default')
+
+    assert detected == [Box(5, 5, 20, 10, 0.9, 'Start')]
+    assert [box.name for box in ocr_boxes] == ['Start', 'Exit']
@@ -0,0 +1,69 @@
+import threading
+import time
+import unittest
+
+from ok.ocr.pool import OcrLibPool
+
+
+class TestOcrLibPool(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+
+    def factory(self):
+        instance = object()
+        self.created.append(instance)
+        return instance
+
+    def test_reuses_checked_in_instance(self):
+        pool = OcrLibPool(self.factory, size=2)
+        with pool.instance() as first:
+            pass
+        with pool.instance() as second:
+            pass
+
+        self.assertIs(first, second)
+        self.assertIs(first, pool.primary())
+        self.assertEqual(1, len(self.created))
+
+    def test_concurrent_checkouts_get_distinct_instances_up_to_size(self):
+        pool = OcrLibPool(self.factory, size=2)
+        first = pool.checkout()
+        second = pool.checkout()
+
+        self.assertIsNot(first, second)
+        with self.assertRaises(TimeoutError):
+            pool.checkout(timeout=0.05)
+        self.assertEqual(2, len(self.created))
+
+    def test_checkout_waits_for_checkin(self):
+        pool = OcrLibPool(self.factory, size=1)
+        instance = pool.checkout()
+        received = []
+        waiter = threading.Thread(target=lambda: received.append(pool.checkout(timeout=2)))
+        waiter.start()
+        time.sleep(0.05)
+        pool.checkin(instance)
+        waiter.join(2)
+
+        self.assertEqual([instance], received)
+        self.assertEqual(1, pool.stats()['waits'])
+
+    def test_failed_creation_frees_the_slot(self):
+        calls = []
+
+        def failing_factory():
+            calls.append(1)
+            if len(calls) == 1:
+                raise RuntimeError('model missing')
+            return object()
+
+        pool = OcrLibPool(failing_factory, size=1)
+        with self.assertRaises(RuntimeError):
+            pool.checkout()
+
+        self.assertIsNotNone(pool.checkout(timeout=0.1))
+
+
+if __name__ == '__main__':
+    unittest.main()
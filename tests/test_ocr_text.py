@@ -0,0 +1,49 @@
+import re
+from types import SimpleNamespace
+
+from ok.task.task import OCR, normalize_ocr_text
+
+
+class FakeTranslation:
+
+    def __init__(self, messages):
+        self.messages = messages
+        self.calls = 0
+
+    def gettext(self, message):
+        self.calls += 1
+        return self.messages.get(message, message)
+
+
+def create_operation(translation):
+    operation = OCR.__new__(OCR)
+    operation._executor = SimpleNamespace(config={'ocr': {}}, locale='en_US', ocr_po_translation=translation,
+                                          text_fix={'Strat': 'Start'})
+    return operation
+
+
+def test_fix_match_regex_translates_each_pattern_once():
+    translation = FakeTranslation({'^Start$': '^Commencer$'})
+    operation = create_operation(translation)
+    pattern = re.compile('^Start$', re.IGNORECASE)
+    match = [pattern, 'Exit']
+
+    first = operation.fix_match_regex(match)
+    second = operation.fix_match_regex(match)
+
+    assert first[0].pattern == '^Commencer$' and first[0].flags & re.IGNORECASE
+    assert first[0] is second[0]
+    assert match[0] is pattern
+    assert translation.calls == 1
+
+
+def test_fix_texts_memoizes_translation_and_applies_text_fix():
+    translation = FakeTranslation({'Quitter': 'Exit', 'Lv.1': 'Level 1'})
+    operation = create_operation(translation)
+    boxes = [SimpleNamespace(name=name) for name in [' Quitter ', 'Lv. 1', 'Strat', ' Quitter ']]
+
+    operation.fix_texts(boxes)
+
+    assert [box.name for box in boxes] == ['Exit', 'Level 1', 'Start', 'Exit']
+    assert normalize_ocr_text(' Quitter ', translation, False) == 'Exit'
+    assert translation.calls == 5
@@ -0,0 +1,112 @@
+import json
+import os
+import tempfile
+from contextlib import nullcontext
+from types import SimpleNamespace
+
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.ocr.tuning import TargetHeightTuner, tuning_key
+from ok.task.task import OCR
+
+
+class HeightSensitiveOcr:
+    """Reads 'Start' with full confidence while the crop is at least min_height pixels tall."""
+
+    def __init__(self, min_height):
+        self.min_height = min_height
+        self.heights = []
+
+    def __call__(self, image, use_det=True, use_cls=False, use_rec=True):
+        h, w = image.shape[:2]
+        self.heights.append(h)
+        if h < self.min_height:
+            return SimpleNamespace(boxes=None, txts=(), scores=())
+        return SimpleNamespace(boxes=[[[0, 0], [w, 0], [w, h], [0, h]]], txts=('Start',), scores=(0.9,))
+
+
+def create_operation(tuner, ocr_lib):
+    operation = OCR.__new__(OCR)
+    operation.ocr_default_threshold = 0.2
+    operation.log_debug = False
+    operation._executor = SimpleNamespace(
+        frame=None,
+        paused=False,
+        config={'ocr': {'default': {'lib': 'rapidocr'}}},
+        ocr_po_translation=None,
+        text_fix={},
+        ocr_tuner=tuner,
+        ocr_instance=lambda lib: nullcontext(ocr_lib),
+    )
+    return operation
+
+
+def test_record_locks_in_smallest_stable_height():
+    tuner = TargetHeightTuner(None, candidates=(360, 720), samples=2)
+    reference = [Box(0, 0, 10, 10, 0.9, 'Start')]
+    results = {360: ([Box(0, 0, 10, 10, 0.6, 'Start')], 0.01), 720: ([Box(0, 0, 10, 10, 0.88, 'Start')], 0.02)}
+
+    assert tuner.record('key', reference, 0.05, results) is None
+    assert tuner.record('key', [], 0.05, results) is None
+    assert tuner.record('key', reference, 0.05, results) == 720
+    assert tuner.target_height('key') == 720
+    assert tuner.target_height('other') is None
+
+
+def test_record_falls_back_to_full_resolution():
+    tuner = TargetHeightTuner(None, candidates=(360,), samples=1)
+
+    assert tuner.record('key', [Box(0, 0, 10, 10, 0.9, 'Start')], 0.05, {360: ([], 0.01)}) == 0
+    assert tuner.record('small', [], 0.01, {}) == 0
+    assert tuner.candidate_heights(500) == []
+
+
+def test_record_never_locks_in_region_without_text():
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'ocr_target_height.json')
+        tuner = TargetHeightTuner(path, candidates=(360,), samples=1)
+
+        for _ in range(10):
+            assert tuner.record('key', [], 0.05, {360: ([], 0.01)}) is None
+        assert tuner.target_height('key') is None
+        assert not os.path.exists(path)
+
+        assert tuner.record('key', [Box(0, 0, 10, 10, 0.9, 'Start')], 0.05,
+                            {360: ([Box(0, 0, 10, 10, 0.9, 'Start')], 0.01)}) == 360
+
+
+def test_ocr_tunes_named_region_and_persists():
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    ocr_lib = HeightSensitiveOcr(min_height=60)
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, 'ocr_target_height.json')
+        operation = create_operation(TargetHeightTuner(path, candidates=(360, 540), samples=2), ocr_lib)
+        box = Box(100, 100, 400, 120, name='title')
+
+        for _ in range(2):
+            assert [b.name for b in operation.ocr(box=box, frame=frame)] == ['Start']
+        key = tuning_key('title', 'default', 1080, False)
+        assert operation.executor.ocr_tuner.target_height(key) == 540
+
+        ocr_lib.heights.clear()
+        result = operation.ocr(box=box, frame=frame)
+        assert [(b.name, b.x, b.y, b.height) for b in result] == [('Start', 100, 100, 120)]
+        assert ocr_lib.heights == [60]
+
+        with open(path, encoding='utf-8') as f:
+            assert json.load(f)[key]['target_height'] == 540
+        assert TargetHeightTuner(path).target_height(key) == 540
+
+
+def test_explicit_target_height_and_unnamed_regions_skip_tuning():
+    frame = np.zeros((1080, 1920, 3), dtype=np.uint8)
+    ocr_lib = HeightSensitiveOcr(min_height=0)
+    tuner = TargetHeightTuner(None, candidates=(360,), samples=1)
+    operation = create_operation(tuner, ocr_lib)
+
+    operation.ocr(box=Box(0, 0, 100, 90, name='title'), frame=frame, target_height=540)
+    operation.ocr(box=Box(0, 0, 100, 90), frame=frame)
+
+    assert ocr_lib.heights == [45, 90]
+    assert tuner.target_height(tuning_key('title', 'default', 1080, False)) is None
@@ -0,0 +1,71 @@
+import threading
+import time
+import unittest
+
+from ok.ocr.warmup import synthetic_ocr_image, warmup_ocr_lib
+from ok.task.TaskExecutor import TaskExecutor
+
+
+class FakeRapidOcr:
+
+    def __init__(self, name):
+        self.name = name
+        self.shapes = []
+
+    def __call__(self, image, use_det=True, use_cls=False, use_rec=True):
+        self.shapes.append(image.shape)
+
+
+class TestOcrWarmup(unittest.TestCase):
+
+    def make_executor(self, ocr_config, create_ocr_lib):
+        executor = TaskExecutor.__new__(TaskExecutor)
+        executor.config = {'ocr': ocr_config}
+        executor.ocr_target_height = 540
+        executor._ocr_lib = {}
+        executor._ocr_lib_lock = threading.Lock()
+        executor._create_ocr_lib = create_ocr_lib
+        return executor
+
+    def test_synthetic_image_has_target_height(self):
+        self.assertEqual((540, 960, 3), synthetic_ocr_image(540).shape)
+        self.assertEqual(720, synthetic_ocr_image(0).shape[0])
+
+    def test_warmup_uses_engine_entry_point(self):
+        ocr_lib = FakeRapidOcr('default')
+
+        warmup_ocr_lib('rapidocr', ocr_lib, synthetic_ocr_image(100))
+
+        self.assertEqual([(100, 178, 3)], ocr_lib.shapes)
+
+    def test_all_configured_libs_init_in_parallel_and_warm_up(self):
+        started = []
+        created = {}
+
+        def create_ocr_lib(name):
+            started.append(time.time())
+            time.sleep(0.2)
+            if name == 'broken':
+                raise RuntimeError('model missing')
+            created[name] = FakeRapidOcr(name)
+            return created[name]
+
+        executor = self.make_executor({
+            'default': {'lib': 'rapidocr'},
+            'bg': {'lib': 'rapidocr', 'target_height': 360},
+            'broken': {'lib': 'rapidocr'},
+        }, create_ocr_lib)
+
+        executor.init_default_ocr()
+        executor._ocr_init_thread.join(5)
+
+        self.assertLess(max(started) - min(started), 0.15)
+        self.assertEqual([(540, 960, 3)], created['default'].shapes)
+        self.assertEqual([(360, 640, 3)], created['bg'].shapes)
+        self.assertTrue(executor.ocr_status['default']['ready'])
+        self.assertIn('warmup', executor.ocr_status['bg'])
+        self.assertEqual({'ready': False, 'error': 'model missing'}, executor.ocr_status['broken'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+
+import numpy as np
+
+from ok.feature.Box import Box
+from ok.util.roi_memo import RoiMemo, copy_boxes
+
+
+class TestRoiMemo(unittest.TestCase):
+
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.roi = rng.integers(0, 255, (40, 60, 3), dtype=np.uint8)
+        self.calls = 0
+
+    def compute(self):
+        self.calls += 1
+        return [Box(1, 2, 3, 4, name=f'call{self.calls}')]
+
+    def test_identical_roi_reuses_result(self):
+        memo = RoiMemo()
+        first = memo.get_or_compute('key', self.roi, self.compute, copy_result=copy_boxes)
+        second = memo.get_or_compute('key', self.roi.copy(), self.compute, copy_result=copy_boxes)
+
+        self.assertEqual(1, self.calls)
+        self.assertEqual('call1', second[0].name)
+        self.assertIsNot(first[0], second[0])
+        stats = memo.stats()
+        self.assertEqual((1, 1, 0.5, 1), (stats['hits'], stats['misses'], stats['hit_rate'], stats['entries']))
+
+    def test_changed_roi_recomputes(self):
+        memo = RoiMemo()
+        memo.get_or_compute('key', self.roi, self.compute)
+        changed = self.roi.copy()
+        changed[10, 10] += 1
+
+        self.assertEqual('call2', memo.get_or_compute('key', changed, self.compute)[0].name)
+
+    def test_tolerance_accepts_nearly_identical_roi(self):
+        memo = RoiMemo(tolerance=1)
+        memo.get_or_compute('key', self.roi, self.compute)
+        noisy = self.roi.copy()
+        noisy[10, 10] ^= 1
+
+        memo.get_or_compute('key', noisy, self.compute)
+        memo.get_or_compute('key', 255 - self.roi, self.compute)
+
+        self.assertEqual(2, self.calls)
+
+    def test_keys_are_independent_and_bounded_by_bytes(self):
+        memo = RoiMemo(max_bytes=1)
+        memo.get_or_compute('a', self.roi, self.compute)
+        entry_bytes = memo.stats()['bytes']
+        memo.max_bytes = 2 * entry_bytes
+        for key in ['b', 'c']:
+            memo.get_or_compute(key, self.roi, self.compute)
+        memo.get_or_compute('a', self.roi, self.compute)
+
+        self.assertEqual(4, self.calls)
+        self.assertEqual(2, memo.stats()['entries'])
+        self.assertEqual(2 * entry_bytes, memo.stats()['bytes'])
+
+    def test_entries_do_not_keep_roi_pixels(self):
+        memo = RoiMemo(tolerance=1)
+        large = np.zeros((1080, 1920, 3), dtype=np.uint8)
+        memo.get_or_compute('key', large, self.compute)
+
+        self.assertLess(memo.stats()['bytes'], 4096)
+
+    def test_from_config(self):
+        memo = RoiMemo.from_config({'roi_memo_mb': 0.5, 'roi_memo_tolerance': 2})
+
+        self.assertEqual((512 * 1024, 2), (memo.max_bytes, memo.tolerance))
+        self.assertEqual(0, RoiMemo.from_config(None).tolerance)
+
+
+if __name__ == '__main__':
+    unittest.main()